@@ -5,10 +5,15 @@ of soccer actions from video clips.
 """
 
 import kivy
-import pandas as pd
 import os
 os.environ['KIVY_VIDEO'] = 'ffpyplayer'  # Use ffpyplayer for video playback
-import json
+# Headless mode (hidden window, no fullscreen), used by utils/soak_test.py
+HEADLESS = os.environ.get('RATING_APP_HEADLESS') == '1'
+if HEADLESS:
+    from kivy.config import Config
+    Config.set('graphics', 'window_state', 'hidden')
+# Sampling profiler for the whole session (also toggled with F9), written to profiles/ on exit
+PROFILE = os.environ.get('RATING_APP_PROFILE') == '1'
 from kivy.app import App
 from kivy.uix.label import Label
 from kivy.uix.button import Button
@@ -19,126 +24,140 @@ from kivy.uix.screenmanager import ScreenManager, Screen, FadeTransition
 from kivy.uix.popup import Popup
 from kivy.uix.slider import Slider
 from kivy.uix.image import Image as KivyImage
-from kivy.properties import NumericProperty, BooleanProperty, StringProperty, DictProperty
+from kivy.uix.video import Video
+from kivy.properties import NumericProperty, BooleanProperty, StringProperty
 from kivy.core.window import Window
+from kivy.clock import Clock
 from kivy.core.image import Image as CoreImage
 from kivy.graphics import Color, Rectangle, Line
-import random
+from collections import OrderedDict
 from datetime import datetime
-import duckdb
-import yaml
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import mplsoccer
-from io import BytesIO
+from core import (AssignmentEngine, MetadataProvider, RatingScaleModel, RatingStore, User,
+                  VideoCatalogue, action_id_from_filename, load_config, load_questionnaire_fields,
+                  load_rating_scales, scale_key)
+from core.adaptive import ConvergenceTracker, load_adaptive_settings
+from core.clipcache import ClipCache, load_clip_cache_settings
+from core.decoder import decoder_profile, ffpyplayer_options, load_decoder_settings
+from core.framepacing import FramePacingMonitor
+from core.pitch import DEFAULT_TRAJECTORY, PitchImageCache
+from core.profiler import SamplingProfiler
+from core.timing import ClipTimer, ScreenLog
 
 kivy.require("1.9.1")
 
 # Set window to fullscreen
-Window.fullscreen = 'auto'
+if not HEADLESS:
+    Window.fullscreen = 'auto'
 
-class FocusableToggleButton(ToggleButton):
+# Maximum number of pitch and poster frame textures kept in memory
+TEXTURE_CACHE_SIZE = 32
+
+# Output folder of the sampling profiler
+PROFILE_DIR = 'profiles'
+
+class _OutputFormatPlayer:
     """
-    ToggleButton with keyboard focus support and visual feedback.
-    Shows a border when focused to indicate it's the active element.
+    Wraps a MediaPlayer so the video provider picks the profile's pixel format.
+    The provider decodes to yuv420p (converted to RGB on the GPU) when the source
+    reports yuv420p and to rgba otherwise, so the reported source format decides.
     """
-    focus = BooleanProperty(False)
+    def __init__(self, player, pixel_format):
+        self._player = player
+        self._pixel_format = pixel_format
+
+    def get_metadata(self):
+        metadata = self._player.get_metadata()
+        if metadata.get('src_pix_fmt'):
+            metadata = dict(metadata, src_pix_fmt=self._pixel_format)
+        return metadata
+
+    def __getattr__(self, name):
+        return getattr(self._player, name)
+
+
+class DecoderProfile:
+    """
+    Applies a decoder profile (decoder section of config.yaml, see core/decoder.py)
+    to every clip opened by Kivy's ffpyplayer video provider, i.e. to both
+    video_player and video_player_once. The provider creates its MediaPlayer with
+    fixed options, so the profile is installed by wrapping the provider's MediaPlayer.
+    """
+    def __init__(self, profile):
+        self.profile = profile
+        self.ff_opts, self.lib_opts = ffpyplayer_options(profile)
+        self.output_height = None  # Pixel height of the active player (scale_to_widget)
+
+    def install(self):
+        try:
+            from kivy.core.video import video_ffpyplayer as provider
+        except ImportError as e:
+            print(f"[WARNING] Decoder profile not applied, ffpyplayer video provider unavailable: {e}")
+            return
+        media_player = provider.MediaPlayer
+        pixel_format = self.profile['pixel_format']
+
+        def open_clip(filename, ff_opts=None, lib_opts=None, **kwargs):
+            ff_opts = dict(ff_opts or {}, **self.ff_opts)
+            lib_opts = dict(lib_opts or {}, **self.lib_opts)
+            player = media_player(filename, ff_opts=ff_opts, lib_opts=lib_opts, **kwargs)
+            if self.profile['scale_to_widget'] and self.output_height:
+                player.set_size(-1, self.output_height)  # Width follows the aspect ratio
+            return player if pixel_format is None else _OutputFormatPlayer(player, pixel_format)
+        provider.MediaPlayer = open_clip
+
+class FocusHighlightMixin:
+    """
+    Draws a blue border around the widget while it has keyboard focus.
+    The border instructions are created once per widget and shown or hidden
+    through the colour's alpha, so moving focus allocates no canvas instructions.
+    """
+    focus_border_rgb = (0, 0.5, 1)  # Blue focus border
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.focus_rect = None
-        self.focus_color = None
-        self.bind(focus=self.on_focus)
-
-    def on_focus(self, instance, value):
-        """Add visual feedback when button gains/loses focus."""
-        if value:  # Gained focus
-            with self.canvas.after:
-                self.focus_color = Color(0, 0.5, 1, 1)  # Blue focus border
-                self.focus_rect = Line(rectangle=(self.x, self.y, self.width, self.height), width=3)
-            self.bind(pos=self._update_focus_rect, size=self._update_focus_rect)
-        else:  # Lost focus
-            if self.focus_rect:
-                self.canvas.after.remove(self.focus_color)
-                self.canvas.after.remove(self.focus_rect)
-                self.unbind(pos=self._update_focus_rect, size=self._update_focus_rect)
-                self.focus_rect = None
-                self.focus_color = None
+        with self.canvas.after:
+            self.focus_color = Color(*self.focus_border_rgb, 0)
+            self.focus_rect = Line(rectangle=(self.x, self.y, self.width, self.height), width=3)
+        self.bind(pos=self._update_focus_rect, size=self._update_focus_rect,
+                  focus=self._on_focus_highlight)
+
+    def _on_focus_highlight(self, instance, value):
+        """Show the border when the widget gains focus and hide it when it loses focus."""
+        if value:
+            self.focus_rect.rectangle = (self.x, self.y, self.width, self.height)
+            self.focus_color.a = 1
+        else:
+            self.focus_color.a = 0
 
     def _update_focus_rect(self, *args):
         """Update focus rectangle position and size when widget moves/resizes."""
-        if self.focus_rect:
+        if self.focus_color.a:
             self.focus_rect.rectangle = (self.x, self.y, self.width, self.height)
 
 
-class FocusableButton(Button):
+class FocusableToggleButton(FocusHighlightMixin, ToggleButton):
     """
-    Button with keyboard focus support and visual feedback.
+    ToggleButton with keyboard focus support and visual feedback.
     Shows a border when focused to indicate it's the active element.
     """
     focus = BooleanProperty(False)
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.focus_rect = None
-        self.focus_color = None
-        self.bind(focus=self.on_focus)
-
-    def on_focus(self, instance, value):
-        """Add visual feedback when button gains/loses focus."""
-        if value:  # Gained focus
-            with self.canvas.after:
-                self.focus_color = Color(0, 0.5, 1, 1)  # Blue focus border
-                self.focus_rect = Line(rectangle=(self.x, self.y, self.width, self.height), width=3)
-            self.bind(pos=self._update_focus_rect, size=self._update_focus_rect)
-        else:  # Lost focus
-            if self.focus_rect:
-                self.canvas.after.remove(self.focus_color)
-                self.canvas.after.remove(self.focus_rect)
-                self.unbind(pos=self._update_focus_rect, size=self._update_focus_rect)
-                self.focus_rect = None
-                self.focus_color = None
 
-    def _update_focus_rect(self, *args):
-        """Update focus rectangle position and size when widget moves/resizes."""
-        if self.focus_rect:
-            self.focus_rect.rectangle = (self.x, self.y, self.width, self.height)
+class FocusableButton(FocusHighlightMixin, Button):
+    """
+    Button with keyboard focus support and visual feedback.
+    Shows a border when focused to indicate it's the active element.
+    """
+    focus = BooleanProperty(False)
 
 
-class FocusableTextInput(TextInput):
+class FocusableTextInput(FocusHighlightMixin, TextInput):
     """
     TextInput with keyboard focus support that doesn't consume Tab key.
     Allows Tab to be used for navigation instead of text insertion.
     """
     # Note: TextInput already has a 'focus' property, so we don't need to add it
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.focus_rect = None
-        self.focus_color = None
-        self.bind(focus=self.on_focus_change)
-
-    def on_focus_change(self, instance, value):
-        """Add visual feedback when input gains/loses focus."""
-        if value:  # Gained focus
-            with self.canvas.after:
-                self.focus_color = Color(0, 0.5, 1, 1)  # Blue focus border
-                self.focus_rect = Line(rectangle=(self.x, self.y, self.width, self.height), width=3)
-            self.bind(pos=self._update_focus_rect, size=self._update_focus_rect)
-        else:  # Lost focus
-            if self.focus_rect:
-                self.canvas.after.remove(self.focus_color)
-                self.canvas.after.remove(self.focus_rect)
-                self.unbind(pos=self._update_focus_rect, size=self._update_focus_rect)
-                self.focus_rect = None
-                self.focus_color = None
-
-    def _update_focus_rect(self, *args):
-        """Update focus rectangle position and size when widget moves/resizes."""
-        if self.focus_rect:
-            self.focus_rect.rectangle = (self.x, self.y, self.width, self.height)
-
     def keyboard_on_key_down(self, window, keycode, text, modifiers):
         """Override to prevent Tab from being consumed by TextInput."""
         key = keycode[1]
@@ -156,75 +175,6 @@ class FocusableTextInput(TextInput):
         return super().keyboard_on_key_down(window, keycode, text, modifiers)
 
 
-class User:
-    """
-    Stores demographic and experience data for a user/rater.
-    User ID is constructed from parent name initials, birthdate, birth year, and siblings.
-    Formula: mother_initials + father_initials + (day+month) + (cross_sum_of_year * (siblings+1))
-    """
-    def __init__(self):
-        self.user_id = ''
-        self.data = {}  # Stores all questionnaire field responses
-        # Legacy fields for backward compatibility
-        self.gender = 'Not specified'
-        self.age = 0
-        self.nationality = ''
-        self.player_exp = 0
-        self.coach_exp = 0
-        self.watch_exp = 0
-        self.license = 'Not specified'
-        # User ID components
-        self.mother_initials = ''  # First two letters of mother's given name
-        self.father_initials = ''  # First two letters of father's given name
-        self.siblings = 0          # Number of siblings
-        self.birth_day = 0         # Day of birth
-        self.birth_month = 0       # Month of birth
-        self.birth_year = 0        # Year of birth
-
-    def _calculate_cross_sum(self, number):
-        """Calculate the cross sum (sum of digits) of a number."""
-        return sum(int(digit) for digit in str(abs(number)))
-
-    def set_user_id(self):
-        """
-        Generate user_id from components.
-        Format: mother_initials + father_initials + (day+month) + (cross_sum_year * (siblings+1))
-        """
-        if not self.mother_initials or not self.father_initials:
-            self.user_id = 'unknown'
-            return
-
-        # Calculate day+month sum
-        date_sum = self.birth_day + self.birth_month
-
-        # Calculate cross sum of birth year
-        year_cross_sum = self._calculate_cross_sum(self.birth_year)
-
-        # Calculate final component: cross_sum * (siblings + 1)
-        sibling_factor = year_cross_sum * (self.siblings + 1)
-
-        # Concatenate all parts
-        self.user_id = f"{self.mother_initials}{self.father_initials}{date_sum}{sibling_factor}"
-
-    def set_user_age(self, age):
-        self.age = age
-
-    def set_player_exp(self, years):
-        self.player_exp = years
-
-    def set_coach_exp(self, years):
-        self.coach_exp = years
-
-    def set_watch_exp(self, years):
-        self.watch_exp = years
-
-    def set_user_license(self, license):
-        self.license = license
-
-    def set_user_gender(self, gender):
-        self.gender = gender
-
-
 class WelcomeScreen(Screen):
     """Initial welcome screen of the app with keyboard support."""
 
@@ -300,18 +250,11 @@ class LoginScreen(Screen):
         """Handle user_id input and check if it exists in user_data."""
         self.user_id_input = value.lower()  # Convert to lowercase
 
-        # Check if user_data file exists for this user_id
+        # Check if ratings exist for this user_id (rescan: other stations may share the folder)
         if self.user_id_input:
-            try:
-                user_data_files = os.listdir('user_data')
-                user_ratings_files = os.listdir('user_ratings')
-                # Check if any file starts with this user_id followed by underscore
-                self.user_id_exists = any(
-                    f.startswith(f"{self.user_id_input}_")
-                    for f in user_ratings_files
-                )
-            except FileNotFoundError:
-                self.user_id_exists = False
+            rating_store = App.get_running_app().rating_store
+            rating_store.refresh()
+            self.user_id_exists = rating_store.user_exists(self.user_id_input)
         else:
             self.user_id_exists = False
 
@@ -483,46 +426,29 @@ class QuestionnaireScreen(Screen):
         self._keyboard_bound = False
         self.field_configs = []  # Will store active field configurations
         self.field_widgets = {}  # Will store references to field widgets
+        self._sized_widgets = []  # (widget, height offset) pairs sized from row_height
+        self._font_widgets = []  # Widgets whose font size follows the screen height
+        self._form_focus_order = None  # Cached focus order of the form panel
+        # Resize handling is debounced: the layout is updated once the height settles
+        self._layout_trigger = Clock.create_trigger(self.update_form_layout, 0.15)
 
         # Load configuration from YAML file
         try:
-            with open('config/config.yaml', 'r') as file:
-                config_data = yaml.safe_load(file)
-
-            # Load questionnaire fields from external file
-            questionnaire_file = config_data['settings'].get('questionnaire_fields_file', 'config/questionnaire_fields.yaml')
-            try:
-                with open(questionnaire_file, 'r') as file:
-                    all_fields = yaml.safe_load(file)
-                    if all_fields is None:
-                        all_fields = []
-            except FileNotFoundError:
-                print(f"[WARNING] {questionnaire_file} not found, using empty questionnaire fields")
-                all_fields = []
+            config_data = load_config()
 
-            # Filter only active fields
-            self.field_configs = [field for field in all_fields if field.get('active', False)]
+            # Load active questionnaire fields from external file
+            self.field_configs = load_questionnaire_fields(config_data)
 
         except FileNotFoundError:
             print("[ERROR] config.yaml file not found.")
         except KeyError as e:
             print(f"[ERROR] Missing key in config.yaml: {e}.")
 
-    def build_questionnaire_form(self):
+    def _count_form_rows(self):
         """
-        Dynamically build questionnaire form widgets based on configuration.
-        Called after the .kv file is loaded to populate the form_container.
-        Calculates optimal widget heights to fill available screen space.
+        Count total number of rows in the form
+        (accounts for grouped fields being in one row).
         """
-        if 'form_container' not in self.ids:
-            print("[ERROR] form_container not found in .kv file")
-            return
-
-        container = self.ids.form_container
-        container.clear_widgets()
-
-        # Count total number of rows we'll create
-        # (accounts for grouped fields being in one row)
         num_rows = 0
         processed_groups = set()
         for field_config in self.field_configs:
@@ -533,17 +459,49 @@ class QuestionnaireScreen(Screen):
                     processed_groups.add(group)
             else:
                 num_rows += 1
+        return num_rows
 
-        # Calculate optimal row height
-        # Available space = screen height - header (48dp) - nav buttons (60dp) - padding
-        # Minimum row height = 55dp for readability
-        # Maximum row height = 80dp to prevent excessive spacing
+    def _compute_row_height(self):
+        """
+        Calculate optimal row height
+        Available space = screen height - header (48dp) - nav buttons (60dp) - padding
+        Minimum row height = 55dp for readability
+        Maximum row height = 80dp to prevent excessive spacing
+        """
+        num_rows = self._count_form_rows()
         if num_rows > 0:
             available_height = self.height - 48 - 60 - 40  # header, buttons, padding
             calculated_height = available_height / num_rows
-            row_height = max(55, min(80, calculated_height))
-        else:
-            row_height = 60
+            return max(55, min(80, calculated_height))
+        return 60
+
+    def _add_sized(self, widget, offset=0):
+        """Register a widget whose height is row_height - offset."""
+        self._sized_widgets.append((widget, offset))
+        return widget
+
+    def _add_scaled_font(self, widget):
+        """Register a widget whose font size is screen height / 45."""
+        self._font_widgets.append(widget)
+        return widget
+
+    def build_questionnaire_form(self):
+        """
+        Dynamically build questionnaire form widgets based on configuration.
+        Called once after the .kv file is loaded to populate the form_container.
+        Row heights and font sizes are set by update_form_layout, which
+        also runs when the screen height changes.
+        """
+        if 'form_container' not in self.ids:
+            print("[ERROR] form_container not found in .kv file")
+            return
+
+        container = self.ids.form_container
+        container.clear_widgets()
+        self.field_widgets = {}
+        self._sized_widgets = []
+        self._font_widgets = []
+        self._form_focus_order = None
 
         for idx, field_config in enumerate(self.field_configs):
             field_type = field_config.get('type', 'text')
@@ -555,17 +513,16 @@ class QuestionnaireScreen(Screen):
 
             if field_type == 'multiple_choice':
                 # Create a row with label and toggle buttons
-                row = BoxLayout(size_hint_y=None, height=row_height, spacing=10, padding=[5, 5])
+                row = self._add_sized(BoxLayout(size_hint_y=None, spacing=10, padding=[5, 5]))
 
                 if title:
-                    label = Label(
+                    label = self._add_scaled_font(Label(
                         text=title,
-                        font_size=self.height/45,
                         size_hint_x=0.4,
                         halign='right',
                         valign='middle',
                         text_size=(None, None)
-                    )
+                    ))
                     label.bind(size=lambda inst, val: setattr(inst, 'text_size', (inst.width, inst.height)))
                     row.add_widget(label)
 
@@ -577,10 +534,7 @@ class QuestionnaireScreen(Screen):
 
                 self.field_widgets[field_name] = []
                 for option in options:
-                    btn = FocusableToggleButton(
-                        text=str(option),
-                        font_size=self.height/45
-                    )
+                    btn = self._add_scaled_font(FocusableToggleButton(text=str(option)))
                     btn.group = group_name
                     btn.bind(state=lambda inst, val, fn=field_name, opt=option:
                             self._set_field_value(fn, opt) if val == 'down' else None)
@@ -597,19 +551,18 @@ class QuestionnaireScreen(Screen):
                     group_key = f'group_row_{group}'
                     if group_key not in self.field_widgets:
                         # Create new group row
-                        row = BoxLayout(size_hint_y=None, height=row_height, spacing=5, padding=[5, 5])
+                        row = self._add_sized(BoxLayout(size_hint_y=None, spacing=5, padding=[5, 5]))
 
                         # Find the first field in this group to get the title
                         first_field = next((f for f in self.field_configs if f.get('group') == group and f.get('title')), None)
                         if first_field and first_field.get('title'):
-                            label = Label(
+                            label = self._add_scaled_font(Label(
                                 text=first_field.get('title'),
-                                font_size=self.height/45,
                                 size_hint_x=0.25,
                                 halign='right',
                                 valign='middle',
                                 text_size=(None, None)
-                            )
+                            ))
                             label.bind(size=lambda inst, val: setattr(inst, 'text_size', (inst.width, inst.height)))
                             row.add_widget(label)
 
@@ -619,13 +572,12 @@ class QuestionnaireScreen(Screen):
                         row = self.field_widgets[group_key]
 
                     # Add input to group row
-                    text_input = FocusableTextInput(
+                    text_input = self._add_scaled_font(FocusableTextInput(
                         hint_text=hint_text,
-                        font_size=self.height/45,
                         multiline=False,
                         input_filter='int' if field_type == 'numeric' else None,
                         padding=[10, 5]  # Minimal vertical padding
-                    )
+                    ))
                     if max_length:
                         text_input.bind(text=lambda inst, val, ml=max_length:
                                       setattr(inst, 'text', val[:ml]) if len(val) > ml else None)
@@ -635,16 +587,14 @@ class QuestionnaireScreen(Screen):
                     row.add_widget(text_input)
                     self.field_widgets[field_name] = text_input
                 else:
-                    # Single text input
-                    text_input = FocusableTextInput(
+                    # Single text input, slightly smaller than the row to account for padding
+                    text_input = self._add_sized(self._add_scaled_font(FocusableTextInput(
                         hint_text=hint_text,
-                        font_size=self.height/45,
                         size_hint_y=None,
-                        height=row_height - 10,  # Slightly smaller to account for padding
                         multiline=False,
                         input_filter='int' if field_type == 'numeric' else None,
                         padding=[10, 5]  # Minimal vertical padding
-                    )
+                    )), offset=10)
                     if max_length:
                         text_input.bind(text=lambda inst, val, ml=max_length:
                                       setattr(inst, 'text', val[:ml]) if len(val) > ml else None)
@@ -654,6 +604,17 @@ class QuestionnaireScreen(Screen):
                     container.add_widget(text_input)
                     self.field_widgets[field_name] = text_input
 
+        self.update_form_layout()
+
+    def update_form_layout(self, *args):
+        """Apply row heights and font sizes for the current screen height to the existing form."""
+        row_height = self._compute_row_height()
+        font_size = self.height / 45
+        for widget, offset in self._sized_widgets:
+            widget.height = row_height - offset
+        for widget in self._font_widgets:
+            widget.font_size = font_size
+
     def _set_field_value(self, field_name, value):
         """Set the value for a specific field and update User object."""
         user = App.get_running_app().user
@@ -711,13 +672,11 @@ class QuestionnaireScreen(Screen):
             Window.bind(on_key_down=self._on_keyboard_down)
             self._keyboard_bound = True
 
-        # Build form on first entry or when height changes
+        # Build form on first entry; later height changes only resize it
         if not hasattr(self, '_form_built'):
-            # Bind to height changes to rebuild form with correct proportions
             self.bind(height=self._on_height_change)
             self.build_questionnaire_form()
             self._form_built = True
-            self._last_height = self.height
 
         self._build_focus_order()
         print(f"[KEYBOARD NAV] QuestionnaireScreen: Initialized with {len(self.focusable_widgets)} focusable widgets")
@@ -726,17 +685,9 @@ class QuestionnaireScreen(Screen):
             self.set_focus(0)
 
     def _on_height_change(self, instance, height):
-        """Rebuild form when screen height changes significantly."""
-        if not hasattr(self, '_last_height'):
-            self._last_height = height
-            return
-
-        # Only rebuild if height changed significantly (more than 10%)
-        if abs(height - self._last_height) / self._last_height > 0.1:
-            print(f"[INFO] Screen height changed from {self._last_height} to {height}, rebuilding form")
-            self._last_height = height
-            self.build_questionnaire_form()
-            self._build_focus_order()
+        """Resize the form once the screen height has stopped changing."""
+        self._layout_trigger.cancel()
+        self._layout_trigger()
 
     def on_leave(self, *args):
         """Called when leaving screen. Clean up keyboard binding."""
@@ -752,6 +703,11 @@ class QuestionnaireScreen(Screen):
                 self.ids.get('btn_back_to_form'),
                 self.ids.get('btn_proceed_video')
             ]
+            # Filter out None values
+            self.focusable_widgets = [w for w in self.focusable_widgets if w is not None]
+        elif self._form_focus_order is not None:
+            # Form structure unchanged since the order was built
+            self.focusable_widgets = self._form_focus_order
         else:
             # Main form panel - collect all dynamically created widgets
             self.focusable_widgets = []
@@ -777,8 +733,9 @@ class QuestionnaireScreen(Screen):
             if next_btn:
                 self.focusable_widgets.append(next_btn)
 
-        # Filter out None values
-        self.focusable_widgets = [w for w in self.focusable_widgets if w is not None]
+            # Filter out None values
+            self.focusable_widgets = [w for w in self.focusable_widgets if w is not None]
+            self._form_focus_order = self.focusable_widgets
 
     def _on_keyboard_down(self, window, key, scancode, codepoint, modifiers):
         """Handle keyboard input. Called before focused widget receives the key."""
@@ -909,31 +866,12 @@ class QuestionnaireScreen(Screen):
         """
         try:
             user = App.get_running_app().user
-            os.makedirs('user_data', exist_ok=True)
-
             ts = datetime.now().astimezone()
-            filename = f"{user.user_id}.json"
-            path = os.path.join('user_data', filename)
 
             # Build data dict with legacy fields and all dynamic fields
-            data = {
-                'user_id': user.user_id,
-                'gender': user.gender,
-                'age': user.age,
-                'nationality': user.nationality,
-                'license': user.license,
-                'player_exp': user.player_exp,
-                'coach_exp': user.coach_exp,
-                'watch_exp': user.watch_exp,
-                'saved_at': ts.isoformat(timespec='seconds')
-            }
-
-            # Add all dynamic field data
-            data.update(user.data)
-
-            with open(path, 'w') as f:
-                json.dump(data, f, indent=2)
-            print(f"[INFO] User data saved: {filename}")
+            data = user.to_record(ts.isoformat(timespec='seconds'))
+            path = App.get_running_app().rating_store.save_user(data)
+            print(f"[INFO] User data saved: {os.path.basename(path)}")
         except Exception as e:
             print(f"[ERROR] Failed to save user data: {e}")
 
@@ -949,8 +887,6 @@ class VideoPlayerScreen(Screen):
     Displays soccer action videos with customizable rating scales.
     Allows marking actions as "not recognized".
     """
-    # Dynamic rating storage - keys are scale titles, values are the ratings
-    scale_values = DictProperty({})
     action_not_recognized = BooleanProperty(False)
     has_any_rating = BooleanProperty(False)
 
@@ -969,16 +905,37 @@ class VideoPlayerScreen(Screen):
         super().__init__(**kwargs)
         self.index = 0  # Current video index
         self.scale_configs = []  # Will store active scale configurations
+        self.scale_model = RatingScaleModel([])  # Scale configs by title and current values
         self.scale_widgets = {}  # Will store references to scale widget groups
-        self.required_scales = []  # Will store titles of scales that are required
+        self.selected_scale_buttons = {}  # Currently pressed toggle button per discrete scale
+        self._resetting_scales = False  # Suppresses value callbacks while widgets are reset
+        self._pending_slider_values = {}  # Latest slider values not yet applied this frame
+        self._apply_slider_values_trigger = Clock.create_trigger(self._apply_slider_values)
+        self._pitch_image = None  # Persistent pitch image widget
+        self._textures = OrderedDict()  # Bounded LRU of pitch and poster textures by image path
+        self._poster_overlays = {}  # Player -> (Color, Rectangle) drawing the poster frame over it
+        self._first_pixel_event = None  # Deferred first_pixel mark of the shown poster
+        self.poster_dir = 'cache/posters'
+        self.clip_timer = ClipTimer()  # Timestamps of load, first frame, first interaction and submit
+        self.frame_monitor = FramePacingMonitor()  # Frame intervals and stalls of the current clip
+        self._ui_frame_event = None
         self.video_has_played = False  # Track if current video has played once (for "once" mode)
 
+        self.videos = []  # Rating queue of clip filenames for the current user
+        self._queue_user_id = None  # User the current queue was built for
+        self.path_videos = ''
+        self.assignment = None
+        self.metadata_provider = MetadataProvider('')
+        self.pitch_cache = PitchImageCache('cache/pitch')
+        self.clip_cache = None  # Local copies of upcoming clips (clip_cache section of config.yaml)
+        self.decoder = None  # Decoder options of both video players (decoder section of config.yaml)
+        self.prefetch_count = 0
+
         try:
             # Load configuration from YAML file
-            with open('config/config.yaml', 'r') as file:
-                config_data = yaml.safe_load(file)
+            config_data = load_config()
 
-            db_path = config_data['paths']['db_path']
+            db_path = config_data['paths'].get('db_path', '')
             self.path_videos = config_data['paths']['video_path']
             min_ratings_per_video = config_data['settings']['min_ratings_per_video']
 
@@ -994,86 +951,75 @@ class VideoPlayerScreen(Screen):
             self.control_buttons_height = screen_dims.get('control_buttons_height', 0.08)
             self.rating_scales_height = screen_dims.get('rating_scales_height', 0.28)
 
-            # Load rating scales from external file
-            rating_scales_file = config_data['settings'].get('rating_scales_file', 'config/rating_scales.yaml')
-            try:
-                with open(rating_scales_file, 'r') as file:
-                    all_scales = yaml.safe_load(file)
-                    if all_scales is None:
-                        all_scales = []
-            except FileNotFoundError:
-                print(f"[WARNING] {rating_scales_file} not found, using empty rating scales")
-                all_scales = []
-
-            # Filter only active scales
-            self.scale_configs = [scale for scale in all_scales if scale.get('active', False)]
-
-            # Track which scales are required for proceeding
-            # Default to required if not specified
-            self.required_scales = [
-                scale.get('title') for scale in self.scale_configs
-                if scale.get('required_to_proceed', True)
-            ]
+            # Load active rating scales from external file
+            self.scale_configs = load_rating_scales(config_data)
 
-            # Initialize scale_values dictionary with None for each active scale
-            for scale in self.scale_configs:
-                self.scale_values[scale['title']] = None
+            # Index scales by title and track which are required for proceeding
+            self.scale_model = RatingScaleModel(self.scale_configs)
+
+            # Adaptive sampling: retire clips whose ratings have converged
+            adaptive_settings = load_adaptive_settings(config_data)
+            convergence = None
+            if adaptive_settings['enabled']:
+                convergence = ConvergenceTracker.from_settings(self.scale_configs, adaptive_settings)
+
+            self.catalogue = VideoCatalogue(self.path_videos)
+            self.assignment = AssignmentEngine(
+                self.catalogue, App.get_running_app().rating_store, min_ratings_per_video,
+                convergence=convergence, plan_dir=config_data['paths'].get('plan_dir')
+            )
+            self.metadata_provider = MetadataProvider(db_path, config_data['paths'].get('metadata_snapshot'))
+            self.pitch_cache = PitchImageCache(config_data['paths'].get('pitch_cache_path', 'cache/pitch'))
+            self.poster_dir = config_data['paths'].get('poster_cache_path', 'cache/posters')
+
+            # Mirror upcoming clips from slow drives onto local disk
+            clip_cache_settings = load_clip_cache_settings(config_data)
+            if clip_cache_settings['enabled']:
+                self.clip_cache = ClipCache.from_settings(clip_cache_settings)
+                self.prefetch_count = clip_cache_settings['prefetch_count']
+
+            # Decoder options for both video players
+            try:
+                self.decoder = DecoderProfile(decoder_profile(load_decoder_settings(config_data)))
+                self.decoder.install()
+            except ValueError as e:
+                print(f"[ERROR] {e}; using the default decoder options.")
 
         except FileNotFoundError:
             print("[ERROR] config.yaml file not found.")
         except KeyError as e:
             print(f"[ERROR] Missing key in config.yaml: {e}.")
 
-        # Get list of all MP4 files in the video directory
-        try:
-            all_videos = [f for f in os.listdir(self.path_videos) if f.lower().endswith('.mp4')]
-        except FileNotFoundError:
-            print(f"[ERROR] Video directory not found: {self.path_videos}")
-            all_videos = []
+    @property
+    def scale_values(self):
+        """Current rating values, keyed by scale title."""
+        return self.scale_model.values
 
-        
-        user_id = App.get_running_app().user.user_id or 'unknown'
-        
-        # Get list of videos already rated by this user
-        videos_rated_by_user = [f.replace('.json', '').replace(user_id+'_', '') for f in os.listdir('user_ratings') if user_id+'_' in f]
-        # Filter out already rated videos
-        unrated_videos = [v for v in all_videos if v.replace('.mp4', '') not in videos_rated_by_user]
-        
-        # count number of ratings per id
-        rated_ids = [f.split('_')[1].replace('.json', '') for f in os.listdir('user_ratings') if f.endswith('.json')]
-        rating_counts = pd.Series(rated_ids).value_counts()
-        
-        # get ids with more than N ratings
-        videos_fullyrated = rating_counts[rating_counts >= min_ratings_per_video].index.tolist()
-
-        self.videos = [v for v in unrated_videos if v.replace('.mp4', '') not in videos_fullyrated]
-                    
-        # Shuffle videos for randomization (currently disabled for pilot phase)
-        random.shuffle(self.videos)
-
-        # Load metadata from DuckDB database
-        try:
-            conn = duckdb.connect(db_path)
+    @property
+    def required_scales(self):
+        """Titles of the scales that must be rated to proceed."""
+        return self.scale_model.required
 
-            # Convert list of video filenames to event IDs (removing .mp4 extension)
-            event_id_str = ', '.join(f"'{event_id.replace('.mp4', '')}'" for event_id in self.videos)
+    @property
+    def metadata(self):
+        """Metadata DataFrame for the clips in the current queue."""
+        return self.metadata_provider.metadata
 
-            # Fetch metadata for all actions from included videos
-            if event_id_str:  # Prevents empty "IN ()" clause
-                query = f"SELECT * FROM events WHERE id IN ({event_id_str})"
-                df_actions = conn.execute(query).fetchdf()
-            else:
-                # Create empty DataFrame with expected columns if no videos found
-                df_actions = pd.DataFrame(columns=["id", "team", "player", "jersey_number", "type", "body_part", "start_x", "start_y", "end_x", "end_y"])
+    def build_queue(self):
+        """
+        Build the rating queue for the current user and load metadata for its clips.
+        The queue is rebuilt whenever a different user enters the screen.
+        """
+        user_id = App.get_running_app().user.user_id or 'unknown'
+        if user_id == self._queue_user_id:
+            return
 
-            self.metadata = df_actions
+        self.videos = self.assignment.build_queue(user_id) if self.assignment else []
+        self.index = 0
+        self._queue_user_id = user_id
 
-            # Close database connection to prevent resource leak
-            conn.close()
-        except Exception as e:
-            print(f"[ERROR] Failed to load metadata from database: {e}")
-            # Create empty DataFrame as fallback
-            self.metadata = pd.DataFrame(columns=["id", "team", "player", "jersey_number", "type", "body_part", "start_x", "start_y", "end_x", "end_y"])
+        # Load metadata from the snapshot or the DuckDB database
+        self.metadata_provider.load(action_id_from_filename(v) for v in self.videos)
 
     def build_rating_scales(self):
         """
@@ -1145,7 +1091,7 @@ class VideoPlayerScreen(Screen):
                         group=group_name
                     )
                     btn.bind(state=lambda inst, val, t=title, v=value:
-                            self.set_scale_value(t, v) if val == 'down' else None)
+                            self._on_scale_button_state(t, v, inst, val))
                     scale_widget_box.add_widget(btn)
                     self.scale_widgets[title].append(btn)
 
@@ -1157,11 +1103,11 @@ class VideoPlayerScreen(Screen):
                 slider = Slider(
                     min=slider_min,
                     max=slider_max,
-                    value=(slider_min + slider_max) / 2,
+                    value=self.scale_model.slider_default(title),
                     orientation='horizontal'
                 )
 
-                slider.bind(value=lambda inst, val, t=title: self.set_scale_value(t, val))
+                slider.bind(value=lambda inst, val, t=title: self._queue_slider_value(t, val))
 
                 scale_widget_box.add_widget(slider)
                 self.scale_widgets[title] = [slider]
@@ -1219,18 +1165,53 @@ class VideoPlayerScreen(Screen):
 
             container.add_widget(scale_box)
 
+    def _on_scale_button_state(self, scale_title, value, button, state):
+        """Track the pressed button of a discrete scale and store its value."""
+        if state == 'down':
+            self.selected_scale_buttons[scale_title] = button
+            self.set_scale_value(scale_title, value)
+        elif self.selected_scale_buttons.get(scale_title) is button:
+            del self.selected_scale_buttons[scale_title]
+
+    def _queue_slider_value(self, scale_title, value):
+        """Coalesce slider drag updates: only the last value per frame is applied."""
+        if self._resetting_scales:
+            return
+        self._pending_slider_values[scale_title] = value
+        self._apply_slider_values_trigger()
+
+    def _apply_slider_values(self, *args):
+        """Apply the slider values queued since the last frame."""
+        pending, self._pending_slider_values = self._pending_slider_values, {}
+        for scale_title, value in pending.items():
+            self.set_scale_value(scale_title, value)
+
     def set_scale_value(self, scale_title, value):
         """Set the value for a specific scale and update has_any_rating property."""
-        self.scale_values[scale_title] = value
-        # Update has_any_rating - require only REQUIRED scales to have values
-        # or if action_not_recognized is True
-        if self.action_not_recognized:
-            self.has_any_rating = True
-        else:
-            self.has_any_rating = all(
-                self.scale_values.get(title) is not None and self.scale_values.get(title) != ''
-                for title in self.required_scales
-            )
+        if self._resetting_scales:
+            return
+        self.clip_timer.mark('first_interaction')
+        self.scale_model.set_value(scale_title, value)
+        self.update_has_any_rating()
+
+    def on_video_position(self, position):
+        """
+        On the first frame of the current clip (first position update of the player),
+        record it and hand over from the poster frame to live playback.
+        """
+        if position > 0:
+            # The player updates position and texture together
+            self.frame_monitor.video_frame(position)
+            self.clip_timer.mark('first_frame')
+            self.clip_timer.mark('first_pixel')  # No poster: the first frame is the first pixel
+            self.hide_poster()
+
+    def update_has_any_rating(self):
+        """
+        Update has_any_rating - require only REQUIRED scales to have values
+        or if action_not_recognized is True.
+        """
+        self.has_any_rating = self.action_not_recognized or self.scale_model.required_complete()
 
     def on_enter(self, *args):
         """Called when this screen is displayed. Builds scales and loads the first/next video."""
@@ -1238,7 +1219,16 @@ class VideoPlayerScreen(Screen):
         if not hasattr(self, '_scales_built'):
             self.build_rating_scales()
             self._scales_built = True
+        self.build_queue()
         self.load_video()
+        # Time every UI frame while the video player is shown
+        if self._ui_frame_event is None:
+            self._ui_frame_event = Clock.schedule_interval(self.frame_monitor.ui_frame, 0)
+
+    def on_leave(self, *args):
+        if self._ui_frame_event is not None:
+            self._ui_frame_event.cancel()
+            self._ui_frame_event = None
 
     def previous_video(self, instance):
         """Placeholder for going back to previous video (not implemented)."""
@@ -1275,31 +1265,36 @@ class VideoPlayerScreen(Screen):
         Reset all rating scale widgets to their default state and clear all ratings.
         Called before loading a new video.
         """
-        # Reset each scale based on its type
-        for title, widgets in self.scale_widgets.items():
-            scale_config = next((s for s in self.scale_configs if s['title'] == title), None)
-            if not scale_config:
-                continue
-
-            scale_type = scale_config.get('type', 'discrete')
+        # Reset widgets in one batch; their value callbacks are ignored meanwhile
+        self._resetting_scales = True
+        try:
+            for title, widgets in self.scale_widgets.items():
+                scale_config = self.scale_model.config(title)
+                if not scale_config:
+                    continue
 
-            if scale_type == 'discrete':
-                # Reset all toggle buttons to 'normal' state
-                for btn in widgets:
-                    btn.state = 'normal'
-            elif scale_type == 'slider':
-                # Reset slider to middle value
-                slider = widgets[0]
-                slider_min = scale_config.get('slider_min', 0)
-                slider_max = scale_config.get('slider_max', 100)
-                slider.value = (slider_min + slider_max) / 2
-            elif scale_type == 'text':
-                # Clear text input
-                widgets[0].text = ''
+                scale_type = self.scale_model.scale_type(title)
+
+                if scale_type == 'discrete':
+                    # Only the pressed button of the group needs to be released
+                    btn = self.selected_scale_buttons.pop(title, None)
+                    if btn is not None:
+                        btn.state = 'normal'
+                elif scale_type == 'slider':
+                    # Reset slider to middle value
+                    widgets[0].value = self.scale_model.slider_default(title)
+                elif scale_type == 'text':
+                    # Clear text input
+                    widgets[0].text = ''
+        finally:
+            self._resetting_scales = False
+
+        # Drop slider updates that were queued for the previous clip
+        self._apply_slider_values_trigger.cancel()
+        self._pending_slider_values.clear()
 
         # Reset all scale values to None
-        for title in self.scale_values.keys():
-            self.scale_values[title] = None
+        self.scale_model.reset()
 
         # Reset has_any_rating flag
         self.has_any_rating = False
@@ -1319,9 +1314,12 @@ class VideoPlayerScreen(Screen):
 
     def handle_video_state_change(self, state):
         """
-        Handle video player state changes for "once" playback mode.
-        Prevents video restart after it has played once.
+        Handle video player state changes: pauses and stops end the frame
+        chain of the pacing monitor, so they are not counted as stalls.
+        In "once" playback mode, prevents video restart after it has played once.
         """
+        if state != 'play':
+            self.frame_monitor.break_chain()
         if self.video_playback_mode == 'once':
             # When video starts playing for the first time
             if state == 'play' and not self.video_has_played:
@@ -1333,6 +1331,111 @@ class VideoPlayerScreen(Screen):
             elif state == 'stop' and self.video_has_played:
                 pass  # Video has finished, keep it stopped
 
+    def _swap_video_source(self, path):
+        """
+        Stop the active player and unload the previous clip's decoder
+        before switching to a new source.
+        """
+        player = self.active_video_player
+        player.state = 'stop'
+        # VideoPlayer wraps a Video widget that owns the decoder
+        video = player if isinstance(player, Video) else getattr(player, '_video', None)
+        if video is not None:
+            video.unload()
+        if player.source == path:
+            # Same clip again: force a reload after the unload
+            player.source = ''
+        player.source = path
+
+    @property
+    def pitch_image(self):
+        """Image widget showing the pitch trajectory, created once and reused for every clip."""
+        if self._pitch_image is None:
+            self._pitch_image = KivyImage()
+            self.ids.plot_container.clear_widgets()
+            self.ids.plot_container.add_widget(self._pitch_image)
+        return self._pitch_image
+
+    def _cached_texture(self, image_path):
+        """Return the texture of an image from a bounded LRU cache."""
+        texture = self._textures.pop(image_path, None)
+        if texture is None:
+            with self.frame_monitor.activity('texture_load'):
+                texture = CoreImage(image_path).texture
+            if len(self._textures) >= TEXTURE_CACHE_SIZE:
+                self._textures.popitem(last=False)  # Drop least recently used
+        self._textures[image_path] = texture
+        return texture
+
+    def _poster_overlay(self, player):
+        """Return the (Color, Rectangle) that draws the poster frame over a player, created once per player."""
+        overlay = self._poster_overlays.get(player)
+        if overlay is None:
+            with player.canvas.after:
+                color = Color(1, 1, 1, 0)
+                rect = Rectangle()
+            overlay = self._poster_overlays[player] = (color, rect)
+            self._video_area(player).bind(pos=lambda inst, val, p=player: self._fit_poster(p),
+                                          size=lambda inst, val, p=player: self._fit_poster(p))
+        return overlay
+
+    @staticmethod
+    def _video_area(player):
+        """
+        Return the widget the video frame is drawn in: the area above the control
+        bar of a VideoPlayer (its inner Video is only laid out there once the first
+        frame arrives), the widget itself for a plain Video.
+        """
+        return getattr(player, 'container', None) or player
+
+    def _fit_poster(self, player):
+        """Fit the poster into the video area of the player, keeping its aspect ratio like the video."""
+        color, rect = self._poster_overlays[player]
+        if rect.texture is None:
+            return
+        area = self._video_area(player)
+        texture_width, texture_height = rect.texture.size
+        scale = min(area.width / texture_width, area.height / texture_height)
+        width, height = texture_width * scale, texture_height * scale
+        rect.size = (width, height)
+        rect.pos = (area.center_x - width / 2, area.center_y - height / 2)
+
+    def show_poster(self, action_id):
+        """
+        Show the pre-extracted first frame of a clip over the player until the
+        decoder delivers the first frame (see utils/extract_posters.py).
+        """
+        color, rect = self._poster_overlay(self.active_video_player)
+        poster_path = os.path.join(self.poster_dir, f"{action_id}.jpg")
+        if not os.path.exists(poster_path):
+            color.a = 0
+            return
+        rect.texture = self._cached_texture(poster_path)
+        self._fit_poster(self.active_video_player)
+        color.a = 1
+        # The poster is on screen once the next frame has been drawn (cancelled if the clip changes first)
+        self._first_pixel_event = Clock.schedule_once(lambda dt: self.clip_timer.mark('first_pixel'))
+
+    def hide_poster(self):
+        overlay = self._poster_overlays.get(self.active_video_player)
+        if overlay is not None:
+            overlay[0].a = 0
+
+    def clip_path(self, index):
+        """
+        Return the path to play the clip at a queue position from: the local
+        copy if it is cached, otherwise the source. Also queues the following
+        clips (not this one, which may be playing from the source) for mirroring
+        into the clip cache.
+        """
+        source_path = self.catalogue.path_for(self.videos[index])
+        if self.clip_cache is None:
+            return source_path
+        local_path = self.clip_cache.local_path(source_path)
+        upcoming = self.videos[index + 1:index + 1 + self.prefetch_count]
+        self.clip_cache.prefetch(self.catalogue.path_for(v) for v in upcoming)
+        return local_path or source_path
+
     def load_video(self):
         """
         Load the next unrated video for the current user.
@@ -1341,29 +1444,38 @@ class VideoPlayerScreen(Screen):
         """
         while self.index < len(self.videos):
             video_file = self.videos[self.index]
-            action_id = os.path.splitext(os.path.basename(video_file))[0]
+            action_id = action_id_from_filename(video_file)
 
-            # Load video and start playback
-            self.active_video_player.source = os.path.join(self.path_videos, video_file)
+            # Release the previous clip's decoder, then load video and start playback
+            if self.decoder is not None:
+                self.decoder.output_height = int(self.active_video_player.height)
+            self._swap_video_source(self.clip_path(self.index))
             self.video_has_played = False  # Reset flag for new video
             self.active_video_player.state = 'play'
+            if self._first_pixel_event is not None:
+                self._first_pixel_event.cancel()  # Belongs to the previous clip's poster
+                self._first_pixel_event = None
+            self.clip_timer.start()
+            self.frame_monitor.start_clip()
+            self.show_poster(action_id)
 
             # Load and display metadata for this action
             self.action_id = action_id
-            row = self.metadata[self.metadata['id'] == str(self.action_id)]
+            App.get_running_app().profiler.set_tag(action_id=action_id)
+            row = self.metadata_provider.lookup(self.action_id)
 
-            if not row.empty:
-                self.ids.team_label.text = str(row.team.values[0])
-                self.ids.player_label.text = str(row.player.values[0])
-                self.ids.jerseynumber_label.text = f"Number: {str(row.jersey_number.values[0])}"
-                self.ids.type_label.text = str(row.type.values[0])
+            if row is not None:
+                self.ids.team_label.text = str(row.get('team'))
+                self.ids.player_label.text = str(row.get('player'))
+                self.ids.jerseynumber_label.text = f"Number: {str(row.get('jersey_number'))}"
+                self.ids.type_label.text = str(row.get('type'))
 
-                self.ids.bodypart_label.text = str(row.bodypart.values[0]) 
+                self.ids.bodypart_label.text = str(row.get('bodypart'))
                 # Store trajectory coordinates as instance variables
-                self.start_x = row.start_x.values[0]
-                self.start_y = row.start_y.values[0]
-                self.end_x = row.end_x.values[0]
-                self.end_y = row.end_y.values[0]
+                self.start_x = row.get('start_x')
+                self.start_y = row.get('start_y')
+                self.end_x = row.get('end_x')
+                self.end_y = row.get('end_y')
             else:
                 # Display placeholder text if no metadata found
                 self.ids.team_label.text = 'No Team'
@@ -1372,44 +1484,18 @@ class VideoPlayerScreen(Screen):
                 self.ids.bodypart_label.text = ''
 
                 # Default coordinates if no metadata
-                self.start_x = 10
-                self.start_y = 10
-                self.end_x = 90
-                self.end_y = 10
-
-            # Clear previous plot
-            self.ids.plot_container.clear_widgets()
-
-            # Create pitch and draw trajectory
-            pitch = mplsoccer.Pitch(pitch_type="statsbomb", pitch_color="grass")
-            fig, ax = pitch.draw(figsize=(6, 4))
-
-            # Make figure background transparent/black
-            fig.patch.set_facecolor('black')
-            fig.patch.set_alpha(1)
-
-            # Draw arrow from start to end position
-            pitch.arrows(self.start_x, self.start_y, self.end_x, self.end_y,
-                        ax=ax, color="blue", width=2, headwidth=10, headlength=5)
-
-            # Optionally add markers at start and end
-            ax.plot(self.start_x, self.start_y, 'o', color='blue', markersize=10, label='Start')
-
-            # Remove white padding
-            fig.tight_layout(pad=0)
-            fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
+                self.start_x, self.start_y, self.end_x, self.end_y = DEFAULT_TRAJECTORY
 
-            # Save figure to BytesIO buffer as PNG
-            buf = BytesIO()
-            fig.savefig(buf, format='png', dpi=100, bbox_inches='tight', pad_inches=0)
-            buf.seek(0)
+            # Load pre-rendered trajectory image from the pitch cache (rendered on a miss)
+            with self.frame_monitor.activity('pitch_render'):
+                try:
+                    image_path = self.pitch_cache.render(self.start_x, self.start_y, self.end_x, self.end_y)
+                except Exception as e:
+                    print(f"[ERROR] Failed to render pitch for {action_id}: {e}")
+                    image_path = self.pitch_cache.render(*DEFAULT_TRAJECTORY)
 
-            # Create Kivy Image from buffer
-            core_image = CoreImage(buf, ext='png')
-            kivy_image = KivyImage(texture=core_image.texture)
-            self.ids.plot_container.add_widget(kivy_image)
-
-            plt.close(fig)  # Prevent memory leak
+            # Show it in the persistent pitch image widget
+            self.pitch_image.texture = self._cached_texture(image_path)
 
             self.reset_scales()
             self.ids.submit_button.opacity = 1
@@ -1427,11 +1513,11 @@ class VideoPlayerScreen(Screen):
         Save the current ratings to a JSON file and load the next video.
         Validates that all ratings are provided or 'not recognized' is checked.
         """
+        # Apply slider moves from the current frame before validating
+        self._apply_slider_values()
+
         # Check if ALL scales have values (not None and not empty string)
-        has_all_ratings = all(
-            value is not None and value != ''
-            for value in self.scale_values.values()
-        )
+        has_all_ratings = self.scale_model.all_complete()
 
         # Block submission if not all ratings given and action not marked as unrecognized
         if not has_all_ratings and not self.action_not_recognized:
@@ -1443,25 +1529,30 @@ class VideoPlayerScreen(Screen):
             return
 
         try:
-            os.makedirs('user_ratings', exist_ok=True)
+            app = App.get_running_app()
+            user_id = app.user.user_id
+            self.clip_timer.mark('submitted')
 
             # Build rating data with dynamic scale values
             rating_data = {
-                'user_id': App.get_running_app().user.user_id,
+                'user_id': user_id,
                 'id': self.action_id,
+                'session_id': app.screen_log.session_id,
                 'action_not_recognized': self.action_not_recognized
             }
 
             # Add each scale's value to the rating data
             for title, value in self.scale_values.items():
                 # Use title as key (sanitized for JSON compatibility)
-                key = title.lower().replace(' ', '_')
-                rating_data[key] = value
+                rating_data[scale_key(title)] = value
+
+            # Add timestamps for dwell-time analytics and the playback quality
+            rating_data.update(self.clip_timer.to_record())
+            rating_data.update(self.frame_monitor.summary())
 
             # Save rating data to a JSON file named: {user_id}_{action_id}.json
-            filename = os.path.join('user_ratings', f"{App.get_running_app().user.user_id}_{self.action_id}.json")
-            with open(filename, 'w') as f:
-                json.dump(rating_data, f, indent=2)
+            with self.frame_monitor.activity('rating_write'):
+                app.rating_store.save_rating(user_id, self.action_id, rating_data)
 
             # Print ratings for debugging
             ratings_str = ', '.join(f"{title}: {value}" for title, value in self.scale_values.items())
@@ -1487,6 +1578,9 @@ class RatingApp(App):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.user = User()  # Create a User instance shared across all screens
+        self.rating_store = RatingStore()  # Rating/user persistence shared across all screens
+        self.screen_log = ScreenLog()  # Screen transition times of this session
+        self.profiler = SamplingProfiler()  # Started by RATING_APP_PROFILE=1 or F9
 
     def build(self):
         """Build and return the main screen manager with all screens."""
@@ -1497,16 +1591,55 @@ class RatingApp(App):
         screen_manager.add_widget(QuestionnaireScreen(name="questionnaire"))
         screen_manager.add_widget(VideoPlayerScreen(name="videoplayer"))
 
+        screen_manager.bind(current=self.on_screen_change)
+        self.on_screen_change(screen_manager, screen_manager.current)
+        Window.bind(on_key_down=self._on_keyboard_down)
+        if PROFILE:
+            self.profiler.start()
         return screen_manager
 
+    def _on_keyboard_down(self, window, key, scancode, codepoint, modifiers):
+        """F9 starts or stops the sampling profiler on any screen."""
+        from kivy.core.window import Keyboard
+        if Keyboard.keycode_to_string(Window._system_keyboard, key) != 'f9':
+            return False
+        running = self.profiler.toggle()
+        print(f"[INFO] Profiler {'started' if running else 'stopped'} ({self.profiler.samples} samples)")
+        return True
+
+    def on_screen_change(self, screen_manager, screen_name):
+        """Record a screen transition and write the session log."""
+        self.profiler.set_tag(screen=screen_name, action_id='')
+        self.screen_log.enter(screen_name, self.user.user_id)
+        self.save_screen_log()
+
+    def save_screen_log(self):
+        try:
+            self.rating_store.save_session(self.screen_log.to_record())
+        except OSError as e:
+            print(f"[ERROR] Failed to save session log: {e}")
+
     def on_stop(self):
         """
         Called when the application is terminated.
-        Triggers the write_ratings2csv script to export data and create log file.
+        Records the session end and runs the export of write_ratings2csv
+        to write the CSV files and the log file.
         """
+        clip_cache = self.root.get_screen('videoplayer').clip_cache if self.root else None
+        if clip_cache is not None:
+            clip_cache.shutdown()
+            self.screen_log.summary['clip_cache'] = clip_cache.stats()
+            print(f"[INFO] Clip cache: {clip_cache.stats()}")
+        self.screen_log.enter('closed', self.user.user_id)
+        self.save_screen_log()
+        self.profiler.stop()
+        if self.profiler.samples:
+            path = self.profiler.write(PROFILE_DIR, self.screen_log.session_id)
+            print(f"[INFO] Profile: {path} ({self.profiler.samples} samples)")
         try:
-            import utils.write_ratings2csv
+            from utils.write_ratings2csv import run_export
             print("[INFO] Exporting ratings and generating log file...")
+            run_export()
         except Exception as e:
             print(f"[ERROR] Failed to run write_ratings2csv: {e}")
 
@@ -0,0 +1,33 @@
+"""
+UI-free core of the Creativity Rating App.
+Catalogue, metadata, rating persistence, queue assignment and export,
+shared by the Kivy screens and the command-line tools in utils/.
+"""
+
+from core.assignment import AssignmentEngine
+from core.catalogue import VideoCatalogue, action_id_from_filename
+from core.config import (load_config, load_questionnaire_fields,
+                         load_rating_scales, scale_key)
+from core.export import Exporter, load_json_files_with_datetime
+from core.metadata import METADATA_COLUMNS, MetadataProvider
+from core.ratings import RatingStore, parse_rating_filename
+from core.scales import RatingScaleModel
+from core.users import User
+
+__all__ = [
+    'AssignmentEngine',
+    'Exporter',
+    'METADATA_COLUMNS',
+    'MetadataProvider',
+    'RatingScaleModel',
+    'RatingStore',
+    'User',
+    'VideoCatalogue',
+    'action_id_from_filename',
+    'load_config',
+    'load_json_files_with_datetime',
+    'load_questionnaire_fields',
+    'load_rating_scales',
+    'parse_rating_filename',
+    'scale_key',
+]
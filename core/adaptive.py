@@ -0,0 +1,131 @@
+"""
+Adaptive sampling: running per-clip rating statistics used to decide which
+clips still need ratings. Clips whose confidence interval is still wide are
+queued first; clips whose estimates have stabilised are retired.
+"""
+
+import math
+from collections import Counter, defaultdict
+from statistics import NormalDist
+
+from core.config import scale_key
+from core.scales import scale_range
+
+# Defaults for the adaptive_sampling section of config.yaml
+DEFAULT_SETTINGS = {
+    'enabled': False,         # Use adaptive sampling instead of min_ratings_per_video
+    'min_ratings': 3,         # Ratings a clip gets before it can be retired
+    'max_ratings': 10,        # Ratings after which a clip is retired regardless
+    'confidence': 0.95,       # Confidence level of the interval
+    'target_ci_width': 0.1,   # Retire when every scale's CI half-width is below this fraction of its range
+}
+
+
+def load_adaptive_settings(config_data):
+    """Return the adaptive_sampling settings merged with the defaults."""
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(config_data.get('adaptive_sampling') or {})
+    return settings
+
+
+class RunningStats:
+    """Running count, mean and variance of a series (Welford's algorithm)."""
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        """Sample variance (NaN for fewer than two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+
+class ConvergenceTracker:
+    """
+    Tracks the running mean and variance of every numeric scale per clip.
+    The width of a clip's estimate is the largest confidence interval
+    half-width over its scales, relative to the range of the scale, so
+    discrete and slider scales are comparable. Optional scales only count
+    once they have values, since raters may leave them out.
+    """
+    def __init__(self, scale_configs, min_ratings=3, max_ratings=10, confidence=0.95, target_ci_width=0.1):
+        self.spans = {}
+        self.optional = set()  # Keys of scales that are not required to proceed
+        for scale in scale_configs:
+            bounds = scale_range(scale)
+            if bounds is not None and bounds[1] > bounds[0]:
+                self.spans[scale_key(scale['title'])] = bounds[1] - bounds[0]
+                if not scale.get('required_to_proceed', True):
+                    self.optional.add(scale_key(scale['title']))
+        self.min_ratings = min_ratings
+        self.max_ratings = max_ratings
+        self.target_ci_width = target_ci_width
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.counts = Counter()  # Ratings per action, including "not recognized"
+        self.stats = defaultdict(dict)  # action_id -> scale key -> RunningStats
+        self._position = 0  # Position in the rating store's key log already added
+
+    @classmethod
+    def from_settings(cls, scale_configs, settings):
+        return cls(scale_configs, settings['min_ratings'], settings['max_ratings'],
+                   settings['confidence'], settings['target_ci_width'])
+
+    def add_rating(self, action_id, rating_data):
+        """Add the scale values of one rating record."""
+        self.counts[action_id] += 1
+        if rating_data.get('action_not_recognized'):
+            return
+        for key in self.spans:
+            value = rating_data.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.stats[action_id].setdefault(key, RunningStats()).add(value)
+
+    def update(self, store):
+        """Add ratings stored since the last update (only new files are read)."""
+        keys, self._position = store.rating_keys_since(self._position)
+        for user_id, action_id in keys:
+            try:
+                self.add_rating(action_id, store.load_rating(user_id, action_id))
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Skipping unreadable rating {user_id}_{action_id}: {e}")
+
+    def ci_width(self, action_id):
+        """
+        Return the largest CI half-width over the scales as a fraction of the scale range.
+        Optional scales with fewer than two values are left out. Infinite while a
+        required scale has fewer than two values or no scale has two values.
+        """
+        stats = self.stats.get(action_id, {})
+        width = None
+        for key, span in self.spans.items():
+            scale_stats = stats.get(key)
+            if scale_stats is None or scale_stats.count < 2:
+                if key in self.optional:
+                    continue
+                return math.inf
+            half_width = self.z * math.sqrt(scale_stats.variance / scale_stats.count)
+            width = max(width or 0.0, half_width / span)
+        return math.inf if width is None else width
+
+    def is_retired(self, action_id):
+        """Return True if a clip needs no more ratings."""
+        count = self.counts[action_id]
+        if count >= self.max_ratings:
+            return True
+        return count >= self.min_ratings and self.ci_width(action_id) <= self.target_ci_width
+
+    def priority(self, action_id):
+        """
+        Sort key for the queue (higher first): clips below min_ratings first,
+        then clips with the widest confidence interval.
+        """
+        return self.counts[action_id] < self.min_ratings, self.ci_width(action_id)
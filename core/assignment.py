@@ -0,0 +1,83 @@
+"""
+Assignment of clips to raters.
+"""
+
+import random
+
+from core.catalogue import action_id_from_filename
+from core.planner import load_plan
+
+
+class AssignmentEngine:
+    """
+    Builds the per-user rating queue from the video catalogue and the rating store.
+    A clip is queued for a user if the user has not rated it yet and it has
+    fewer than min_ratings_per_video ratings in total.
+
+    With a ConvergenceTracker (adaptive sampling), a clip is queued until its
+    estimates have stabilised instead, and clips with the widest confidence
+    interval come first.
+
+    With a plan_dir (planned studies, see core/planner.py), a user with an
+    allocation plan gets the planned clips in the planned order instead.
+    """
+    def __init__(self, catalogue, store, min_ratings_per_video, shuffle=True, rng=None, convergence=None,
+                 plan_dir=None):
+        self.catalogue = catalogue
+        self.store = store
+        self.min_ratings_per_video = min_ratings_per_video
+        self.shuffle = shuffle
+        self.rng = rng or random.Random()
+        self.convergence = convergence
+        self.plan_dir = plan_dir
+        self.planned_users = set()  # Users whose queue comes from an allocation plan
+
+    def build_queue(self, user_id):
+        """Return the list of clip filenames the user should rate next."""
+        if self.plan_dir:
+            plan = load_plan(self.plan_dir, user_id)
+            if plan is not None:
+                self.planned_users.add(user_id)
+                return self.build_planned_queue(user_id, plan)
+        if self.convergence is not None:
+            return self.build_adaptive_queue(user_id)
+
+        videos_rated_by_user = self.store.rated_by_user(user_id)
+        rating_counts = self.store.rating_counts()
+
+        videos = [
+            v for v in self.catalogue.list_videos()
+            if action_id_from_filename(v) not in videos_rated_by_user
+            and rating_counts.get(action_id_from_filename(v), 0) < self.min_ratings_per_video
+        ]
+
+        # Shuffle videos for randomization
+        if self.shuffle:
+            self.rng.shuffle(videos)
+        return videos
+
+    def build_planned_queue(self, user_id, plan):
+        """Return the planned clips the user has not rated yet, in plan order."""
+        videos_rated_by_user = self.store.rated_by_user(user_id)
+        available = set(self.catalogue.list_videos())
+        return [
+            v for v in plan
+            if v in available and action_id_from_filename(v) not in videos_rated_by_user
+        ]
+
+    def build_adaptive_queue(self, user_id):
+        """Return the clips that are not retired yet, widest confidence interval first."""
+        videos_rated_by_user = self.store.rated_by_user(user_id)
+        self.convergence.update(self.store)
+
+        videos = [
+            v for v in self.catalogue.list_videos()
+            if action_id_from_filename(v) not in videos_rated_by_user
+            and not self.convergence.is_retired(action_id_from_filename(v))
+        ]
+
+        # Shuffle first so clips with equal priority stay in random order (the sort is stable)
+        if self.shuffle:
+            self.rng.shuffle(videos)
+        videos.sort(key=lambda v: self.convergence.priority(action_id_from_filename(v)), reverse=True)
+        return videos
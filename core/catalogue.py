@@ -0,0 +1,103 @@
+"""
+Video catalogue: the set of clips available for rating in video_path.
+"""
+
+import json
+import os
+
+# Catalogue file written by the conversion tools into the video directory
+CATALOGUE_FILENAME = 'catalogue.json'
+
+
+def action_id_from_filename(filename):
+    """Return the action id encoded in a clip filename (basename without extension)."""
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def write_catalogue(video_path, entries):
+    """
+    Write catalogue.json into video_path.
+    Each entry is a dict with at least 'filename' and 'action_id'.
+    """
+    entries = sorted(entries, key=lambda e: e['filename'])
+    path = os.path.join(video_path, CATALOGUE_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'clips': entries}, f, indent=2)
+    os.replace(tmp_path, path)
+    # The rename updates the directory mtime; stamp the catalogue after it so it counts as current
+    os.utime(path)
+    return path
+
+
+def catalogue_is_current(video_path):
+    """
+    Return True if catalogue.json is at least as new as the video directory,
+    i.e. no clip was added, removed or renamed since it was written.
+    """
+    try:
+        return os.stat(os.path.join(video_path, CATALOGUE_FILENAME)).st_mtime >= os.stat(video_path).st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def read_catalogue(video_path):
+    """Return the catalogue entries in video_path, or None if there is no catalogue."""
+    path = os.path.join(video_path, CATALOGUE_FILENAME)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get('clips', [])
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, AttributeError) as e:
+        print(f"[WARNING] Ignoring unreadable catalogue {path}: {e}")
+        return None
+
+
+class VideoCatalogue:
+    """
+    Lists the .mp4 clips in a video directory.
+    Each clip's filename (without extension) is the action id it shows.
+    If the directory contains a catalogue.json (written by the conversion tools)
+    that is newer than the directory, the clip list is read from it instead of
+    scanning the directory. Otherwise the directory is scanned.
+    """
+    def __init__(self, video_path):
+        self.video_path = video_path
+        self._videos = None
+
+    def list_videos(self, refresh=False):
+        """Return the sorted list of .mp4 filenames in the video directory."""
+        if self._videos is None or refresh:
+            entries = read_catalogue(self.video_path)
+            listed = None
+            if entries is not None:
+                listed = sorted(e['filename'] for e in entries if e['filename'].lower().endswith('.mp4'))
+            if listed is not None and catalogue_is_current(self.video_path):
+                self._videos = listed
+            else:
+                try:
+                    self._videos = sorted(f for f in os.listdir(self.video_path) if f.lower().endswith('.mp4'))
+                except FileNotFoundError:
+                    print(f"[ERROR] Video directory not found: {self.video_path}")
+                    self._videos = []
+                if listed is not None:
+                    self._report_stale(listed)
+        return list(self._videos)
+
+    def _report_stale(self, listed):
+        """Log how an outdated catalogue.json differs from the directory."""
+        added = set(self._videos) - set(listed)
+        missing = set(listed) - set(self._videos)
+        if added or missing:
+            print(f"[WARNING] {CATALOGUE_FILENAME} in {self.video_path} is out of date "
+                  f"({len(added)} clips not listed, {len(missing)} listed clips missing); "
+                  f"using the directory. Rerun the conversion tool to update it.")
+
+    def action_ids(self):
+        """Return the action ids of all clips in the catalogue."""
+        return [action_id_from_filename(f) for f in self.list_videos()]
+
+    def path_for(self, video_file):
+        """Return the full path of a clip in the catalogue."""
+        return os.path.join(self.video_path, video_file)
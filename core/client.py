@@ -0,0 +1,82 @@
+"""
+Client for the rating server (core/server.py), used by the load generator
+and usable by any front end, e.g. the Kivy app on a thin station.
+"""
+
+import http.client
+import json
+from urllib.parse import quote, urlsplit
+
+
+class RatingClientError(RuntimeError):
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class RatingClient:
+    """
+    Talks to a rating server over one persistent HTTP/1.1 connection.
+    Not thread-safe: use one client per thread.
+    """
+    def __init__(self, base_url, timeout=30):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = timeout
+        self._conn = None
+
+    def _request(self, method, path, body=None, headers=None):
+        """Send a request and return (status, response headers, body bytes)."""
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request(method, path, body=body, headers=headers or {})
+                response = self._conn.getresponse()
+                return response.status, dict(response.getheaders()), response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed the keep-alive connection: reconnect once
+                self.close()
+                if attempt:
+                    raise
+
+    def _json(self, method, path, data=None):
+        body = json.dumps(data).encode('utf-8') if data is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else None
+        status, _, payload = self._request(method, path, body, headers)
+        result = json.loads(payload) if payload else None
+        if status >= 400:
+            raise RatingClientError(status, (result or {}).get('error', ''))
+        return result
+
+    def scales(self):
+        """Return the active rating scale configurations."""
+        return self._json('GET', '/api/scales')
+
+    def next_clip(self, user_id):
+        """Return the next clip record for a rater, or None when the rater is done."""
+        clip = self._json('GET', f"/api/next?user_id={quote(user_id)}")
+        return None if clip.get('done') else clip
+
+    def submit(self, rating_data):
+        """Store a rating (dict with user_id, id and scale values)."""
+        return self._json('POST', '/api/ratings', rating_data)
+
+    def status(self):
+        return self._json('GET', '/api/status')
+
+    def fetch(self, path, start=None, end=None):
+        """Return the bytes of a video or image URL path, optionally only the byte range start..end."""
+        headers = {}
+        if start is not None:
+            headers['Range'] = f"bytes={start}-{'' if end is None else end}"
+        status, _, payload = self._request('GET', path, headers=headers)
+        if status >= 400:
+            raise RatingClientError(status, path)
+        return payload
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,172 @@
+"""
+Local clip cache: mirrors upcoming clips from a slow video_path (e.g. an
+external USB drive) onto local disk in the background, so the player opens
+the fast local copy. The cache has a size cap with least-recently-used eviction.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Defaults for the clip_cache section of config.yaml
+DEFAULT_SETTINGS = {
+    'enabled': False,          # Mirror upcoming clips onto local disk
+    'path': 'cache/clips',     # Local cache folder
+    'max_size_gb': 5,          # Size cap; least recently used clips are evicted
+    'prefetch_count': 5,       # Number of upcoming queued clips to mirror
+}
+
+
+def load_clip_cache_settings(config_data):
+    """Return the clip_cache settings merged with the defaults."""
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(config_data.get('clip_cache') or {})
+    return settings
+
+
+class ClipCache:
+    """
+    Size-capped LRU cache of clip files on local disk.
+    Cached files are named after a hash of the source path, size and mtime,
+    so a changed source clip is fetched again. Copies and all access to the
+    source drive run on one background thread; lookups only consult the
+    in-memory index, so they never touch the slow drive or wait for a copy.
+    The clip last returned by local_path (the one playing) is never evicted.
+    """
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # cache filename -> size, least recently used first
+        self._pending = set()  # Cache filenames being copied
+        self._sources = {}  # Source path -> cache filename, resolved by the copy thread
+        self._pinned = None  # Cache filename last returned by local_path
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._load_existing()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings['path'], int(settings['max_size_gb'] * 2**30))
+
+    def _load_existing(self):
+        """Index clips cached by earlier sessions, oldest access first."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        for filename in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, filename)
+            if filename.endswith('.part'):
+                os.remove(path)  # Interrupted copy
+            elif os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_atime, filename, stat.st_size))
+        for _, filename, size in sorted(files):
+            self._entries[filename] = size
+        self._evict()  # max_size_gb may have been lowered since
+
+    def _cache_name(self, source_path):
+        """
+        Return the cache filename of a source clip (stats the source once per session).
+        Only called on the copy thread.
+        """
+        with self._lock:
+            name = self._sources.get(source_path)
+        if name is None:
+            stat = os.stat(source_path)
+            digest = hashlib.sha1(f"{os.path.abspath(source_path)}:{stat.st_size}:{stat.st_mtime}".encode())
+            name = f"{digest.hexdigest()[:16]}_{os.path.basename(source_path)}"
+            with self._lock:
+                self._sources[source_path] = name
+        return name
+
+    @property
+    def size(self):
+        """Total bytes of the cached clips."""
+        with self._lock:
+            return sum(self._entries.values())
+
+    def local_path(self, source_path):
+        """
+        Return the local copy of a clip if it is cached (counted as a hit),
+        otherwise None (counted as a miss). Clips the copy thread has not seen
+        yet count as misses; the source drive is not accessed.
+        """
+        with self._lock:
+            name = self._sources.get(source_path)
+            if name is not None and name in self._entries:
+                self._entries.move_to_end(name)
+                self._pinned = name
+                self.hits += 1
+                return os.path.join(self.cache_dir, name)
+            self.misses += 1
+        return None
+
+    def prefetch(self, source_paths):
+        """Queue copies of clips that are not cached yet (returns immediately)."""
+        for source_path in source_paths:
+            self._executor.submit(self._copy, source_path)
+
+    def _copy(self, source_path):
+        try:
+            name = self._cache_name(source_path)
+            with self._lock:
+                if name in self._entries or name in self._pending:
+                    return
+                self._pending.add(name)
+            path = os.path.join(self.cache_dir, name)
+            try:
+                shutil.copyfile(source_path, f"{path}.part")
+                os.replace(f"{path}.part", path)
+                size = os.path.getsize(path)
+                with self._lock:
+                    self._entries[name] = size
+                    self._evict()
+            finally:
+                with self._lock:
+                    self._pending.discard(name)
+        except OSError as e:
+            print(f"[WARNING] Failed to cache clip {source_path}: {e}")
+
+    def _evict(self):
+        """
+        Remove least recently used clips until the cache fits max_bytes (lock held),
+        skipping the pinned clip.
+        """
+        total = sum(self._entries.values())
+        for name in list(self._entries):
+            if total <= self.max_bytes or len(self._entries) <= 1:
+                break
+            if name == self._pinned:
+                continue
+            size = self._entries.pop(name)
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss counters and the cache size, for sizing the cache."""
+        with self._lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+            cached_clips, size = len(self._entries), sum(self._entries.values())
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 3) if lookups else None,
+            'evictions': evictions,
+            'cached_clips': cached_clips,
+            'cached_mb': round(size / 2**20, 1),
+            'max_mb': round(self.max_bytes / 2**20, 1),
+        }
+
+    def shutdown(self):
+        """Stop the background copies (pending copies are dropped)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,49 @@
+"""
+Configuration loading for the Creativity Rating App.
+Reads config/config.yaml and the external questionnaire and rating scale files.
+"""
+
+import yaml
+
+CONFIG_PATH = 'config/config.yaml'
+DEFAULT_QUESTIONNAIRE_FILE = 'config/questionnaire_fields.yaml'
+DEFAULT_RATING_SCALES_FILE = 'config/rating_scales.yaml'
+
+
+def load_config(path=CONFIG_PATH):
+    """Load the main configuration file and return it as a dict."""
+    with open(path, 'r') as file:
+        return yaml.safe_load(file) or {}
+
+
+def load_yaml_list(path, description='entries'):
+    """
+    Load a YAML file containing a list of entries.
+    Returns an empty list if the file is missing or empty.
+    """
+    try:
+        with open(path, 'r') as file:
+            entries = yaml.safe_load(file)
+    except FileNotFoundError:
+        print(f"[WARNING] {path} not found, using empty {description}")
+        return []
+    return entries if entries is not None else []
+
+
+def load_rating_scales(config_data):
+    """Return the active rating scale configurations referenced by config_data."""
+    path = config_data['settings'].get('rating_scales_file', DEFAULT_RATING_SCALES_FILE)
+    all_scales = load_yaml_list(path, 'rating scales')
+    return [scale for scale in all_scales if scale.get('active', False)]
+
+
+def load_questionnaire_fields(config_data):
+    """Return the active questionnaire field configurations referenced by config_data."""
+    path = config_data['settings'].get('questionnaire_fields_file', DEFAULT_QUESTIONNAIRE_FILE)
+    all_fields = load_yaml_list(path, 'questionnaire fields')
+    return [field for field in all_fields if field.get('active', False)]
+
+
+def scale_key(title):
+    """Return the JSON key under which a scale's value is stored in rating files."""
+    return title.lower().replace(' ', '_')
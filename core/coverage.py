@@ -0,0 +1,133 @@
+"""
+Incrementally maintained rating coverage for the coordinator dashboard.
+
+The index is seeded once from the rating files and then follows the rating
+index logs (user_ratings/.rating_index/{station}.jsonl, appended by
+RatingStore on every save) from the last read offsets. A refresh therefore
+costs time proportional to the ratings saved since the previous refresh (plus
+a listing of the small log folder), not to all stored ratings.
+
+Each station appends to its own log, so stations sharing a ratings folder on a
+network share do not interleave lines. Lines that still cannot be parsed are
+skipped and counted; their ratings are picked up by the next full scan (a
+restart of the dashboard).
+"""
+
+import bisect
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from core.ratings import RATING_INDEX_DIR, parse_rating_filename
+
+# Window for the per-rater throughput figure
+THROUGHPUT_WINDOW = 3600
+
+
+class CoverageIndex:
+    """
+    Ratings per clip, the clip count per number of ratings (coverage histogram),
+    the ratings still needed to reach min_ratings on every clip and the rating
+    times of every rater, all updated per rating.
+    """
+    def __init__(self, ratings_dir, action_ids, min_ratings):
+        self.ratings_dir = ratings_dir
+        self.index_dir = os.path.join(ratings_dir, RATING_INDEX_DIR)
+        self.action_ids = {str(a) for a in action_ids}
+        self.min_ratings = min_ratings
+        self.keys = set()  # (user_id, action_id) pairs already counted
+        self.counts = Counter()  # Action id -> ratings
+        self.histogram = Counter({0: len(self.action_ids)})  # Ratings -> clips in the catalogue
+        self.remaining = len(self.action_ids) * min_ratings
+        self.rater_times = defaultdict(list)  # User id -> sorted save times
+        self.offsets = {}  # Log filename -> bytes read so far
+        self.skipped_lines = 0  # Unparseable log lines (their ratings are counted on the next start)
+        self._seed()
+
+    def _add(self, user_id, action_id, saved_at):
+        """Count one rating; returns False for a rating that was already counted (e.g. redone)."""
+        key = (user_id, action_id)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        bisect.insort(self.rater_times[user_id], saved_at)
+        count = self.counts[action_id]
+        self.counts[action_id] = count + 1
+        if action_id in self.action_ids:
+            self.histogram[count] -= 1
+            self.histogram[count + 1] += 1
+            if count < self.min_ratings:
+                self.remaining -= 1
+        return True
+
+    def _seed(self):
+        """Count the stored rating files once (the only full scan)."""
+        # Lines appended during the scan are read again by update() and skipped as duplicates
+        for filename in self._log_files():
+            try:
+                self.offsets[filename] = os.path.getsize(os.path.join(self.index_dir, filename))
+            except OSError:
+                pass
+        try:
+            entries = list(os.scandir(self.ratings_dir))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            key = parse_rating_filename(entry.name)
+            if key is not None:
+                self._add(*key, entry.stat().st_mtime)
+
+    def _log_files(self):
+        try:
+            return [f for f in os.listdir(self.index_dir) if f.endswith('.jsonl')]
+        except FileNotFoundError:
+            return []
+
+    def update(self):
+        """Count the ratings appended to the index logs since the last update; returns how many."""
+        added = 0
+        for filename in self._log_files():
+            try:
+                with open(os.path.join(self.index_dir, filename), 'rb') as f:
+                    f.seek(self.offsets.get(filename, 0))
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            complete = data.rfind(b'\n') + 1  # A line being written is read on the next update
+            self.offsets[filename] = self.offsets.get(filename, 0) + complete
+            for line in data[:complete].splitlines():
+                try:
+                    record = json.loads(line)
+                    added += self._add(record['user_id'], record['id'], record['saved_at'])
+                except (ValueError, KeyError, TypeError):
+                    self.skipped_lines += 1
+        return added
+
+    def summary(self, now=None):
+        """Return the dashboard figures (cost proportional to raters and histogram bins)."""
+        now = now or time.time()
+        raters = []
+        for user_id, times in self.rater_times.items():
+            raters.append({
+                'user_id': user_id,
+                'ratings': len(times),
+                'last_hour': len(times) - bisect.bisect_left(times, now - THROUGHPUT_WINDOW),
+                'last_rating': datetime.fromtimestamp(times[-1]).isoformat(timespec='seconds'),
+            })
+        raters.sort(key=lambda r: (r['last_hour'], r['last_rating']), reverse=True)
+
+        clips = len(self.action_ids)
+        return {
+            'updated_at': datetime.fromtimestamp(now).isoformat(timespec='seconds'),
+            'clips': clips,
+            'min_ratings': self.min_ratings,
+            'complete_clips': sum(n for count, n in self.histogram.items() if count >= self.min_ratings),
+            'remaining_ratings': self.remaining,
+            'skipped_lines': self.skipped_lines,
+            'progress': round(1 - self.remaining / (clips * self.min_ratings), 4) if clips and self.min_ratings else 1.0,
+            'histogram': [{'ratings': count, 'clips': self.histogram[count]}
+                          for count in range(max(self.histogram, default=0) + 1)],
+            'raters': raters,
+        }
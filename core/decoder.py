@@ -0,0 +1,85 @@
+"""
+Decoder profiles for video playback: the ffpyplayer options the video player
+uses (decoder threads, frame dropping, output pixel format, scaling to the
+player size), configured in the decoder section of config.yaml.
+
+The same profile can be expressed as FFmpeg command line options, which
+utils/benchmark_decoder.py uses to measure the decode throughput of each
+profile with the decoders ffpyplayer is built on.
+"""
+
+# Defaults for the decoder section of config.yaml
+DEFAULT_SETTINGS = {
+    'profile': 'default',        # Name of the active profile
+    'profiles': {'default': {}},
+}
+
+# Options of a profile; None keeps the ffpyplayer default
+PROFILE_DEFAULTS = {
+    'threads': None,             # Decoder threads, 0 = one per core
+    'framedrop': None,           # Drop late frames instead of falling behind
+    'pixel_format': None,        # Output pixel format: 'rgba' or 'yuv420p' (default: yuv420p
+                                 # for yuv420p clips, rgba otherwise)
+    'scale_to_widget': False,    # Scale frames to the player height while decoding
+}
+
+# Output formats the Kivy ffpyplayer provider can display
+PIXEL_FORMATS = ('rgba', 'yuv420p')
+
+
+def load_decoder_settings(config_data):
+    """Return the decoder settings merged with the defaults."""
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(config_data.get('decoder') or {})
+    return settings
+
+
+def decoder_profile(settings, name=None):
+    """
+    Return the options of a profile (the active one by default) merged with
+    PROFILE_DEFAULTS. Raises ValueError for unknown profiles or options.
+    """
+    name = name or settings['profile']
+    profiles = settings.get('profiles') or {}
+    if name not in profiles:
+        raise ValueError(f"Unknown decoder profile '{name}' (available: {', '.join(profiles)})")
+    options = profiles[name] or {}
+    unknown = set(options) - set(PROFILE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown options in decoder profile '{name}': {', '.join(sorted(unknown))}")
+    profile = dict(PROFILE_DEFAULTS, **options)
+    if profile['pixel_format'] not in (None,) + PIXEL_FORMATS:
+        raise ValueError(f"pixel_format of decoder profile '{name}' must be one of {', '.join(PIXEL_FORMATS)}")
+    return profile
+
+
+def ffpyplayer_options(profile):
+    """
+    Return (ff_opts, lib_opts) for ffpyplayer's MediaPlayer. The pixel format
+    is not included: the video provider chooses out_fmt itself and must know it.
+    """
+    ff_opts = {}
+    lib_opts = {}
+    if profile['framedrop'] is not None:
+        ff_opts['framedrop'] = bool(profile['framedrop'])
+    if profile['threads'] is not None:
+        lib_opts['threads'] = str(profile['threads']) if profile['threads'] else 'auto'
+    return ff_opts, lib_opts
+
+
+def ffmpeg_args(profile, height=None):
+    """
+    Return (input options, output options) that make the ffmpeg command line
+    decode like the profile: decoder threads, conversion to the output pixel
+    format and, with scale_to_widget, scaling to height. Without a pixel format
+    frames stay in the decoder's format, like yuv420p clips in the player.
+    """
+    input_args = []
+    if profile['threads'] is not None:
+        input_args += ['-threads', profile['threads']]
+    filters = []
+    if profile['scale_to_widget'] and height:
+        filters.append(f"scale=-2:{height}")
+    if profile['pixel_format']:
+        filters.append(f"format={profile['pixel_format']}")
+    return input_args, ['-vf', ','.join(filters)] if filters else []
@@ -0,0 +1,479 @@
+"""
+Export of collected ratings and user data to CSV, log file and backup.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from core.config import scale_key
+from core.framepacing import PLAYBACK_COLUMNS
+from core.merge import PACKED_SUFFIX, iter_packed_records
+from core.reliability import reliability_table
+from core.scales import scale_range
+from core.timing import TIMING_COLUMNS
+
+# Columns of a rating record that are not rating scales
+METADATA_COLUMNS = (['user_id', 'id', 'session_id', 'action_not_recognized', 'file_created_at', 'filename']
+                    + TIMING_COLUMNS + PLAYBACK_COLUMNS)
+
+# Dwell durations derived from the rating timestamps: name -> (start column, end column)
+DWELL_DURATIONS = {
+    'time_to_first_pixel': ('t_video_loaded', 't_first_pixel'),
+    'time_to_first_frame': ('t_video_loaded', 't_first_frame'),
+    'time_to_first_interaction': ('t_video_loaded', 't_first_interaction'),
+    'time_to_rate': ('t_video_loaded', 't_submitted'),
+}
+
+
+def _file_records(data, filename, modification_time):
+    """Return the records of one JSON file's content with file_created_at and filename added."""
+    creation_datetime = datetime.fromtimestamp(modification_time)
+
+    # Handle both single dict and list of dicts
+    if isinstance(data, dict):
+        data = [data]
+    elif not isinstance(data, list):
+        data = [{'content': data}]
+
+    # Add metadata to each record
+    for record in data:
+        record['file_created_at'] = creation_datetime
+        record['filename'] = filename
+    return data
+
+
+def iter_json_records(path):
+    """
+    Yield the records of all JSON files in a directory, one file at a time,
+    with file_created_at (file modification time) and filename added.
+    path may also be the packed log of a merged store ({kind}.jsonl, see
+    core/merge.py), which is read line by line.
+    """
+    if path.endswith(PACKED_SUFFIX):
+        for entry in iter_packed_records(path):
+            yield from _file_records(entry['record'], entry['filename'], entry['mtime'])
+        return
+
+    for filename in os.listdir(path):
+        if filename.endswith('.json'):
+            filepath = os.path.join(path, filename)
+
+            # Get file modification time (preserved when copying between machines)
+            modification_time = os.path.getmtime(filepath)
+
+            # Load JSON file
+            with open(filepath, 'r') as f:
+                data = json.load(f)
+
+            yield from _file_records(data, filename, modification_time)
+
+
+def load_json_files_with_datetime(path, file_type='ratings'):
+    """
+    Load all JSON files from a directory and add creation datetime.
+
+    Parameters:
+    - path: directory path containing JSON files
+    - file_type: string to identify the type of data (for column naming)
+
+    Returns:
+    - DataFrame with all records and file_created_at column
+    """
+    return pd.DataFrame(list(iter_json_records(path)))
+
+
+def _smallest_int_dtype(low, high):
+    """Return the smallest nullable integer dtype name holding low..high."""
+    for dtype in ('int8', 'int16', 'int32'):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return 'int64'
+
+
+def scale_dtypes(scale_configs):
+    """
+    Return {scale column: dtype} for the configured scales: the smallest
+    integer type for discrete scales with integer values (value range from
+    rating_scales.yaml), float32 for sliders and non-integer discrete scales.
+    Text scales are not listed.
+    """
+    dtypes = {}
+    for scale in scale_configs or []:
+        bounds = scale_range(scale)
+        if bounds is None:
+            continue
+        values = scale.get('values', []) if scale.get('type', 'discrete') == 'discrete' else []
+        if values and all(float(v).is_integer() for v in values):
+            dtypes[scale_key(scale['title'])] = _smallest_int_dtype(*bounds)
+        else:
+            dtypes[scale_key(scale['title'])] = 'float32'
+    return dtypes
+
+
+def compact_ratings(df_ratings, scale_configs=None):
+    """
+    Return the ratings frame with compact types: categorical user_id, id,
+    session_id and filename, integer scales (nullable, e.g. Int8, if a value is missing),
+    float32 sliders, boolean action_not_recognized and datetime timestamps.
+    Scales without a configuration are stored as float32 if numeric.
+    """
+    df = df_ratings
+    for col in ('user_id', 'id', 'session_id', 'filename'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if 'action_not_recognized' in df.columns:
+        df['action_not_recognized'] = df['action_not_recognized'].fillna(False).astype(bool)
+    for col in TIMING_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in PLAYBACK_COLUMNS:
+        if col in df.columns and col not in ('playback_histogram', 'playback_stall_causes'):
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+
+    dtypes = scale_dtypes(scale_configs)
+    bounds = {scale_key(scale['title']): scale_range(scale) for scale in scale_configs or []}
+    for col in scale_columns_of(df):
+        values = pd.to_numeric(df[col], errors='coerce')
+        if values.isna().all() and df[col].notna().any():
+            continue  # Text scale: keep as is
+        dtype = dtypes.get(col, 'float32')
+        if dtype.startswith('int') and not _fits_int_scale(values, bounds.get(col)):
+            print(f"[WARNING] Scale '{col}' has non-integer values or values outside its configured "
+                  f"range {bounds.get(col)}; stored as float32")
+            dtype = 'float32'
+        if dtype.startswith('int') and values.isna().any():
+            dtype = dtype.capitalize()  # Nullable integer type
+        df[col] = values.astype(dtype)
+    return df
+
+
+def _fits_int_scale(values, bounds):
+    """Return True if all values are integers within bounds, so an integer cast loses nothing."""
+    present = values.dropna()
+    if present.empty:
+        return True
+    if bounds is None or not (present % 1 == 0).all():
+        return False
+    return bounds[0] <= present.min() and present.max() <= bounds[1]
+
+
+def iter_rating_chunks(path, scale_configs=None, chunk_size=10000):
+    """
+    Yield compact rating frames of at most chunk_size records.
+    Only one chunk of raw records is held at a time.
+    """
+    records = []
+    for record in iter_json_records(path):
+        records.append(record)
+        if len(records) >= chunk_size:
+            yield compact_ratings(pd.DataFrame(records), scale_configs)
+            records = []
+    if records:
+        yield compact_ratings(pd.DataFrame(records), scale_configs)
+
+
+def concat_compact(chunks):
+    """
+    Concatenate compact frames, keeping categorical columns categorical.
+    Each categorical column is given the union of the chunks' categories first,
+    so pandas concatenates the codes instead of building object columns.
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame()
+    categorical = []
+    for chunk in chunks:
+        categorical += [col for col in chunk.columns if isinstance(chunk[col].dtype, pd.CategoricalDtype)
+                        and col not in categorical]
+    for col in categorical:
+        categories = union_categoricals([chunk[col] for chunk in chunks if col in chunk.columns],
+                                        sort_categories=True).categories
+        for chunk in chunks:
+            if col in chunk.columns:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+            else:
+                chunk[col] = pd.Categorical([None] * len(chunk), categories=categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_ratings_frame(path, scale_configs=None, chunk_size=None):
+    """
+    Load all rating files as a compact typed frame. With chunk_size, records are
+    read and compacted chunk by chunk, so the raw records are never all in memory.
+    """
+    if chunk_size:
+        return concat_compact(iter_rating_chunks(path, scale_configs, chunk_size))
+    return compact_ratings(load_json_files_with_datetime(path, 'ratings'), scale_configs)
+
+
+def scale_columns_of(df_ratings):
+    """Return the rating scale columns of a ratings frame (all non-metadata columns)."""
+    return [col for col in df_ratings.columns.tolist() if col not in METADATA_COLUMNS]
+
+
+def dropped_frame_ratio(df_ratings):
+    """Return the share of dropped frames of each rating's playback (NaN if not monitored)."""
+    if 'playback_dropped' not in df_ratings.columns:
+        return pd.Series(np.nan, index=df_ratings.index)
+    dropped = df_ratings['playback_dropped'].astype('float64')
+    return dropped / (df_ratings['playback_frames'].astype('float64') + dropped)
+
+
+def filter_playback_quality(df_ratings, max_dropped_ratio):
+    """
+    Return the ratings whose playback dropped at most max_dropped_ratio of the frames.
+    Ratings without playback monitoring are kept.
+    """
+    ratio = dropped_frame_ratio(df_ratings)
+    return df_ratings[~(ratio > max_dropped_ratio)]
+
+
+def aggregate_ratings(df_ratings, scale_columns):
+    """Return per-action rating count, mean and std of each scale."""
+    # Build dynamic aggregation dictionary
+    agg_dict = {}
+
+    # Add count using the first scale column (or 'id' if no scales found)
+    count_column = scale_columns[0] if scale_columns else 'id'
+    agg_dict['num_ratings'] = (count_column, 'count')
+
+    # Add mean and std for each scale column
+    for scale_col in scale_columns:
+        agg_dict[f'mean_{scale_col}'] = (scale_col, 'mean')
+        agg_dict[f'std_{scale_col}'] = (scale_col, 'std')
+
+    # Add mean for action_not_recognized if present
+    if 'action_not_recognized' in df_ratings.columns:
+        agg_dict['mean_action_not_recognized'] = ('action_not_recognized', 'mean')
+
+    return df_ratings.groupby('id', observed=True).agg(**agg_dict).round(3)
+
+
+def rating_durations(df_ratings):
+    """
+    Return a frame with user_id, id, session and the dwell durations (seconds) of every rating.
+    The session is the app session the rating was given in; ratings saved without a
+    session id are grouped by the day they were given.
+    Ratings saved without timestamps get NaN durations. Returns None if no rating has timestamps.
+    """
+    if 't_video_loaded' not in df_ratings.columns:
+        return None
+    times = {
+        col: pd.to_datetime(df_ratings[col], errors='coerce')
+        for col in TIMING_COLUMNS if col in df_ratings.columns
+    }
+    durations = df_ratings[['user_id', 'id']].copy()
+    for name, (start, end) in DWELL_DURATIONS.items():
+        if end in times:
+            durations[name] = (times[end] - times[start]).dt.total_seconds()
+    durations['loaded_at'] = times['t_video_loaded']
+    durations['submitted_at'] = times.get('t_submitted')
+    day = durations['loaded_at'].dt.strftime('%Y-%m-%d')
+    if 'session_id' in df_ratings.columns:
+        durations['session'] = df_ratings['session_id'].astype(object).fillna(day)
+    else:
+        durations['session'] = day
+    return durations
+
+
+def dwell_distribution(durations, by):
+    """Return number of ratings, median and 95th percentile of each dwell duration per group."""
+    columns = [name for name in DWELL_DURATIONS if name in durations.columns]
+    grouped = durations.groupby(by, observed=True)[columns]
+    medians = grouped.median().add_suffix('_median')
+    p95 = grouped.quantile(0.95).add_suffix('_p95')
+    stats = pd.concat([grouped.size().rename('num_ratings'), medians, p95], axis=1)
+    # Keep median and p95 of each duration next to each other
+    ordered = ['num_ratings'] + [f"{name}_{stat}" for name in columns for stat in ('median', 'p95')]
+    return stats[ordered].round(3)
+
+
+def rater_throughput(durations):
+    """
+    Return per-rater dwell distribution plus active time and ratings per hour.
+    Active time is summed over the rater's sessions, so breaks between sessions do not count.
+    """
+    stats = dwell_distribution(durations, 'user_id')
+    sessions = durations.groupby(['user_id', 'session'], observed=True)
+    session_hours = (sessions['submitted_at'].max() - sessions['loaded_at'].min()).dt.total_seconds() / 3600
+    active_hours = session_hours.groupby(level='user_id', observed=True).sum(min_count=1)
+    stats['active_minutes'] = (active_hours * 60).round(1)
+    stats['ratings_per_hour'] = (stats['num_ratings'] / active_hours.where(active_hours > 0)).round(1)
+    return stats
+
+
+def load_screen_transitions(sessions_dir):
+    """Return one row per screen transition from all session logs in sessions_dir (or a packed log)."""
+    rows = []
+    if os.path.exists(sessions_dir):
+        for session in iter_json_records(sessions_dir):
+            for transition in session.get('transitions', []):
+                rows.append(dict(transition, session_id=session.get('session_id')))
+    return pd.DataFrame(rows, columns=['session_id', 'screen', 'user_id', 'entered_at'])
+
+
+def screen_dwell(df_transitions):
+    """
+    Return the time spent per screen: number of visits, median, 95th percentile and total.
+    A visit lasts until the next transition of the same session; the last one is open and ignored.
+    """
+    df = df_transitions.assign(entered_at=pd.to_datetime(df_transitions['entered_at'], errors='coerce'))
+    df = df.sort_values(['session_id', 'entered_at'])
+    left_at = df.groupby('session_id')['entered_at'].shift(-1)
+    df['dwell_s'] = (left_at - df['entered_at']).dt.total_seconds()
+    grouped = df.dropna(subset=['dwell_s']).groupby('screen')['dwell_s']
+    return pd.DataFrame({
+        'num_visits': grouped.size(),
+        'dwell_median': grouped.median(),
+        'dwell_p95': grouped.quantile(0.95),
+        'dwell_total': grouped.sum(),
+    }).round(3)
+
+
+def write_log(log_path, df_ratings, df_users):
+    """Write the export log file with rating statistics."""
+    with open(log_path, 'w') as log_file:
+        log_file.write("=" * 60 + "\n")
+        log_file.write("CREATIVITY RATING APP - DATA EXPORT LOG\n")
+        log_file.write("=" * 60 + "\n")
+        log_file.write(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+        # 1. Number of unique actions rated
+        num_unique_actions = df_ratings['id'].nunique()
+        log_file.write(f"Number of unique actions rated: {num_unique_actions}\n\n")
+
+        # 2. Number of raters involved
+        num_unique_raters = df_users['user_id'].nunique()
+        log_file.write(f"Number of raters involved: {num_unique_raters}\n\n")
+
+        # 3. Value counts of value counts for 'id' in df_ratings
+        # First, count how many times each action ID has been rated
+        id_rating_counts = df_ratings['id'].value_counts()
+        id_rating_counts = id_rating_counts[id_rating_counts > 0]  # Unused categories of a categorical id
+        # Then, count how many IDs have each rating count (e.g., how many IDs rated once, twice, etc.)
+        rating_frequency_distribution = id_rating_counts.value_counts().sort_index()
+
+        log_file.write("Rating frequency distribution:\n")
+        log_file.write("-" * 40 + "\n")
+        log_file.write(f"{'Times Rated':<15} {'Number of Actions':<20}\n")
+        log_file.write("-" * 40 + "\n")
+        for times_rated, num_actions in rating_frequency_distribution.items():
+            log_file.write(f"{times_rated:<15} {num_actions:<20}\n")
+
+        log_file.write("\n" + "=" * 60 + "\n")
+
+
+def backup_json_files(source_dir, backup_dir):
+    """Copy all JSON files from source_dir (or a packed log) into backup_dir."""
+    os.makedirs(backup_dir, exist_ok=True)
+    if os.path.isfile(source_dir):
+        shutil.copy(source_dir, backup_dir)
+        return
+    # copy JSON files instead of moving them
+    for filename in os.listdir(source_dir):
+        if filename.endswith('.json'):
+            shutil.copy(os.path.join(source_dir, filename), os.path.join(backup_dir, filename))
+
+
+class Exporter:
+    """
+    Runs the full export: ratings.csv, mean_ratings.csv, reliability.csv, users.csv,
+    dwell-time statistics, rating_log.txt and a backup copy of all JSON files.
+    n_bootstrap = 0 skips the bootstrap confidence intervals of the reliability statistics.
+    Ratings are loaded as a compact typed frame; scale_configs (active entries of
+    rating_scales.yaml) give the scale types, chunk_size enables chunked loading.
+    With max_dropped_ratio, ratings given on a playback that dropped more than this
+    share of frames are left out of the mean ratings and reliability (ratings.csv keeps them).
+    The ratings, users and sessions folders may also be the packed logs of a merged store.
+    """
+    def __init__(self, ratings_dir='user_ratings/', users_dir='user_data/',
+                 output_dir='output/', backup_dir='backup/', sessions_dir='user_sessions/',
+                 n_bootstrap=1000, bootstrap_workers=None, scale_configs=None, chunk_size=None,
+                 max_dropped_ratio=None):
+        self.ratings_dir = ratings_dir
+        self.users_dir = users_dir
+        self.sessions_dir = sessions_dir
+        self.n_bootstrap = n_bootstrap
+        self.bootstrap_workers = bootstrap_workers
+        self.scale_configs = scale_configs
+        self.chunk_size = chunk_size
+        self.max_dropped_ratio = max_dropped_ratio
+        self.output_dir = output_dir
+        self.backup_dir = backup_dir
+
+    def output_path(self, filename):
+        return os.path.join(self.output_dir, filename)
+
+    def run(self):
+        """Export all data and return (df_ratings, df_mean_ratings, df_users)."""
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Load ratings
+        df_ratings = load_ratings_frame(self.ratings_dir, self.scale_configs, self.chunk_size)
+        df_ratings.to_csv(self.output_path('ratings.csv'))
+        print(f"Loaded {len(df_ratings)} ratings from {df_ratings['filename'].nunique()} files")
+        print(f"Number of rated actions: {df_ratings['id'].nunique()}")
+
+        # Dynamically identify scale columns
+        scale_columns = scale_columns_of(df_ratings)
+        print(f"Detected scale columns: {scale_columns}")
+
+        # Leave out ratings given on a stuttering playback
+        df_valid = df_ratings
+        if self.max_dropped_ratio is not None:
+            df_valid = filter_playback_quality(df_ratings, self.max_dropped_ratio)
+            print(f"[INFO] {len(df_ratings) - len(df_valid)} ratings with more than "
+                  f"{self.max_dropped_ratio:.0%} dropped frames excluded from mean ratings and reliability")
+
+        # Store mean ratings per action
+        df_mean_ratings = aggregate_ratings(df_valid, scale_columns)
+        df_mean_ratings.to_csv(self.output_path('mean_ratings.csv'))
+
+        # Inter-rater reliability per scale
+        df_reliability = reliability_table(df_valid, scale_columns, self.n_bootstrap, self.bootstrap_workers)
+        df_reliability.to_csv(self.output_path('reliability.csv'))
+        print(f"[INFO] Reliability of {len(df_reliability)} scales exported"
+              + (f" ({self.n_bootstrap} bootstrap replicates)" if self.n_bootstrap else ""))
+
+        # Dwell-time statistics per rater, per clip and per screen
+        self.export_dwell_times(df_ratings)
+
+        # Load user data
+        df_users = load_json_files_with_datetime(self.users_dir, 'users')
+        df_users.to_csv(self.output_path('users.csv'))
+        print(f"\nLoaded {len(df_users)} user records from {df_users['filename'].nunique()} files")
+        print(f"Number of unique users: {df_users['user_id'].nunique()}")
+
+        # Generate log file with statistics
+        log_path = self.output_path('rating_log.txt')
+        write_log(log_path, df_ratings, df_users)
+        print(f"\n[INFO] Log file created: {log_path}")
+
+        # backup files to higher level folder
+        backup_json_files(self.users_dir, os.path.join(self.backup_dir, 'user_data'))
+        backup_json_files(self.ratings_dir, os.path.join(self.backup_dir, 'user_ratings'))
+        if os.path.exists(self.sessions_dir):
+            backup_json_files(self.sessions_dir, os.path.join(self.backup_dir, 'user_sessions'))
+        print("\n[INFO] Backup of JSON files completed.")
+
+        return df_ratings, df_mean_ratings, df_users
+
+    def export_dwell_times(self, df_ratings):
+        """Write dwell_per_rater.csv, dwell_per_clip.csv and screen_dwell.csv."""
+        durations = rating_durations(df_ratings)
+        if durations is not None:
+            rater_throughput(durations).to_csv(self.output_path('dwell_per_rater.csv'))
+            dwell_distribution(durations, 'id').to_csv(self.output_path('dwell_per_clip.csv'))
+            timed = durations['time_to_rate'].notna().sum() if 'time_to_rate' in durations else 0
+            print(f"\n[INFO] Dwell times from {timed} timed ratings exported")
+
+        df_transitions = load_screen_transitions(self.sessions_dir)
+        if not df_transitions.empty:
+            screen_dwell(df_transitions).to_csv(self.output_path('screen_dwell.csv'))
@@ -0,0 +1,135 @@
+"""
+Frame-pacing monitor for video playback.
+
+Records when each video frame reaches the screen and how long each UI frame
+took, and which known work (pitch rendering, texture loads, rating writes,
+garbage collection) was running at the same time. The per-clip summary is
+stored with the rating, so ratings given on a stuttering playback can be
+filtered out in the export.
+"""
+
+import gc
+import statistics
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Fields added to every rating record
+PLAYBACK_COLUMNS = ['playback_frames', 'playback_dropped', 'playback_interval_median_ms',
+                    'playback_interval_p95_ms', 'playback_max_stall_ms', 'playback_ui_frame_p95_ms',
+                    'playback_histogram', 'playback_stall_causes']
+
+# Upper bounds (ms) of the frame-interval histogram bins; the last bin is open
+INTERVAL_BINS_MS = (25, 50, 100, 250)
+
+# A frame interval longer than this many nominal frame durations is a stall
+STALL_FACTOR = 1.5
+
+# A position that advances this much (s) more than the wall time since the last frame is a seek
+SEEK_TOLERANCE = 0.5
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class FramePacingMonitor:
+    """
+    Collects the frame timing of the current clip.
+    The nominal frame duration is the median interval between video frames,
+    so clips of any frame rate are handled without reading their metadata.
+    Only intervals between frames of continuous playback are measured: the
+    chain of frames is broken when playback pauses or stops (break_chain)
+    and when the position jumps backwards (loop restart) or ahead (seek).
+    """
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.frames = 0  # Video frames shown
+        self.intervals = []  # (start, duration) of intervals between consecutive frames
+        self.ui_frames = []  # Durations (s) of UI frames
+        self.activities = []  # (name, start, end) of work that may delay frames
+        self._last = None  # (time, position) of the previous frame of the chain
+        self._gc_start = None
+        gc.callbacks.append(self._on_gc)
+
+    def start_clip(self):
+        """Start monitoring a new clip."""
+        self.frames = 0
+        self.intervals = []
+        self.ui_frames = []
+        self.activities = []
+        self._last = None
+
+    def break_chain(self):
+        """Do not measure the interval to the next frame (playback paused, stopped or seeking)."""
+        self._last = None
+
+    def video_frame(self, position=None):
+        """Record that a new video frame (at position seconds into the clip, if known) was shown."""
+        now = self.clock()
+        self.frames += 1
+        if self._last is not None:
+            last_time, last_position = self._last
+            jumped = (position is not None and last_position is not None
+                      and not 0 <= position - last_position <= now - last_time + SEEK_TOLERANCE)
+            if not jumped:
+                self.intervals.append((last_time, now - last_time))
+        self._last = (now, position)
+
+    def ui_frame(self, dt):
+        """Record the duration of a UI frame (Clock callback scheduled every frame)."""
+        self.ui_frames.append(dt)
+
+    @contextmanager
+    def activity(self, name):
+        """Mark a block of work so stalls during it are attributed to it."""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.activities.append((name, start, self.clock()))
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = self.clock()
+        elif self._gc_start is not None:
+            self.activities.append(('gc', self._gc_start, self.clock()))
+            self._gc_start = None
+
+    def summary(self):
+        """Return the playback fields of the current clip (None where nothing was measured)."""
+        intervals = [interval for _, interval in self.intervals]
+        if not intervals:
+            return dict.fromkeys(PLAYBACK_COLUMNS, None) | {'playback_frames': self.frames}
+
+        nominal = statistics.median(intervals)
+        dropped = 0
+        causes = Counter()
+        for start, interval in self.intervals:
+            if interval <= STALL_FACTOR * nominal:
+                continue
+            dropped += max(round(interval / nominal) - 1, 1)
+            end = start + interval
+            overlapping = {name for name, a, b in self.activities if a < end and b > start}
+            causes.update(overlapping or {'unknown'})
+
+        histogram = [0] * (len(INTERVAL_BINS_MS) + 1)
+        for interval in intervals:
+            ms = interval * 1000
+            histogram[next((i for i, bound in enumerate(INTERVAL_BINS_MS) if ms <= bound), -1)] += 1
+
+        return {
+            'playback_frames': self.frames,
+            'playback_dropped': dropped,
+            'playback_interval_median_ms': round(nominal * 1000, 1),
+            'playback_interval_p95_ms': round(_percentile(intervals, 0.95) * 1000, 1),
+            'playback_max_stall_ms': round(max(intervals) * 1000, 1),
+            'playback_ui_frame_p95_ms': round(_percentile(self.ui_frames, 0.95) * 1000, 1) if self.ui_frames else None,
+            'playback_histogram': ' '.join(str(count) for count in histogram),
+            'playback_stall_causes': ' '.join(f"{name}:{count}" for name, count in causes.most_common()),
+        }
+
+    def close(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
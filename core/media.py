@@ -0,0 +1,136 @@
+"""
+Helpers for the FFmpeg media pipelines in utils/: running FFmpeg,
+bounded parallel job execution and build manifests for skip-if-done logic.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class FFmpegError(RuntimeError):
+    """Raised when an FFmpeg or FFprobe invocation fails."""
+
+
+def check_ffmpeg(tools=('ffmpeg',)):
+    """Return True if all given FFmpeg tools are available on PATH."""
+    return all(shutil.which(tool) is not None for tool in tools)
+
+
+def run_ffmpeg(args):
+    """Run ffmpeg with the given arguments, raising FFmpegError on failure."""
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin', '-y'] + [str(a) for a in args]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        error_tail = '\n'.join(result.stderr.strip().splitlines()[-3:])
+        raise FFmpegError(error_tail or f"ffmpeg exited with code {result.returncode}")
+    return result
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Return the SHA-1 hex digest of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_hash(settings):
+    """Return a short hash of a settings dict, used to invalidate outputs when settings change."""
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def default_workers():
+    """Default number of parallel FFmpeg jobs: half the cores, as FFmpeg itself is multithreaded."""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def run_parallel(func, items, workers, label='jobs'):
+    """
+    Run func(item) for every item on a bounded thread pool and print progress.
+    Meant for I/O-bound jobs, e.g. jobs that each spawn their own FFmpeg process.
+    Returns a list of (item, result, error) tuples in completion order.
+    """
+    items = list(items)
+    outcomes = []
+    if not items:
+        return outcomes
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for done, future in enumerate(as_completed(futures), start=1):
+            item = futures[future]
+            try:
+                outcomes.append((item, future.result(), None))
+            except Exception as e:
+                outcomes.append((item, None, e))
+                print(f"  [ERROR] {item}: {e}")
+            elapsed = time.monotonic() - start
+            rate = done / elapsed if elapsed > 0 else 0.0
+            print(f"[{done}/{len(items)}] {label}, {rate:.2f}/s")
+    return outcomes
+
+
+class BuildManifest:
+    """
+    Records, per output file, the source it was built from and the settings used,
+    so unchanged outputs can be skipped on the next run.
+    Sources are compared by mtime and size first and by content hash only if those differ.
+    """
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def is_up_to_date(self, output_path, source_path, settings_digest):
+        """Return True if output_path exists and was built from the current source and settings."""
+        entry = self.entries.get(os.path.basename(output_path))
+        if entry is None or not os.path.exists(output_path):
+            return False
+        if entry.get('settings') != settings_digest:
+            return False
+
+        stat = os.stat(source_path)
+        if entry.get('source_mtime') == stat.st_mtime and entry.get('source_size') == stat.st_size:
+            return True
+
+        # Source was touched: rebuild only if its content actually changed
+        if entry.get('source_hash') == file_hash(source_path):
+            entry['source_mtime'] = stat.st_mtime
+            entry['source_size'] = stat.st_size
+            return True
+        return False
+
+    def record(self, output_path, source_path, settings_digest, **extra):
+        """Store the build information for an output file."""
+        stat = os.stat(source_path)
+        entry = {
+            'source': os.path.abspath(source_path),
+            'source_mtime': stat.st_mtime,
+            'source_size': stat.st_size,
+            'source_hash': file_hash(source_path),
+            'settings': settings_digest,
+        }
+        entry.update(extra)
+        self.entries[os.path.basename(output_path)] = entry
+
+    def get(self, output_path):
+        """Return the manifest entry for an output file, or None."""
+        return self.entries.get(os.path.basename(output_path))
+
+    def save(self):
+        """Write the manifest atomically."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,353 @@
+"""
+Merging of the rating data of several lab stations into one store.
+
+Every station produces user_ratings/, user_data/ and user_sessions/ folders
+(or an archive of them, or packed segments, see core/segments.py). The merged
+store packs the records of each kind into one append-only JSON-lines log,
+{kind}.jsonl, instead of one file per record:
+
+    {"filename": ..., "mtime": ..., "record": {...}}
+
+merge_index.json records the content hash and the log offset of the current
+version of every record, and the signature of every ingested source file. A
+changed record is appended and its index entry moved to the new line, so
+superseded lines are skipped when the log is read (iter_packed_records, used
+by the export). Files already ingested unchanged are skipped without being
+read, so the runtime of a rerun is dominated by new data.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import tarfile
+import time
+import zipfile
+
+from core.media import run_parallel
+from core.segments import is_segment, iter_segment
+
+# Folders of a station that are merged
+DATA_KINDS = ('user_ratings', 'user_data', 'user_sessions')
+
+# Kinds whose records may legitimately share a filename across stations (kept side by side)
+APPEND_KINDS = ('user_sessions',)
+
+INDEX_FILENAME = 'merge_index.json'
+CONFLICTS_FILENAME = 'merge_conflicts.csv'
+PACKED_SUFFIX = '.jsonl'
+
+_MISSING = object()
+
+
+def packed_log_path(store_dir, kind):
+    """Return the path of the packed log holding the records of a kind."""
+    return os.path.join(store_dir, f"{kind}{PACKED_SUFFIX}")
+
+
+def iter_packed_records(log_path):
+    """
+    Yield the current version of every record in a packed log as
+    {'filename', 'mtime', 'record'}, in log order, reading line by line.
+    Lines not referenced by merge_index.json (superseded versions, or lines
+    of an interrupted merge) are skipped.
+    """
+    store_dir, name = os.path.split(log_path)
+    kind = name[:-len(PACKED_SUFFIX)]
+    with open(os.path.join(store_dir, INDEX_FILENAME), 'r') as f:
+        records = json.load(f).get('records', {})
+    live = {entry['offset'] for key, entry in records.items() if key.startswith(f"{kind}/") and 'offset' in entry}
+    offset = 0
+    with open(log_path, 'rb') as f:
+        for line in f:
+            if offset in live:
+                yield json.loads(line)
+            offset += len(line)
+
+
+def content_hash(record):
+    """Return the SHA-1 of a JSON record in canonical form (sorted keys, no whitespace)."""
+    canonical = json.dumps(record, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def _kind_of(member_path):
+    """Return (kind, filename) for a path like '.../user_ratings/x.json', or None."""
+    parts = member_path.replace('\\', '/').split('/')
+    if len(parts) >= 2 and parts[-2] in DATA_KINDS and parts[-1].endswith('.json'):
+        return parts[-2], parts[-1]
+    return None
+
+
+class SourceFile:
+    """One JSON file of a station source, read lazily."""
+    def __init__(self, kind, filename, origin, mtime, size, read):
+        self.kind = kind
+        self.filename = filename
+        self.origin = origin  # Source path (and archive member) for reports
+        self.mtime = mtime
+        self.size = size
+        self.read = read  # Function returning the file's bytes
+
+
+def list_source_files(source):
+    """Return the SourceFiles of a station folder or a .zip/.tar(.gz) archive (segments are streamed, see merge)."""
+    files = []
+    if os.path.isdir(source):
+        for kind in DATA_KINDS:
+            folder = os.path.join(source, kind)
+            if not os.path.isdir(folder):
+                continue
+            for filename in sorted(os.listdir(folder)):
+                if filename.endswith('.json'):
+                    path = os.path.join(folder, filename)
+                    stat = os.stat(path)
+                    files.append(SourceFile(kind, filename, path, stat.st_mtime, stat.st_size,
+                                            lambda p=path: open(p, 'rb').read()))
+    elif zipfile.is_zipfile(source):
+        archive = zipfile.ZipFile(source)
+        for info in sorted(archive.infolist(), key=lambda i: i.filename):
+            kind_file = _kind_of(info.filename)
+            if kind_file is not None and not info.is_dir():
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                files.append(SourceFile(*kind_file, f"{source}:{info.filename}", mtime, info.file_size,
+                                        lambda i=info: archive.read(i)))
+    elif tarfile.is_tarfile(source):
+        archive = tarfile.open(source)
+        for member in sorted(archive.getmembers(), key=lambda m: m.name):
+            kind_file = _kind_of(member.name)
+            if kind_file is not None and member.isfile():
+                files.append(SourceFile(*kind_file, f"{source}:{member.name}", member.mtime, member.size,
+                                        lambda m=member: archive.extractfile(m).read()))
+    else:
+        raise ValueError(f"{source} is neither a station folder nor a zip/tar archive")
+    return files
+
+
+class StationMerger:
+    """
+    Merges station sources into the packed store in store_dir.
+    Records are deduplicated by (kind, filename) and content hash: identical
+    copies are skipped, differing records with the same filename are flagged
+    as conflicts. The first ingested version stays in the store and the
+    conflicting one is kept as a file under conflicts/ for manual review.
+    """
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.index_path = os.path.join(store_dir, INDEX_FILENAME)
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+        self.sources = index.get('sources', {})  # origin -> [mtime, size] of ingested files
+        self.records = index.get('records', {})  # "kind/filename" -> {'hash', 'origin', 'mtime', 'offset'}
+        self.conflicts = index.get('conflicts', [])
+        self.stats = {'new': 0, 'updated': 0, 'duplicate': 0, 'conflict': 0, 'outdated': 0, 'unchanged': 0,
+                      'invalid': 0}
+        self._logs = {}  # kind -> packed log opened for appending
+        self._undo = None  # Previous index entries while a segment is ingested, for a rollback
+        self._pack_folders()
+
+    def _is_ingested(self, source_file):
+        return self.sources.get(source_file.origin) == [source_file.mtime, source_file.size]
+
+    def read_new(self, source):
+        """
+        Return ([(SourceFile, record)], unchanged count, invalid count) for a source.
+        Files ingested before with the same mtime and size are not read.
+        """
+        new = []
+        unchanged = invalid = 0
+        for source_file in list_source_files(source):
+            if self._is_ingested(source_file):
+                unchanged += 1
+                continue
+            try:
+                record = json.loads(source_file.read())
+            except ValueError as e:
+                print(f"  [WARNING] Skipping invalid JSON {source_file.origin}: {e}")
+                invalid += 1
+                continue
+            new.append((source_file, record))
+        return new, unchanged, invalid
+
+    def _pack_folders(self):
+        """Move records of stores merged into one file per record (earlier versions) into the packed logs."""
+        legacy = [(key, entry) for key, entry in self.records.items() if 'offset' not in entry]
+        if not legacy:
+            return
+        packed = 0
+        for key, entry in legacy:
+            path = os.path.join(self.store_dir, *key.split('/', 1))
+            try:
+                with open(path, 'r') as f:
+                    record = json.load(f)
+                mtime = os.path.getmtime(path)
+            except (OSError, ValueError) as e:
+                print(f"  [WARNING] Cannot pack {path}: {e}")
+                continue
+            entry.setdefault('mtime', mtime)
+            entry['offset'] = self._write(*key.split('/', 1), record, entry['mtime'])
+            packed += 1
+        self.save()
+        kinds = sorted({key.split('/', 1)[0] for key, _ in legacy})
+        print(f"[INFO] Packed {packed} records into {', '.join(k + PACKED_SUFFIX for k in kinds)}; "
+              f"the folders {', '.join(kinds)} of {self.store_dir} are no longer read and can be removed")
+
+    def _set(self, table, key, value):
+        """Set an entry of self.sources or self.records, remembering the previous one during a segment."""
+        entries = getattr(self, table)
+        if self._undo is not None:
+            self._undo.setdefault((table, key), entries.get(key, _MISSING))
+        entries[key] = value
+
+    def _write(self, kind, filename, record, mtime):
+        """Append a record to the packed log of its kind; returns the offset of its line."""
+        log = self._logs.get(kind)
+        if log is None:
+            os.makedirs(self.store_dir, exist_ok=True)
+            log = self._logs[kind] = open(packed_log_path(self.store_dir, kind), 'ab')
+            if log.tell() > 0:
+                with open(log.name, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        log.write(b'\n')  # End a line cut off by an interrupted merge
+        offset = log.tell()
+        line = json.dumps({'filename': filename, 'mtime': mtime, 'record': record}, separators=(',', ':'))
+        log.write((line + '\n').encode('utf-8'))
+        return offset
+
+    def _write_conflict(self, kind, filename, record, mtime):
+        """Write a conflicting record as a file under conflicts/ for manual review."""
+        directory = os.path.join(self.store_dir, 'conflicts', kind)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, filename)
+        with open(path, 'w') as f:
+            json.dump(record, f, indent=2)
+        os.utime(path, (mtime, mtime))
+
+    def ingest(self, source_file, record):
+        """
+        Add one record to the store and return 'new', 'updated', 'duplicate',
+        'conflict' or 'outdated' (an older version of a record from the same origin,
+        e.g. a redone rating in an earlier day's segment; the newer version is kept).
+        """
+        digest = content_hash(record)
+        kind, filename = source_file.kind, source_file.filename
+        key = f"{kind}/{filename}"
+        existing = self.records.get(key)
+
+        if (existing is not None and existing['hash'] != digest and kind in APPEND_KINDS
+                and existing['origin'] != source_file.origin):
+            # Different sessions with the same id: keep both
+            filename = f"{filename[:-len('.json')]}_{digest[:8]}.json"
+            key = f"{kind}/{filename}"
+            existing = self.records.get(key)
+
+        if existing is None:
+            offset = self._write(kind, filename, record, source_file.mtime)
+            self._set('records', key, {'hash': digest, 'origin': source_file.origin, 'mtime': source_file.mtime,
+                                       'offset': offset})
+            outcome = 'new'
+        elif existing['hash'] == digest:
+            outcome = 'duplicate'
+        elif existing['origin'] == source_file.origin and source_file.mtime <= existing.get('mtime', float('-inf')):
+            # An older version than the stored one: not recorded as ingested, so it is checked again
+            self.stats['outdated'] += 1
+            return 'outdated'
+        elif existing['origin'] == source_file.origin:
+            # The same source file changed since the last merge (e.g. a rating was redone)
+            offset = self._write(kind, filename, record, source_file.mtime)
+            self._set('records', key, {'hash': digest, 'origin': source_file.origin, 'mtime': source_file.mtime,
+                                       'offset': offset})
+            outcome = 'updated'
+        else:
+            conflict_name = f"{filename[:-len('.json')]}.{digest[:8]}.json"
+            self._write_conflict(kind, conflict_name, record, source_file.mtime)
+            if not any(c['key'] == key and c['hash'] == digest for c in self.conflicts):
+                self.conflicts.append({
+                    'key': key, 'hash': digest, 'origin': source_file.origin,
+                    'kept_hash': existing['hash'], 'kept_origin': existing['origin'],
+                })
+            outcome = 'conflict'
+
+        self._set('sources', source_file.origin, [source_file.mtime, source_file.size])
+        self.stats[outcome] += 1
+        return outcome
+
+    def ingest_segment(self, path):
+        """
+        Stream a segment into the store record by record. Its index changes are
+        only kept if the checksum at the end of the segment matches; otherwise
+        they are rolled back (the appended log lines stay unreferenced) and
+        False is returned.
+        """
+        self._undo = {}
+        stats, num_conflicts = dict(self.stats), len(self.conflicts)
+        try:
+            for header, entry, size in iter_segment(path):
+                kind, filename = entry['kind'], entry['filename']
+                if kind not in DATA_KINDS or os.path.basename(filename) != filename or not filename.endswith('.json'):
+                    raise ValueError(f"invalid record {kind}/{filename}")
+                source_file = SourceFile(kind, filename, f"segment:{header['station']}/{kind}/{filename}",
+                                         entry['mtime'], size, None)
+                if self._is_ingested(source_file):
+                    self.stats['unchanged'] += 1
+                    continue
+                self.ingest(source_file, entry['record'])
+            return True
+        except (ValueError, KeyError, TypeError) as e:
+            for (table, key), previous in self._undo.items():
+                if previous is _MISSING:
+                    del getattr(self, table)[key]
+                else:
+                    getattr(self, table)[key] = previous
+            self.stats, self.conflicts = stats, self.conflicts[:num_conflicts]
+            print(f"  [ERROR] {path}: {e}")
+            return False
+        finally:
+            self._undo = None
+
+    def merge(self, sources, workers=4):
+        """
+        Read the folder and archive sources in parallel and ingest their new
+        files; segments are streamed into the store one by one. Sources are
+        applied in the given order, so earlier sources win conflicts.
+        """
+        outcomes = run_parallel(self.read_new, [s for s in sources if not is_segment(s)], workers,
+                                label='sources read')
+        by_source = {source: (result, error) for source, result, error in outcomes}
+        segments = [source for source in sources if is_segment(source)]
+        for source in sources:
+            if is_segment(source):
+                self.ingest_segment(source)
+                print(f"[{segments.index(source) + 1}/{len(segments)}] segments merged")
+                continue
+            result, error = by_source[source]
+            if error is not None:
+                continue
+            files, unchanged, invalid = result
+            self.stats['unchanged'] += unchanged
+            self.stats['invalid'] += invalid
+            for source_file, record in files:
+                self.ingest(source_file, record)
+        self.save()
+        return self.stats
+
+    def save(self):
+        """Flush the packed logs, then write the index atomically and the conflict report."""
+        for log in self._logs.values():
+            log.close()
+        self._logs = {}
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'sources': self.sources, 'records': self.records, 'conflicts': self.conflicts},
+                      f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+        with open(os.path.join(self.store_dir, CONFLICTS_FILENAME), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['key', 'hash', 'origin', 'kept_hash', 'kept_origin'])
+            writer.writeheader()
+            writer.writerows(self.conflicts)
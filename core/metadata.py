@@ -0,0 +1,192 @@
+"""
+Action metadata lookup from the DuckDB `events` table, or from a compact
+metadata snapshot (Arrow IPC/Feather file) built with utils/build_metadata_snapshot.py.
+"""
+
+import os
+
+import duckdb
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Snapshots are optional; without pyarrow metadata is read from DuckDB
+    pa = None
+
+# Columns the rating screens expect to find for each action
+METADATA_COLUMNS = ["id", "team", "player", "jersey_number", "type", "bodypart",
+                    "start_x", "start_y", "end_x", "end_y"]
+
+# Column types of the metadata snapshot: repeated strings are dictionary-encoded
+SNAPSHOT_TYPES = {
+    'id': 'string',
+    'team': 'dictionary',
+    'player': 'dictionary',
+    'jersey_number': 'int16',
+    'type': 'dictionary',
+    'bodypart': 'dictionary',
+    'start_x': 'float32',
+    'start_y': 'float32',
+    'end_x': 'float32',
+    'end_y': 'float32',
+}
+
+
+def _snapshot_array(values, type_name):
+    """Return the snapshot column for a pandas Series (nulls are kept)."""
+    if type_name == 'dictionary':
+        strings = values.astype('string')
+        return pa.array(strings, type=pa.string(), from_pandas=True).dictionary_encode()
+    if type_name == 'string':
+        return pa.array(values.astype('string'), type=pa.string(), from_pandas=True)
+    return pa.array(pd.to_numeric(values, errors='coerce'), from_pandas=True).cast(getattr(pa, type_name)())
+
+
+def build_snapshot(db_path, action_ids, snapshot_path):
+    """
+    Write the metadata columns of the given actions from the DuckDB events table
+    into an uncompressed Arrow IPC (Feather V2) file, which can be memory-mapped
+    without copying. Returns the number of actions written.
+    """
+    if pa is None:
+        raise RuntimeError("Building a metadata snapshot requires pyarrow")
+    action_ids = sorted({str(a) for a in action_ids})
+    conn = duckdb.connect(db_path, read_only=True)
+    try:
+        available = {row[0] for row in conn.execute("DESCRIBE events").fetchall()}
+        columns = [col for col in METADATA_COLUMNS if col in available]
+        conn.register('wanted_ids', pd.DataFrame({'id': action_ids}))
+        select = ', '.join(f'e."{col}"' for col in columns)
+        df_actions = conn.execute(
+            f"SELECT {select} FROM events e JOIN wanted_ids w ON CAST(e.id AS VARCHAR) = w.id"
+        ).fetchdf()
+    finally:
+        conn.close()
+
+    table = pa.table({col: _snapshot_array(df_actions[col], SNAPSHOT_TYPES[col]) for col in columns})
+    os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+    tmp_path = f"{snapshot_path}.tmp"
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, snapshot_path)
+    return table.num_rows
+
+
+class MetadataProvider:
+    """
+    Loads metadata for a set of action ids and serves per-action lookups.
+    If snapshot_path points to an existing metadata snapshot (and pyarrow is
+    installed), the snapshot is memory-mapped and rows are converted only when
+    looked up; otherwise the actions are read from the DuckDB database into
+    an in-memory index. Actions missing from a (stale) snapshot are reported
+    and read from the database if it is available.
+    """
+    def __init__(self, db_path, snapshot_path=None):
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path
+        self._metadata = pd.DataFrame(columns=METADATA_COLUMNS)
+        self._index = {}
+        self._table = None  # Memory-mapped snapshot, opened on the first load
+        self._all_rows = {}  # Action id -> row number of every snapshot action
+        self._rows = {}  # Action id -> snapshot row number of the loaded actions
+
+    @property
+    def uses_snapshot(self):
+        return pa is not None and bool(self.snapshot_path) and os.path.exists(self.snapshot_path)
+
+    @property
+    def metadata(self):
+        """Metadata DataFrame of the loaded actions."""
+        if self._table is not None and self._metadata is None:
+            rows = sorted(self._rows.values())
+            frames = [self._table.take(rows).to_pandas()] if rows else []
+            if self._index:  # Actions missing from the snapshot, read from the database
+                frames.append(pd.DataFrame(list(self._index.values())))
+            self._metadata = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=METADATA_COLUMNS)
+        return self._metadata
+
+    def _open_snapshot(self):
+        if self._table is None:
+            self._table = feather.read_table(self.snapshot_path, memory_map=True)
+            self._all_rows = {action_id: row for row, action_id in enumerate(self._table.column('id').to_pylist())}
+        return self._table
+
+    def load(self, action_ids):
+        """
+        Fetch metadata for the given action ids.
+        Falls back to an empty frame if the database cannot be read.
+        """
+        action_ids = [str(a) for a in action_ids]
+        if self.uses_snapshot:
+            try:
+                self._open_snapshot()
+                self._rows = {a: self._all_rows[a] for a in action_ids if a in self._all_rows}
+            except (OSError, KeyError, pa.ArrowException) as e:
+                print(f"[ERROR] Failed to read metadata snapshot {self.snapshot_path}, using the database: {e}")
+                self._table = None
+            else:
+                self._index = {}
+                missing = [a for a in action_ids if a not in self._rows]
+                if missing:
+                    print(f"[WARNING] {len(missing)} of {len(action_ids)} clips are not in the metadata snapshot "
+                          f"{self.snapshot_path}; it is stale, rebuild it with utils/build_metadata_snapshot.py")
+                    if self.db_path and os.path.exists(self.db_path):
+                        self._index = self._index_records(self._read_database(missing))
+                        print(f"[INFO] Read {len(self._index)} of the missing clips from {self.db_path}")
+                self._metadata = None  # Converted on first access
+                return self.metadata
+
+        df_actions = self._read_database(action_ids)
+        self._metadata = df_actions
+        self._index = self._index_records(df_actions)
+        return df_actions
+
+    @staticmethod
+    def _index_records(df_actions):
+        return {str(record['id']): record for record in df_actions.to_dict('records')}
+
+    def _read_database(self, action_ids):
+        """Return the events rows of the given action ids (an empty frame if the database cannot be read)."""
+        try:
+            conn = duckdb.connect(self.db_path, read_only=True)
+            try:
+                if action_ids:  # Prevents empty "IN ()" clause
+                    id_list = ', '.join("'" + a.replace("'", "''") + "'" for a in action_ids)
+                    df_actions = conn.execute(f"SELECT * FROM events WHERE id IN ({id_list})").fetchdf()
+                else:
+                    df_actions = pd.DataFrame(columns=METADATA_COLUMNS)
+            finally:
+                # Close database connection to prevent resource leak
+                conn.close()
+        except Exception as e:
+            print(f"[ERROR] Failed to load metadata from database: {e}")
+            df_actions = pd.DataFrame(columns=METADATA_COLUMNS)
+        return df_actions
+
+    def lookup(self, action_id):
+        """Return the metadata record (dict) for an action, or None if unknown."""
+        if self._table is not None:
+            row = self._rows.get(str(action_id))
+            if row is None:
+                return self._index.get(str(action_id))
+            return {name: column[row].as_py() for name, column in zip(self._table.column_names, self._table.columns)}
+        return self._index.get(str(action_id))
+
+    def trajectories(self, action_ids=None):
+        """
+        Return (id, start_x, start_y, end_x, end_y) tuples for all actions in the
+        events table that have complete coordinates, optionally limited to action_ids.
+        """
+        query = ("SELECT CAST(id AS VARCHAR), CAST(start_x AS DOUBLE), CAST(start_y AS DOUBLE), "
+                 "CAST(end_x AS DOUBLE), CAST(end_y AS DOUBLE) FROM events "
+                 "WHERE start_x IS NOT NULL AND start_y IS NOT NULL "
+                 "AND end_x IS NOT NULL AND end_y IS NOT NULL")
+        conn = duckdb.connect(self.db_path, read_only=True)
+        try:
+            rows = conn.execute(query).fetchall()
+        finally:
+            conn.close()
+        if action_ids is not None:
+            wanted = {str(a) for a in action_ids}
+            rows = [r for r in rows if r[0] in wanted]
+        return rows
@@ -0,0 +1,92 @@
+"""
+Pitch trajectory rendering and the content-addressed pitch image cache.
+"""
+
+import hashlib
+import os
+from io import BytesIO
+
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+import matplotlib.pyplot as plt  # noqa: E402
+import mplsoccer  # noqa: E402
+
+# Bump when the drawing code changes so cached images are re-rendered
+RENDER_VERSION = 1
+
+# Trajectory shown when an action has no metadata
+DEFAULT_TRAJECTORY = (10, 10, 90, 10)
+
+
+def render_pitch_png(start_x, start_y, end_x, end_y):
+    """Draw the action trajectory on a StatsBomb pitch and return it as PNG bytes."""
+    # Create pitch and draw trajectory
+    pitch = mplsoccer.Pitch(pitch_type="statsbomb", pitch_color="grass")
+    fig, ax = pitch.draw(figsize=(6, 4))
+
+    try:
+        # Make figure background transparent/black
+        fig.patch.set_facecolor('black')
+        fig.patch.set_alpha(1)
+
+        # Draw arrow from start to end position
+        pitch.arrows(start_x, start_y, end_x, end_y,
+                     ax=ax, color="blue", width=2, headwidth=10, headlength=5)
+
+        # Optionally add markers at start and end
+        ax.plot(start_x, start_y, 'o', color='blue', markersize=10, label='Start')
+
+        # Remove white padding
+        fig.tight_layout(pad=0)
+        fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
+
+        # Save figure to BytesIO buffer as PNG
+        buf = BytesIO()
+        fig.savefig(buf, format='png', dpi=100, bbox_inches='tight', pad_inches=0)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)  # Prevent memory leak
+
+
+class PitchImageCache:
+    """
+    Stores rendered pitch images under a key derived from the trajectory
+    coordinates and RENDER_VERSION, so identical trajectories share one file.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(start_x, start_y, end_x, end_y):
+        """Return the content hash for a trajectory."""
+        coords = ','.join(f"{float(c):.3f}" for c in (start_x, start_y, end_x, end_y))
+        return hashlib.sha1(f"v{RENDER_VERSION}:{coords}".encode()).hexdigest()
+
+    def path_for(self, start_x, start_y, end_x, end_y):
+        """Return the cache path of a trajectory image (which may not exist yet)."""
+        key = self.key(start_x, start_y, end_x, end_y)
+        return os.path.join(self.cache_dir, key[:2], f"{key}.png")
+
+    def get(self, start_x, start_y, end_x, end_y):
+        """Return the cached image path, or None if it has not been rendered."""
+        path = self.path_for(start_x, start_y, end_x, end_y)
+        return path if os.path.exists(path) else None
+
+    def put(self, start_x, start_y, end_x, end_y, png_bytes):
+        """Write a rendered image into the cache and return its path."""
+        path = self.path_for(start_x, start_y, end_x, end_y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see partial images
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(png_bytes)
+        os.replace(tmp_path, path)
+        return path
+
+    def render(self, start_x, start_y, end_x, end_y):
+        """Return the cached image path, rendering and storing it if necessary."""
+        path = self.get(start_x, start_y, end_x, end_y)
+        if path is None:
+            path = self.put(start_x, start_y, end_x, end_y,
+                            render_pitch_png(start_x, start_y, end_x, end_y))
+        return path
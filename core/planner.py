@@ -0,0 +1,210 @@
+"""
+Offline allocation of clips to raters for planned studies.
+
+Computes a balanced incomplete block design: clips are grouped into blocks of
+block_size clips, and every block is rated by a panel of k raters. Panels are
+chosen so that every rater gets the same number of clips (within one block)
+and every pair of raters shares about the same number of clips, which keeps
+the rater overlap even for the reliability estimates. Exact designs only exist
+for few (R, C, k) combinations, so panels are chosen by a greedy heuristic
+that runs in O(blocks * k * R).
+
+Each rater's queue is written to a plan file, {plan_dir}/{user_id}.json, which
+AssignmentEngine reads as the queue instead of shuffling the catalogue.
+Plans for raters whose user ids are not known yet are written to
+{plan_dir}/unassigned/ and claimed by the next new user id.
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Folder in plan_dir with plans not yet claimed by a user id
+UNASSIGNED_DIR = 'unassigned'
+
+# Design parameters and balance figures (user ids never contain '_')
+DESIGN_FILENAME = '_design.json'
+
+
+def plan_allocation(rater_count, videos, ratings_per_clip, block_size=1, seed=None):
+    """
+    Return (queues, panels): each rater's ordered list of clip filenames, and
+    the rater indices of every block's panel.
+    """
+    if not 1 <= ratings_per_clip <= rater_count:
+        raise ValueError(f"ratings_per_clip must be between 1 and the number of raters ({rater_count})")
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+    rng = np.random.default_rng(seed)
+
+    videos = list(videos)
+    order = rng.permutation(len(videos))
+    blocks = [[videos[i] for i in order[start:start + block_size]]
+              for start in range(0, len(videos), block_size)]
+
+    load = np.zeros(rater_count)  # Clips per rater
+    overlap = np.zeros((rater_count, rater_count))  # Clips shared by each pair of raters
+    panels = []
+    for block in blocks:
+        panel = []
+        available = np.ones(rater_count, dtype=bool)
+        shared = np.zeros(rater_count)  # Clips each rater shares with the panel chosen so far
+        for _ in range(ratings_per_clip):
+            # Only raters within one block of the lowest load are eligible (load balance);
+            # among them take the one sharing the fewest clips with the panel (pair balance).
+            eligible = available & (load <= load[available].min() + block_size)
+            score = np.where(eligible, shared + rng.random(rater_count) * 0.5, np.inf)
+            rater = int(np.argmin(score))
+            panel.append(rater)
+            available[rater] = False
+            shared += overlap[rater]
+        overlap[np.ix_(panel, panel)] += len(block)
+        load[panel] += len(block)
+        panels.append(panel)
+
+    return counterbalance(blocks, panels, rater_count), panels
+
+
+def counterbalance(blocks, panels, rater_count):
+    """
+    Return each rater's clip order. The raters of a block reach it at different
+    points of their session: rater r starts its block list at r/R of the way
+    through (a cyclic rotation), and the clip order within a block alternates
+    between forward and reversed, so position and fatigue effects are spread
+    over the raters of a clip instead of being confounded with it.
+    """
+    rater_blocks = [[] for _ in range(rater_count)]
+    for block_index, panel in enumerate(panels):
+        for rater in panel:
+            rater_blocks[rater].append(block_index)
+
+    queues = []
+    for rater, block_indices in enumerate(rater_blocks):
+        shift = rater * len(block_indices) // rater_count
+        rotated = block_indices[shift:] + block_indices[:shift]
+        queue = []
+        for position, block_index in enumerate(rotated):
+            block = blocks[block_index]
+            queue.extend(block if (rater + position) % 2 == 0 else block[::-1])
+        queues.append(queue)
+    return queues
+
+
+def design_summary(queues):
+    """Return load, pairwise overlap and position balance figures of a plan."""
+    loads = [len(q) for q in queues]
+    clip_sets = [set(q) for q in queues]
+    pairs = [len(clip_sets[i] & clip_sets[j])
+             for i in range(len(queues)) for j in range(i + 1, len(queues))]
+
+    # Spread of the relative queue positions at which the raters of a clip see it
+    positions = {}
+    for queue in queues:
+        for position, video in enumerate(queue):
+            positions.setdefault(video, []).append(position / max(len(queue) - 1, 1))
+    spreads = [max(p) - min(p) for p in positions.values() if len(p) > 1]
+
+    return {
+        'raters': len(queues),
+        'clips': len(positions),
+        'clips_per_rater_min': min(loads, default=0),
+        'clips_per_rater_max': max(loads, default=0),
+        'shared_clips_min': min(pairs, default=0),
+        'shared_clips_max': max(pairs, default=0),
+        'shared_clips_mean': round(float(np.mean(pairs)), 2) if pairs else 0,
+        'shared_clips_std': round(float(np.std(pairs)), 2) if pairs else 0,
+        'position_spread_mean': round(float(np.mean(spreads)), 3) if spreads else 0,
+    }
+
+
+def write_plan(path, user_id, videos):
+    """Write one rater's plan file atomically."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'user_id': user_id, 'videos': videos}, f)
+    os.replace(tmp_path, path)
+
+
+def is_replaceable(plan_dir):
+    """Return True if plan_dir is missing, empty or holds a plan (has a design file)."""
+    if not os.path.isdir(plan_dir) or not os.listdir(plan_dir):
+        return True
+    return os.path.isfile(os.path.join(plan_dir, DESIGN_FILENAME))
+
+
+def remove_plan(plan_dir):
+    """
+    Remove the files of a plan written by write_plan: the design file, the
+    unassigned plans and the (claimed) plan files. Other files are kept.
+    Raises ValueError if plan_dir holds files but no plan (no design file).
+    Returns the number of claimed plans removed.
+    """
+    if not is_replaceable(plan_dir):
+        raise ValueError(f"{plan_dir} is not a plan folder (no {DESIGN_FILENAME})")
+    if not os.path.isfile(os.path.join(plan_dir, DESIGN_FILENAME)):
+        return 0
+    unassigned_dir = os.path.join(plan_dir, UNASSIGNED_DIR)
+    if os.path.isdir(unassigned_dir):
+        for filename in os.listdir(unassigned_dir):
+            if filename.endswith('.json'):
+                os.remove(os.path.join(unassigned_dir, filename))
+        try:
+            os.rmdir(unassigned_dir)
+        except OSError:
+            pass  # Keep a folder with foreign files
+    claimed = 0
+    for filename in os.listdir(plan_dir):
+        if filename.endswith('.json') and filename != DESIGN_FILENAME:
+            os.remove(os.path.join(plan_dir, filename))
+            claimed += 1
+    os.remove(os.path.join(plan_dir, DESIGN_FILENAME))
+    return claimed
+
+
+def _claim(unassigned_dir, filename, path, user_id):
+    """
+    Claim an unassigned plan as path. Returns False if another station claimed
+    it first. The plan is first renamed to a claim file (only one station can
+    win the rename), then path is created exclusively, so an existing plan of
+    the user (claimed on another station) is never overwritten.
+    """
+    source = os.path.join(unassigned_dir, filename)
+    claim = f"{source}.{user_id}.claim"
+    try:
+        os.rename(source, claim)
+    except FileNotFoundError:
+        return False
+    with open(claim, 'r') as f:
+        data = f.read()
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+    except FileExistsError:
+        os.rename(claim, source)  # The user got a plan in the meantime: release this one
+        return True
+    with os.fdopen(fd, 'w') as f:
+        f.write(data)
+    os.remove(claim)
+    print(f"[INFO] User {user_id} claimed allocation plan {filename}")
+    return True
+
+
+def load_plan(plan_dir, user_id):
+    """
+    Return the planned clip filenames of a user, or None if there is no plan.
+    A user without a plan claims the first unassigned plan, if any; claims are
+    atomic, so two stations sharing plan_dir never claim the same plan and never
+    replace a plan the user already has.
+    """
+    path = os.path.join(plan_dir, f"{user_id}.json")
+    if not os.path.exists(path):
+        unassigned_dir = os.path.join(plan_dir, UNASSIGNED_DIR)
+        try:
+            candidates = sorted(f for f in os.listdir(unassigned_dir) if f.endswith('.json'))
+        except FileNotFoundError:
+            return None
+        if not any(_claim(unassigned_dir, filename, path, user_id) for filename in candidates):
+            return None
+    with open(path, 'r') as f:
+        return json.load(f)['videos']
@@ -0,0 +1,129 @@
+"""
+Low-overhead sampling profiler for the app's main (UI) thread.
+
+A background thread takes a snapshot of the main thread's Python stack every
+few milliseconds, so nothing in the app has to be instrumented. Each sample is
+tagged with the current screen and action id and weighted by the wall time
+since the previous sample: a busy main thread holds the GIL and delays the
+sampler, so equal weights would under-count exactly the slow code. Weights are
+written in milliseconds in the folded-stack format read by flamegraph.pl,
+speedscope and inferno:
+
+    {session}.folded            all samples, with the screen as the root frame
+    {session}_{screen}.folded   the samples of one screen
+    {session}_actions.csv       seconds per screen and action id (slow clips)
+"""
+
+import csv
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Seconds between samples (100 Hz keeps the overhead well below 1%)
+DEFAULT_INTERVAL = 0.01
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread (the main thread by default) on a
+    background thread. Can be started and stopped repeatedly; samples accumulate.
+    """
+    def __init__(self, interval=DEFAULT_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.tags = {'screen': '', 'action_id': ''}  # Set by the app, read by the sampler
+        self.stacks = Counter()  # (screen, frames root first) -> seconds
+        self.actions = Counter()  # (screen, action_id) -> seconds
+        self.samples = 0
+        self._labels = {}  # Code object -> frame label
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def set_tag(self, **tags):
+        self.tags = dict(self.tags, **tags)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def toggle(self):
+        """Start or stop sampling; returns True if the profiler is running afterwards."""
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+        return self.running
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self.sample(now - last)
+            last = now
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            label = self._labels[code] = label.replace(';', ':')  # ';' separates folded frames
+        return label
+
+    def sample(self, weight=None):
+        """Record the current stack of the profiled thread, standing for weight seconds."""
+        weight = self.interval if weight is None else weight
+        frame = sys._current_frames().get(self.thread_id)
+        frames = []
+        while frame is not None:
+            frames.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if not frames:
+            return
+        tags = self.tags  # Replaced, never mutated, so this read is consistent
+        screen = tags['screen'] or 'none'
+        self.stacks[(screen, tuple(reversed(frames)))] += weight
+        self.samples += 1
+        if tags['action_id']:
+            self.actions[(screen, tags['action_id'])] += weight
+
+    def write(self, output_dir, session_id):
+        """
+        Write the folded stacks and action table (call after stop());
+        returns the path of the combined profile.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        by_screen = {}
+        for (screen, frames), seconds in self.stacks.items():
+            milliseconds = round(seconds * 1000)
+            if milliseconds:
+                by_screen.setdefault(screen, []).append((frames, milliseconds))
+
+        path = os.path.join(output_dir, f"{session_id}.folded")
+        with open(path, 'w') as f:
+            for screen, stacks in sorted(by_screen.items()):
+                for frames, count in stacks:
+                    f.write(f"{';'.join((screen,) + frames)} {count}\n")
+        for screen, stacks in by_screen.items():
+            with open(os.path.join(output_dir, f"{session_id}_{screen}.folded"), 'w') as f:
+                for frames, count in stacks:
+                    f.write(f"{';'.join(frames)} {count}\n")
+
+        with open(os.path.join(output_dir, f"{session_id}_actions.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['screen', 'action_id', 'seconds'])
+            for (screen, action_id), seconds in self.actions.most_common():
+                writer.writerow([screen, action_id, round(seconds, 3)])
+        return path
@@ -0,0 +1,148 @@
+"""
+Persistence of ratings and user data as JSON files.
+Ratings are stored as user_ratings/{user_id}_{action_id}.json,
+user data as user_data/{user_id}.json and screen transition logs
+as user_sessions/{session_id}.json.
+
+Every saved rating is also appended to a per-station log,
+user_ratings/.rating_index/{station}.jsonl, which the coverage dashboard
+reads incrementally (see core/coverage.py).
+"""
+
+import json
+import os
+import re
+import socket
+import time
+from collections import Counter
+
+# Folder in the ratings folder with one append-only log of saved ratings per station
+# (one JSON line per save). Stations sharing a ratings folder on a network share
+# each append to their own log, since appends from several hosts may interleave.
+RATING_INDEX_DIR = '.rating_index'
+
+# User ids are letters, digits and '-': no '_' (it separates user and action id in
+# rating filenames) and nothing that could leave the ratings folder
+USER_ID_PATTERN = re.compile(r'^(?:[^\W_]|-)+$')
+
+
+def is_valid_user_id(user_id):
+    """Return True if user_id can be used in rating filenames."""
+    return isinstance(user_id, str) and USER_ID_PATTERN.match(user_id) is not None
+
+
+def parse_rating_filename(filename):
+    """
+    Split a rating filename into (user_id, action_id).
+    Returns None for files that are not rating JSON files.
+    """
+    if not filename.endswith('.json') or '_' not in filename:
+        return None
+    user_id, action_id = filename[:-len('.json')].split('_', 1)
+    return user_id, action_id
+
+
+class RatingStore:
+    """
+    Reads and writes rating and user JSON files.
+    Directory scans are cached until the next write or an explicit refresh.
+    """
+    def __init__(self, ratings_dir='user_ratings', users_dir='user_data', sessions_dir='user_sessions',
+                 station=None):
+        self.ratings_dir = ratings_dir
+        self.users_dir = users_dir
+        self.sessions_dir = sessions_dir
+        self._keys = None  # Cached set of (user_id, action_id) pairs
+        self._stale = False  # Rescan on the next query, keeping the cached set until then
+        self._key_log = []  # Keys in the order they were first seen, for incremental readers
+        self.station = station or socket.gethostname()  # Name of this station's rating index log
+
+    def rating_path(self, user_id, action_id):
+        """Return the path of the rating file for a user and action."""
+        if not is_valid_user_id(user_id):
+            raise ValueError(f"Invalid user id {user_id!r}")
+        if os.path.basename(action_id) != action_id or action_id in ('', '.', '..'):
+            raise ValueError(f"Invalid action id {action_id!r}")
+        return os.path.join(self.ratings_dir, f"{user_id}_{action_id}.json")
+
+    def _scan(self, refresh=False):
+        """Return (user_id, action_id) pairs for all stored ratings."""
+        if self._keys is None or self._stale or refresh:
+            try:
+                filenames = os.listdir(self.ratings_dir)
+            except FileNotFoundError:
+                filenames = []
+            keys = {key for key in map(parse_rating_filename, filenames) if key is not None}
+            self._key_log.extend(keys - self._keys if self._keys is not None else keys)
+            self._keys = keys
+            self._stale = False
+        return self._keys
+
+    def refresh(self):
+        """Mark cached directory listings as stale so the next query rescans the disk."""
+        self._stale = True
+
+    def rating_keys(self):
+        """Return the set of (user_id, action_id) pairs of all stored ratings."""
+        return set(self._scan())
+
+    def rating_keys_since(self, position):
+        """
+        Return (keys, position): the rating keys first seen after position in
+        the key log, and the position to pass on the next call.
+        """
+        self._scan()
+        return self._key_log[position:], len(self._key_log)
+
+    def load_rating(self, user_id, action_id):
+        """Read a stored rating record."""
+        with open(self.rating_path(user_id, action_id), 'r') as f:
+            return json.load(f)
+
+    def rated_by_user(self, user_id):
+        """Return the set of action ids already rated by user_id."""
+        return {action_id for uid, action_id in self._scan() if uid == user_id}
+
+    def rating_counts(self):
+        """Return a Counter mapping action id to number of stored ratings."""
+        return Counter(action_id for _, action_id in self._scan())
+
+    def user_exists(self, user_id):
+        """Return True if user_id has at least one stored rating."""
+        return any(uid == user_id for uid, _ in self._scan())
+
+    def save_rating(self, user_id, action_id, rating_data):
+        """Write a rating record and return the path of the written file."""
+        os.makedirs(self.ratings_dir, exist_ok=True)
+        path = self.rating_path(user_id, action_id)
+        with open(path, 'w') as f:
+            json.dump(rating_data, f, indent=2)
+        if self._keys is not None and (user_id, action_id) not in self._keys:
+            self._keys.add((user_id, action_id))
+            self._key_log.append((user_id, action_id))
+        self._append_index(user_id, action_id)
+        return path
+
+    def _append_index(self, user_id, action_id):
+        """Append a saved rating to the rating index (one short line, written in a single call)."""
+        line = json.dumps({'user_id': user_id, 'id': action_id, 'saved_at': round(time.time(), 3)})
+        index_dir = os.path.join(self.ratings_dir, RATING_INDEX_DIR)
+        os.makedirs(index_dir, exist_ok=True)
+        with open(os.path.join(index_dir, f"{self.station}.jsonl"), 'a') as f:
+            f.write(line + '\n')
+
+    def save_user(self, user_data):
+        """Write a user data record and return the path of the written file."""
+        os.makedirs(self.users_dir, exist_ok=True)
+        path = os.path.join(self.users_dir, f"{user_data['user_id']}.json")
+        with open(path, 'w') as f:
+            json.dump(user_data, f, indent=2)
+        return path
+
+    def save_session(self, session_data):
+        """Write a session record (screen transitions) and return the path of the written file."""
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        path = os.path.join(self.sessions_dir, f"{session_data['session_id']}.json")
+        with open(path, 'w') as f:
+            json.dump(session_data, f, indent=2)
+        return path
@@ -0,0 +1,227 @@
+"""
+Inter-rater reliability per rating scale for sparse designs, where every
+rater rates only some of the actions: ICC(1), ICC(2) and Krippendorff's alpha
+(interval metric), with bootstrap confidence intervals over actions.
+
+Ratings are held as a sparse rater x action matrix in coordinate form
+(one entry per rating), so all statistics are computed with NumPy
+group sums (np.bincount) instead of loops over actions or raters.
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+STATISTICS = ('icc1', 'icc1k', 'icc2', 'icc2k', 'alpha')
+
+
+class SparseRatings:
+    """
+    Ratings of one scale as a sparse rater x action matrix in coordinate form:
+    entry i is rater rater_idx[i] rating action action_idx[i] with values[i].
+    """
+    def __init__(self, action_idx, rater_idx, values, n_actions, n_raters):
+        self.action_idx = action_idx
+        self.rater_idx = rater_idx
+        self.values = values
+        self.n_actions = n_actions
+        self.n_raters = n_raters
+
+    @classmethod
+    def from_frame(cls, df_ratings, scale_column):
+        """Build the matrix from the user_id, id and scale columns of a ratings frame."""
+        df = df_ratings[['id', 'user_id', scale_column]].dropna()
+        values = pd.to_numeric(df[scale_column], errors='coerce').to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        action_idx, actions = pd.factorize(df['id'][valid])
+        rater_idx, raters = pd.factorize(df['user_id'][valid])
+        return cls(action_idx, rater_idx, values[valid], len(actions), len(raters))
+
+    def __len__(self):
+        return len(self.values)
+
+    def resample_actions(self, rng):
+        """Return a bootstrap replicate drawing actions (with all their ratings) with replacement."""
+        order = np.argsort(self.action_idx, kind='stable')
+        counts = np.bincount(self.action_idx, minlength=self.n_actions)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        drawn = rng.integers(0, self.n_actions, self.n_actions)
+        drawn_counts = counts[drawn]
+        # Positions of all ratings of the drawn actions in the action-sorted order
+        offsets = np.arange(drawn_counts.sum()) - np.repeat(np.cumsum(drawn_counts) - drawn_counts, drawn_counts)
+        positions = order[np.repeat(starts[drawn], drawn_counts) + offsets]
+        # Each draw becomes a new action, so duplicated actions count as separate units
+        new_action_idx = np.repeat(np.arange(self.n_actions), drawn_counts)
+        return SparseRatings(new_action_idx, self.rater_idx[positions], self.values[positions],
+                             self.n_actions, self.n_raters)
+
+
+def _group_means(idx, values, n_groups):
+    counts = np.bincount(idx, minlength=n_groups)
+    sums = np.bincount(idx, weights=values, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts, counts
+
+
+def _additive_residual_ms(ratings, iterations=50, tol=1e-10):
+    """
+    Residual mean square of the additive model value = mu + action + rater,
+    fitted by backfitting (alternating group means of the residuals).
+    """
+    values = ratings.values
+    mu = values.mean()
+    action_effect = np.zeros(ratings.n_actions)
+    rater_effect = np.zeros(ratings.n_raters)
+    for _ in range(iterations):
+        previous = action_effect
+        action_effect = np.nan_to_num(_group_means(
+            ratings.action_idx, values - mu - rater_effect[ratings.rater_idx], ratings.n_actions)[0])
+        rater_effect = np.nan_to_num(_group_means(
+            ratings.rater_idx, values - mu - action_effect[ratings.action_idx], ratings.n_raters)[0])
+        if np.max(np.abs(action_effect - previous)) < tol:
+            break
+    residuals = values - mu - action_effect[ratings.action_idx] - rater_effect[ratings.rater_idx]
+    n_actions = np.count_nonzero(np.bincount(ratings.action_idx, minlength=ratings.n_actions))
+    n_raters = np.count_nonzero(np.bincount(ratings.rater_idx, minlength=ratings.n_raters))
+    df_error = len(values) - n_actions - n_raters + 1
+    return (residuals @ residuals) / df_error if df_error > 0 else np.nan
+
+
+def _between_ms(idx, values, n_groups):
+    """Between-group mean square and the effective group size k0 for unbalanced groups."""
+    means, counts = _group_means(idx, values, n_groups)
+    present = counts > 0
+    counts, means = counts[present], means[present]
+    n, total = len(counts), counts.sum()
+    if n < 2:
+        return np.nan, np.nan
+    ms = (counts * (means - values.mean()) ** 2).sum() / (n - 1)
+    k0 = (total - (counts ** 2).sum() / total) / (n - 1)
+    return ms, k0
+
+
+def icc(ratings):
+    """
+    Return ICC(1), ICC(1,k), ICC(2) and ICC(2,k) as a dict.
+
+    ICC(1) is the one-way random-effects ICC from the unbalanced ANOVA.
+    ICC(2) is the two-way random-effects ICC from the mean squares of actions,
+    raters and the residual of the additive fit; for complete designs it equals
+    the Shrout & Fleiss ICC(2,1). k is the effective number of ratings per
+    action. No estimate is clipped at 0, so all are negative when the actions
+    differ less than chance.
+    """
+    values = ratings.values
+    msb, k0 = _between_ms(ratings.action_idx, values, ratings.n_actions)
+    ms_rater, c0 = _between_ms(ratings.rater_idx, values, ratings.n_raters)
+
+    # One-way: within-action mean square
+    action_means, _ = _group_means(ratings.action_idx, values, ratings.n_actions)
+    within = values - action_means[ratings.action_idx]
+    n_actions = np.count_nonzero(np.bincount(ratings.action_idx, minlength=ratings.n_actions))
+    df_within = len(values) - n_actions
+    msw = (within @ within) / df_within if df_within > 0 else np.nan
+
+    icc1 = (msb - msw) / (msb + (k0 - 1) * msw)
+    icc1k = (msb - msw) / msb
+
+    # Two-way: Shrout & Fleiss mean-square formulas with the effective group sizes,
+    # unclipped like ICC(1) (both turn negative when MSB < the error mean square)
+    mse = _additive_residual_ms(ratings)
+    rater_term = (ms_rater - mse) / c0 if not np.isnan(ms_rater) else 0.0
+    icc2 = (msb - mse) / (msb + (k0 - 1) * mse + k0 * rater_term)
+    icc2k = (msb - mse) / (msb + rater_term)
+    return {'icc1': icc1, 'icc1k': icc1k, 'icc2': icc2, 'icc2k': icc2k}
+
+
+def krippendorff_alpha(ratings):
+    """Return Krippendorff's alpha with the interval metric (actions with one rating are not pairable)."""
+    counts = np.bincount(ratings.action_idx, minlength=ratings.n_actions)
+    pairable = counts[ratings.action_idx] >= 2
+    values = ratings.values[pairable]
+    n = len(values)
+    if n < 2:
+        return np.nan
+
+    # Observed disagreement: per action, the sum over ordered pairs of (x_i - x_j)^2
+    # is 2 m (sum x^2) - 2 (sum x)^2, weighted by 1 / (m - 1)
+    idx = ratings.action_idx[pairable]
+    sums = np.bincount(idx, weights=values, minlength=ratings.n_actions)
+    squares = np.bincount(idx, weights=values ** 2, minlength=ratings.n_actions)
+    units = counts >= 2
+    m = counts[units]
+    observed = ((2 * m * squares[units] - 2 * sums[units] ** 2) / (m - 1)).sum() / n
+
+    # Expected disagreement: the same sum over all ordered pairs of pairable values
+    expected = (2 * n * (values ** 2).sum() - 2 * values.sum() ** 2) / (n * (n - 1))
+    return 1 - observed / expected if expected > 0 else np.nan
+
+
+def reliability(ratings):
+    """Return all statistics of STATISTICS for one scale as a dict."""
+    stats = icc(ratings)
+    stats['alpha'] = krippendorff_alpha(ratings)
+    return stats
+
+
+def _bootstrap_job(job):
+    """Compute the statistics for a chunk of bootstrap replicates (runs in a worker process)."""
+    ratings, n_replicates, seed = job
+    rng = np.random.default_rng(seed)
+    results = np.empty((n_replicates, len(STATISTICS)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for i in range(n_replicates):
+            stats = reliability(ratings.resample_actions(rng))
+            results[i] = [stats[name] for name in STATISTICS]
+    return results
+
+
+def bootstrap(ratings, n_replicates=1000, workers=None, seed=0, confidence=0.95):
+    """
+    Return {statistic: (ci_low, ci_high)} from a percentile bootstrap over actions.
+    Replicates are computed in chunks on a process pool (workers=1 runs in-process).
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = np.array_split(np.arange(n_replicates), workers * 4)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    jobs = [(ratings, len(chunk), s) for chunk, s in zip(chunks, seeds) if len(chunk)]
+    if workers == 1:
+        results = [_bootstrap_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_bootstrap_job, jobs))
+    replicates = np.vstack(results)
+
+    tail = (1 - confidence) / 2 * 100
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN columns give NaN intervals
+        low, high = np.nanpercentile(replicates, [tail, 100 - tail], axis=0)
+    return {name: (low[i], high[i]) for i, name in enumerate(STATISTICS)}
+
+
+def reliability_table(df_ratings, scale_columns, n_bootstrap=1000, workers=None, seed=0):
+    """
+    Return one row per scale with the number of ratings, actions and raters,
+    each statistic and (if n_bootstrap > 0) its bootstrap confidence interval.
+    """
+    rows = []
+    for scale in scale_columns:
+        ratings = SparseRatings.from_frame(df_ratings, scale)
+        row = {'scale': scale, 'num_ratings': len(ratings),
+               'num_actions': ratings.n_actions, 'num_raters': ratings.n_raters}
+        if len(ratings) < 2:
+            rows.append(row)
+            continue
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats = reliability(ratings)
+        intervals = bootstrap(ratings, n_bootstrap, workers, seed) if n_bootstrap > 0 else {}
+        for name in STATISTICS:
+            row[name] = stats[name]
+            if name in intervals:
+                row[f'{name}_ci_low'], row[f'{name}_ci_high'] = intervals[name]
+        rows.append(row)
+    return pd.DataFrame(rows).set_index('scale').round(4)
@@ -0,0 +1,71 @@
+"""
+Process resource sampling for long-session soak tests:
+resident memory, open file handles and live object counts.
+"""
+
+import csv
+import gc
+import os
+import sys
+import time
+
+
+def rss_mb():
+    """Return the current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kB on Linux
+        return max_rss / 2**20 if sys.platform == 'darwin' else max_rss / 1024
+
+
+def open_file_count():
+    """Return the number of open file descriptors of this process, or -1 if unknown."""
+    for fd_dir in ('/proc/self/fd', '/dev/fd'):
+        try:
+            return len(os.listdir(fd_dir))
+        except OSError:
+            continue
+    return -1
+
+
+def count_instances(cls):
+    """Return the number of live objects of the given class tracked by the garbage collector."""
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, cls))
+
+
+class ResourceSampler:
+    """
+    Collects resource samples over time.
+    counters maps a column name to a function returning a number,
+    e.g. {'textures': lambda: count_instances(Texture)}.
+    """
+    def __init__(self, counters=None):
+        self.counters = counters or {}
+        self.rows = []
+        self._start = time.monotonic()
+
+    def sample(self, **tags):
+        """Take a sample, store it and return it as a dict."""
+        row = dict(tags)
+        row['elapsed_s'] = round(time.monotonic() - self._start, 2)
+        row['rss_mb'] = round(rss_mb(), 1)
+        row['open_files'] = open_file_count()
+        for name, counter in self.counters.items():
+            row[name] = counter()
+        self.rows.append(row)
+        return row
+
+    def write_csv(self, path):
+        """Write all samples to a CSV file."""
+        if not self.rows:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.rows[0]))
+            writer.writeheader()
+            writer.writerows(self.rows)
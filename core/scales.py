@@ -0,0 +1,78 @@
+"""
+Model of the active rating scales and the values given for the current clip.
+"""
+
+
+def is_filled(value):
+    """Return True if a scale value counts as a given rating."""
+    return value is not None and value != ''
+
+
+def scale_range(scale):
+    """Return (min, max) of a discrete or slider scale, or None for text scales."""
+    scale_type = scale.get('type', 'discrete')
+    if scale_type == 'slider':
+        return scale.get('slider_min', 0), scale.get('slider_max', 100)
+    if scale_type == 'discrete':
+        values = scale.get('values', [1, 2, 3, 4, 5, 6, 7])
+        return min(values), max(values)
+    return None
+
+
+class RatingScaleModel:
+    """
+    Holds the active scale configurations indexed by title and the
+    current value of every scale. Kept free of widgets so the screen can
+    update values and reset them without walking the configuration list.
+    Counts of filled scales are maintained on every change, so completeness
+    checks are O(1).
+    """
+    def __init__(self, scale_configs):
+        self.configs = {scale['title']: scale for scale in scale_configs}
+        self.titles = list(self.configs)
+        # Default to required if not specified
+        self.required = [
+            title for title, scale in self.configs.items()
+            if scale.get('required_to_proceed', True)
+        ]
+        self._required_set = set(self.required)
+        self.values = dict.fromkeys(self.titles)
+        self.filled_count = 0  # Scales with a value
+        self.filled_required_count = 0  # Required scales with a value
+
+    def config(self, title):
+        """Return the configuration of a scale, or None for unknown titles."""
+        return self.configs.get(title)
+
+    def scale_type(self, title):
+        return self.configs[title].get('type', 'discrete')
+
+    def slider_default(self, title):
+        """Return the value a slider scale is reset to (middle of its range)."""
+        scale = self.configs[title]
+        return (scale.get('slider_min', 0) + scale.get('slider_max', 100)) / 2
+
+    def set_value(self, title, value):
+        """Store a scale value and update the filled counts if it moved between empty and set."""
+        if title not in self.values:
+            return
+        change = is_filled(value) - is_filled(self.values[title])
+        self.values[title] = value
+        if change:
+            self.filled_count += change
+            if title in self._required_set:
+                self.filled_required_count += change
+
+    def reset(self):
+        """Clear all values."""
+        self.values = dict.fromkeys(self.titles)
+        self.filled_count = 0
+        self.filled_required_count = 0
+
+    def required_complete(self):
+        """Return True if every required scale has a value."""
+        return self.filled_required_count == len(self.required)
+
+    def all_complete(self):
+        """Return True if every scale has a value."""
+        return self.filled_count == len(self.titles)
@@ -0,0 +1,176 @@
+"""
+Packed transfer segments for shipping station data.
+
+A segment holds all records of one station that were last saved on one day
+(by file modification time) in a single gzip-compressed JSON-lines file,
+{station}_{YYYY-MM-DD}.segment.jsonl.gz:
+
+    {"segment": 1, "station": ..., "day": ..., "records": N, "latest_mtime": ...}
+    {"kind": "user_ratings", "filename": ..., "mtime": ..., "record": {...}}
+    ...
+    {"sha256": ...}
+
+The last line holds the SHA-256 of all preceding lines, so truncated or
+corrupted copies are rejected as a whole. Copying a few segments is much
+faster than copying many small JSON files, especially to USB sticks.
+StationMerger streams segments into its packed store (see core/merge.py).
+A record redone on a later day moves to that day's segment; should an older
+segment still hold the previous version, the merge keeps the newer one.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import zlib
+from collections import defaultdict
+from datetime import datetime
+
+SEGMENT_VERSION = 1
+SEGMENT_SUFFIX = '.segment.jsonl.gz'
+
+DAY_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def segment_filename(station, day):
+    return f"{station}_{day}{SEGMENT_SUFFIX}"
+
+
+def is_segment(path):
+    return path.endswith(SEGMENT_SUFFIX) and os.path.isfile(path)
+
+
+def list_segments(folder):
+    """Return the segment files in a folder, sorted by name (i.e. by station and day)."""
+    return [os.path.join(folder, filename) for filename in sorted(os.listdir(folder))
+            if filename.endswith(SEGMENT_SUFFIX)]
+
+
+def _station_segments(output_dir, station):
+    """Return {day: path} of the station's segments in output_dir."""
+    prefix = f"{station}_"
+    segments = {}
+    for filename in os.listdir(output_dir):
+        if filename.startswith(prefix) and filename.endswith(SEGMENT_SUFFIX):
+            day = filename[len(prefix):-len(SEGMENT_SUFFIX)]
+            if DAY_PATTERN.match(day):
+                segments[day] = os.path.join(output_dir, filename)
+    return segments
+
+
+def _read_header(path):
+    """Return the header of a segment, or None if it is missing or unreadable."""
+    try:
+        with gzip.open(path, 'rb') as f:
+            return json.loads(f.readline())
+    except (OSError, EOFError, ValueError):
+        return None
+
+
+def _station_files_by_day(station_dir, kinds, since=None):
+    """Return {day: [(kind, filename, path, mtime)]} of the station's JSON files."""
+    days = defaultdict(list)
+    for kind in kinds:
+        folder = os.path.join(station_dir, kind)
+        if not os.path.isdir(folder):
+            continue
+        for entry in os.scandir(folder):
+            if not entry.name.endswith('.json'):
+                continue
+            mtime = entry.stat().st_mtime
+            day = datetime.fromtimestamp(mtime).date().isoformat()
+            if since is None or day >= since:
+                days[day].append((kind, entry.name, entry.path, mtime))
+    return days
+
+
+def write_segment(path, station, day, files):
+    """Write the files of one day as a segment (atomically); returns the number of records."""
+    files = sorted(files, key=lambda f: (f[0], f[1]))
+    header = {'segment': SEGMENT_VERSION, 'station': station, 'day': day, 'records': len(files),
+              'latest_mtime': max(f[3] for f in files)}
+    digest = hashlib.sha256()
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wb') as out:
+        def write_line(obj):
+            line = (json.dumps(obj, separators=(',', ':')) + '\n').encode('utf-8')
+            digest.update(line)
+            out.write(line)
+
+        write_line(header)
+        for kind, filename, file_path, mtime in files:
+            with open(file_path, 'r') as f:
+                record = json.load(f)
+            write_line({'kind': kind, 'filename': filename, 'mtime': mtime, 'record': record})
+        out.write((json.dumps({'sha256': digest.hexdigest()}) + '\n').encode('utf-8'))
+    os.replace(tmp_path, path)
+    return len(files)
+
+
+def export_segments(station_dir, output_dir, station, kinds, since=None):
+    """
+    Pack the station's records into one segment per day in output_dir.
+    Segments whose header already matches the day's records (count and latest
+    modification time) are not rewritten. Segments of days (from since on) that
+    no longer have records, e.g. because their only rating was redone on a later
+    day, are removed. Returns ([(path, records, written)], removed paths).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    days = _station_files_by_day(station_dir, kinds, since)
+    results = []
+    for day, files in sorted(days.items()):
+        path = os.path.join(output_dir, segment_filename(station, day))
+        header = _read_header(path)
+        if (header is not None and header.get('records') == len(files)
+                and header.get('latest_mtime') == max(f[3] for f in files)):
+            results.append((path, len(files), False))
+            continue
+        results.append((path, write_segment(path, station, day, files), True))
+
+    removed = []
+    for day, path in sorted(_station_segments(output_dir, station).items()):
+        if day not in days and (since is None or day >= since):
+            os.remove(path)
+            removed.append(path)
+    return results, removed
+
+
+def iter_segment(path):
+    """
+    Stream a segment line by line; yields (header, entry dict, size of the line
+    in bytes) for every record line. The checksum and record count are verified
+    after the last line, so consumers must only commit what they read once the
+    generator is exhausted: ValueError is raised at the end for corrupted or
+    truncated segments (and at once for unreadable or unsupported ones).
+    """
+    digest = hashlib.sha256()
+    header = None
+    trailer = None
+    count = 0
+    try:
+        with gzip.open(path, 'rb') as f:
+            for line in f:
+                if trailer is not None:
+                    raise ValueError("data after the checksum line")
+                obj = json.loads(line)
+                if header is None:
+                    if obj.get('segment') != SEGMENT_VERSION:
+                        raise ValueError(f"unsupported segment version {obj.get('segment')}")
+                    header = obj
+                    digest.update(line)
+                elif 'sha256' in obj and 'record' not in obj:
+                    trailer = obj
+                else:
+                    digest.update(line)
+                    count += 1
+                    yield header, obj, len(line)
+    except (OSError, EOFError, zlib.error) as e:
+        raise ValueError(f"unreadable segment ({e})")
+
+    if header is None or trailer is None:
+        raise ValueError("truncated segment (no checksum line)")
+    if trailer['sha256'] != digest.hexdigest():
+        raise ValueError("checksum mismatch")
+    if count != header['records']:
+        raise ValueError(f"{count} records, header says {header['records']}")
@@ -0,0 +1,400 @@
+"""
+Rating server: an asyncio HTTP service that hands out clips, serves video
+(with HTTP range requests) and pitch images, and accepts ratings, so raters
+only need a browser or a thin client instead of a fully provisioned station.
+
+It reuses the engine of the app: VideoCatalogue, AssignmentEngine (including
+adaptive sampling), MetadataProvider and one shared RatingStore. Implemented on
+asyncio streams from the standard library; the few endpoints need no framework.
+
+Endpoints:
+    GET  /api/scales                 active rating scale configurations
+    GET  /api/next?user_id=ID        next clip for a rater ({"done": true} when finished)
+    POST /api/ratings                store a rating (JSON body with user_id, id and scale values)
+    GET  /api/status                 number of clips, stored ratings and raters with an open clip
+    GET  /videos/<filename>          clip file, supports Range: bytes=...
+    GET  /pitch/<action_id>.png      pitch trajectory image
+
+User ids must consist of letters, digits and '-'. Ratings are checked against
+the active scale configurations before they are stored. The ratings folder is
+rescanned every rescan_seconds, so ratings saved by stations sharing the
+folder are counted while the server runs.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from core.catalogue import action_id_from_filename
+from core.config import scale_key
+from core.pitch import DEFAULT_TRAJECTORY
+from core.ratings import is_valid_user_id
+from core.scales import is_filled, scale_range
+
+# Bytes read from disk and written to the socket per step when streaming a clip
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Largest request body accepted (ratings are a few hundred bytes)
+MAX_BODY_SIZE = 64 * 1024
+
+REASONS = {200: 'OK', 201: 'Created', 206: 'Partial Content', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large', 416: 'Range Not Satisfiable',
+           500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=''):
+        super().__init__(message)
+        self.status = status
+        self.message = message or REASONS.get(status, '')
+
+
+def _json_value(value):
+    """Convert database values (NumPy scalars, NaN) into JSON-serialisable values."""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) inclusive for a 'bytes=' Range header, or None for the full file.
+    Raises HTTPError(416) for ranges outside the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in spec:
+        return None  # Unsupported (multipart) ranges: send the whole file
+    start_text, _, end_text = spec.strip().partition('-')
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            suffix = int(end_text)  # Last N bytes
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        raise HTTPError(400, 'Malformed Range header')
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise HTTPError(416)
+    return start, end
+
+
+def _require_user_id(user_id):
+    if not is_valid_user_id(user_id):
+        raise HTTPError(400, 'user_id must consist of letters, digits and "-"')
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_scale_values(rating_data, scale_configs):
+    """
+    Raise HTTPError(400) unless every scale value of a rating is allowed by its
+    configuration: discrete values from the scale's values, slider values within
+    its range, text as a string. Required scales must be filled unless the
+    action was not recognized.
+    """
+    not_recognized = rating_data.get('action_not_recognized', False)
+    if not isinstance(not_recognized, bool):
+        raise HTTPError(400, 'action_not_recognized must be true or false')
+    for scale in scale_configs:
+        key = scale_key(scale['title'])
+        value = rating_data.get(key)
+        if not is_filled(value):
+            if scale.get('required_to_proceed', True) and not not_recognized:
+                raise HTTPError(400, f"Missing value for {key}")
+            continue
+        scale_type = scale.get('type', 'discrete')
+        if scale_type == 'text':
+            valid = isinstance(value, str)
+        elif scale_type == 'discrete':
+            valid = _is_number(value) and value in scale.get('values', [1, 2, 3, 4, 5, 6, 7])
+        else:
+            low, high = scale_range(scale)
+            valid = _is_number(value) and low <= value <= high
+        if not valid:
+            raise HTTPError(400, f"Invalid value for {key}: {value!r}")
+
+
+class RatingServer:
+    """
+    Serves the rating session over HTTP.
+    Each rater holds at most one open clip; open clips count towards
+    min_ratings_per_video so concurrent raters are not all sent the same clip.
+    Clips not rated within open_clip_timeout seconds (e.g. the rater closed the
+    client) stop counting.
+    """
+    def __init__(self, catalogue, store, assignment, metadata_provider, pitch_cache, scale_configs,
+                 open_clip_timeout=600, rescan_seconds=30):
+        self.catalogue = catalogue
+        self.store = store
+        self.assignment = assignment
+        self.metadata_provider = metadata_provider
+        self.pitch_cache = pitch_cache
+        self.scale_configs = scale_configs
+        self.videos = set(catalogue.list_videos())
+        self.counts = store.rating_counts()  # Stored ratings per action, updated on every save
+        self.queues = {}  # user_id -> remaining clip filenames
+        self.open_clips = {}  # user_id -> (action_id, handed out at) not yet rated
+        self.open_clip_timeout = open_clip_timeout
+        self.rescan_seconds = rescan_seconds
+        self._scanned_at = time.monotonic()
+        # matplotlib is not thread-safe: render missing pitch images on one worker thread
+        self._render_executor = ThreadPoolExecutor(max_workers=1)
+        # Queue and store work (directory scans, JSON writes, convergence updates) blocks on disk:
+        # run it off the event loop, on one thread so the queue state needs no locks
+        self._store_executor = ThreadPoolExecutor(max_workers=1)
+
+    # Queue logic
+
+    def _expire_open_clips(self):
+        """Drop open clips handed out longer than open_clip_timeout ago."""
+        deadline = time.monotonic() - self.open_clip_timeout
+        for user_id in [u for u, (_, opened_at) in self.open_clips.items() if opened_at < deadline]:
+            del self.open_clips[user_id]
+
+    def _rescan(self):
+        """Pick up ratings saved by other stations on the same folder, every rescan_seconds."""
+        if time.monotonic() - self._scanned_at < self.rescan_seconds:
+            return
+        self.store.refresh()
+        self.counts = self.store.rating_counts()
+        if self.assignment.convergence is not None:
+            self.assignment.convergence.update(self.store)
+        self._scanned_at = time.monotonic()
+
+    def _is_full(self, action_id):
+        """Return True if a clip has (or will have, counting open clips) enough ratings."""
+        if self.assignment.convergence is not None:
+            return self.assignment.convergence.is_retired(action_id)
+        in_progress = sum(1 for a, _ in self.open_clips.values() if a == action_id)
+        return self.counts[action_id] + in_progress >= self.assignment.min_ratings_per_video
+
+    def next_clip(self, user_id):
+        """Return the next clip record for a rater, or None if there is nothing left to rate."""
+        _require_user_id(user_id)
+        self._rescan()
+        self._expire_open_clips()
+        self.open_clips.pop(user_id, None)
+        if user_id not in self.queues:
+            self.queues[user_id] = self.assignment.build_queue(user_id)
+        queue = self.queues[user_id]
+        rated = self.store.rated_by_user(user_id)
+        while queue:
+            video = queue.pop(0)
+            action_id = action_id_from_filename(video)
+            planned = user_id in self.assignment.planned_users  # Plans fix the ratings per clip
+            if action_id in rated or (not planned and self._is_full(action_id)):
+                continue
+            self.open_clips[user_id] = (action_id, time.monotonic())
+            metadata = self.metadata_provider.lookup(action_id) or {}
+            return {
+                'filename': video,
+                'action_id': action_id,
+                'video_url': f"/videos/{video}",
+                'pitch_url': f"/pitch/{action_id}.png",
+                'metadata': {key: _json_value(value) for key, value in metadata.items()},
+                'remaining': len(queue),
+            }
+        return None
+
+    def save_rating(self, rating_data):
+        """Validate and store a rating; returns the stored filename."""
+        user_id = rating_data.get('user_id')
+        action_id = str(rating_data.get('id') or '')
+        _require_user_id(user_id)
+        if not action_id:
+            raise HTTPError(400, 'Rating needs an id')
+        if f"{action_id}.mp4" not in self.videos:
+            raise HTTPError(404, f"Unknown clip {action_id}")
+        check_scale_values(rating_data, self.scale_configs)
+        is_new = action_id not in self.store.rated_by_user(user_id)
+        path = self.store.save_rating(user_id, action_id, rating_data)
+        if is_new:
+            self.counts[action_id] += 1
+        if self.assignment.convergence is not None:
+            self.assignment.convergence.update(self.store)
+        if self.open_clips.get(user_id, (None,))[0] == action_id:
+            del self.open_clips[user_id]
+        return os.path.basename(path)
+
+    # HTTP handling
+
+    async def handle_connection(self, reader, writer):
+        """Serve the requests of one (keep-alive) connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    await self._send_json(writer, 400, {'error': 'Malformed request line'})
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = b''
+                if 'content-length' in headers:
+                    try:
+                        length = int(headers['content-length'])
+                    except ValueError:
+                        await self._send_json(writer, 400, {'error': 'Malformed Content-Length'})
+                        break
+                    if not 0 <= length <= MAX_BODY_SIZE:
+                        # The body is not read, so the connection cannot be reused
+                        await self._send_json(writer, 413, {'error': f"Body larger than {MAX_BODY_SIZE} bytes"})
+                        break
+                    body = await reader.readexactly(length)
+
+                try:
+                    await self.route(method, target, headers, body, writer)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {'error': e.message})
+                except Exception as e:
+                    print(f"[ERROR] {method} {target}: {e}")
+                    await self._send_json(writer, 500, {'error': str(e)})
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, target, headers, body, writer):
+        url = urlsplit(target)
+        path = unquote(url.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if path.startswith('/videos/'):
+            self._require(method, 'GET')
+            await self._send_video(writer, path[len('/videos/'):], headers.get('range'))
+        elif path.startswith('/pitch/') and path.endswith('.png'):
+            self._require(method, 'GET')
+            await self._send_pitch(writer, path[len('/pitch/'):-len('.png')])
+        elif path == '/api/next':
+            self._require(method, 'GET')
+            user_id = query.get('user_id')
+            _require_user_id(user_id)
+            clip = await self._in_store_thread(self.next_clip, user_id)
+            await self._send_json(writer, 200, clip if clip is not None else {'done': True})
+        elif path == '/api/ratings':
+            self._require(method, 'POST')
+            try:
+                rating_data = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, 'Body must be a JSON object')
+            if not isinstance(rating_data, dict):
+                raise HTTPError(400, 'Body must be a JSON object')
+            saved = await self._in_store_thread(self.save_rating, rating_data)
+            await self._send_json(writer, 201, {'saved': saved})
+        elif path == '/api/scales':
+            self._require(method, 'GET')
+            await self._send_json(writer, 200, self.scale_configs)
+        elif path == '/api/status':
+            self._require(method, 'GET')
+            await self._send_json(writer, 200, await self._in_store_thread(self.status))
+        else:
+            raise HTTPError(404)
+
+    def status(self):
+        self._expire_open_clips()
+        return {
+            'clips': len(self.videos),
+            'ratings': sum(self.counts.values()),
+            'open_clips': len(self.open_clips),
+        }
+
+    async def _in_store_thread(self, func, *args):
+        """Run queue or store work on the store thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._store_executor, func, *args)
+
+    @staticmethod
+    def _require(method, expected):
+        if method != expected:
+            raise HTTPError(405)
+
+    @staticmethod
+    async def _send(writer, status, body=b'', content_type='application/json', extra_headers=None):
+        headers = {'Content-Type': content_type, 'Content-Length': str(len(body))}
+        headers.update(extra_headers or {})
+        head = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items()) + '\r\n'
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _send_json(self, writer, status, data):
+        await self._send(writer, status, json.dumps(data).encode('utf-8'))
+
+    async def _send_video(self, writer, filename, range_header):
+        """Stream a clip (or the requested byte range of it) in chunks."""
+        if filename not in self.videos:
+            raise HTTPError(404)
+        path = self.catalogue.path_for(filename)
+        size = os.path.getsize(path)
+        byte_range = parse_range(range_header, size)
+        start, end = byte_range if byte_range is not None else (0, size - 1)
+        length = end - start + 1
+
+        headers = {'Content-Type': 'video/mp4', 'Content-Length': str(length), 'Accept-Ranges': 'bytes'}
+        status = 200
+        if byte_range is not None:
+            status = 206
+            headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+        head = f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items()) + '\r\n'
+        writer.write(head.encode('latin-1'))
+
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+                remaining -= len(chunk)
+
+    async def _send_pitch(self, writer, action_id):
+        """Send the pitch image of an action, rendering it on the render thread on a cache miss."""
+        row = self.metadata_provider.lookup(action_id)
+        coords = DEFAULT_TRAJECTORY
+        if row is not None:
+            values = [_json_value(row.get(key)) for key in ('start_x', 'start_y', 'end_x', 'end_y')]
+            if all(v is not None for v in values):
+                coords = values
+        path = self.pitch_cache.get(*coords)
+        if path is None:
+            loop = asyncio.get_running_loop()
+            path = await loop.run_in_executor(self._render_executor, self.pitch_cache.render, *coords)
+        data = await asyncio.to_thread(_read_bytes, path)
+        await self._send(writer, 200, data, 'image/png', {'Cache-Control': 'max-age=86400'})
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        """Run the server until cancelled."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"[INFO] Rating server listening on http://{host}:{port} ({len(self.videos)} clips)")
+        async with server:
+            await server.serve_forever()
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
@@ -0,0 +1,59 @@
+"""
+Timestamps for dwell-time analytics: per-clip rating events and screen transitions.
+Timestamps are stored as ISO strings in local time with millisecond precision.
+"""
+
+from datetime import datetime
+
+# Rating events in the order they happen for a clip
+CLIP_EVENTS = ('video_loaded', 'first_pixel', 'first_frame', 'first_interaction', 'submitted')
+
+# Columns added to every rating record, one per event
+TIMING_COLUMNS = [f"t_{event}" for event in CLIP_EVENTS]
+
+
+def timestamp():
+    """Return the current local time as an ISO string with milliseconds."""
+    return datetime.now().isoformat(timespec='milliseconds')
+
+
+class ClipTimer:
+    """
+    Records when each rating event of the current clip happened.
+    Only the first occurrence of an event is kept, so repeated
+    interactions or frames do not move the timestamp.
+    """
+    def __init__(self):
+        self.times = {}
+
+    def start(self):
+        """Start timing a new clip (the video has just been loaded)."""
+        self.times = {'video_loaded': timestamp()}
+
+    def mark(self, event):
+        """Record an event unless it was already recorded for this clip."""
+        if self.times and event not in self.times:
+            self.times[event] = timestamp()
+
+    def to_record(self):
+        """Return the event timestamps as rating record fields (None if not reached)."""
+        return {f"t_{event}": self.times.get(event) for event in CLIP_EVENTS}
+
+
+class ScreenLog:
+    """
+    Records the screen transitions of one app session.
+    Written to user_sessions/{session_id}.json on every transition.
+    """
+    def __init__(self):
+        self.session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.transitions = []
+        self.summary = {}  # Session-level figures added on close (e.g. clip cache counters)
+
+    def enter(self, screen, user_id=''):
+        """Record that a screen was entered."""
+        self.transitions.append({'screen': screen, 'user_id': user_id, 'entered_at': timestamp()})
+
+    def to_record(self):
+        """Return the session data dict; the last entry marks the session end if closed."""
+        return dict({'session_id': self.session_id, 'transitions': self.transitions}, **self.summary)
@@ -0,0 +1,89 @@
+"""
+Rater model shared by the app and the batch tools.
+"""
+
+
+class User:
+    """
+    Stores demographic and experience data for a user/rater.
+    User ID is constructed from parent name initials, birthdate, birth year, and siblings.
+    Formula: mother_initials + father_initials + (day+month) + (cross_sum_of_year * (siblings+1))
+    """
+    def __init__(self):
+        self.user_id = ''
+        self.data = {}  # Stores all questionnaire field responses
+        # Legacy fields for backward compatibility
+        self.gender = 'Not specified'
+        self.age = 0
+        self.nationality = ''
+        self.player_exp = 0
+        self.coach_exp = 0
+        self.watch_exp = 0
+        self.license = 'Not specified'
+        # User ID components
+        self.mother_initials = ''  # First two letters of mother's given name
+        self.father_initials = ''  # First two letters of father's given name
+        self.siblings = 0          # Number of siblings
+        self.birth_day = 0         # Day of birth
+        self.birth_month = 0       # Month of birth
+        self.birth_year = 0        # Year of birth
+
+    def _calculate_cross_sum(self, number):
+        """Calculate the cross sum (sum of digits) of a number."""
+        return sum(int(digit) for digit in str(abs(number)))
+
+    def set_user_id(self):
+        """
+        Generate user_id from components.
+        Format: mother_initials + father_initials + (day+month) + (cross_sum_year * (siblings+1))
+        """
+        if not self.mother_initials or not self.father_initials:
+            self.user_id = 'unknown'
+            return
+
+        # Calculate day+month sum
+        date_sum = self.birth_day + self.birth_month
+
+        # Calculate cross sum of birth year
+        year_cross_sum = self._calculate_cross_sum(self.birth_year)
+
+        # Calculate final component: cross_sum * (siblings + 1)
+        sibling_factor = year_cross_sum * (self.siblings + 1)
+
+        # Concatenate all parts
+        self.user_id = f"{self.mother_initials}{self.father_initials}{date_sum}{sibling_factor}"
+
+    def set_user_age(self, age):
+        self.age = age
+
+    def set_player_exp(self, years):
+        self.player_exp = years
+
+    def set_coach_exp(self, years):
+        self.coach_exp = years
+
+    def set_watch_exp(self, years):
+        self.watch_exp = years
+
+    def set_user_license(self, license):
+        self.license = license
+
+    def set_user_gender(self, gender):
+        self.gender = gender
+
+    def to_record(self, saved_at):
+        """Return the user data dict written to user_data/{user_id}.json."""
+        data = {
+            'user_id': self.user_id,
+            'gender': self.gender,
+            'age': self.age,
+            'nationality': self.nationality,
+            'license': self.license,
+            'player_exp': self.player_exp,
+            'coach_exp': self.coach_exp,
+            'watch_exp': self.watch_exp,
+            'saved_at': saved_at
+        }
+        # Add all dynamic field data
+        data.update(self.data)
+        return data
@@ -0,0 +1,104 @@
+"""
+Decoder Profile Benchmark
+
+Measures the decode throughput of each decoder profile (decoder section of
+config/config.yaml) on the local clips. Every clip is decoded as fast as
+possible with FFmpeg, using the profile's decoder threads, output pixel format
+and scaling; ffpyplayer uses the same FFmpeg decoders, so the figures show
+which profile keeps up with playback on this machine. Clips are decoded one
+at a time so the measurements do not compete for the CPU.
+
+Reported per profile: decoded frames per second, the real-time factor (seconds
+of video decoded per second; below 1 the player drops frames) and the CPU cores
+used on average.
+
+Requirements: FFmpeg must be installed
+Usage: python utils/benchmark_decoder.py [--profile NAME ...] [--clips N]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.catalogue import VideoCatalogue  # noqa: E402
+from core.config import load_config  # noqa: E402
+from core.decoder import decoder_profile, ffmpeg_args, load_decoder_settings  # noqa: E402
+from core.media import check_ffmpeg  # noqa: E402
+
+
+def decode_clip(path, profile, height):
+    """Decode a clip like the profile; returns (frames, seconds of video, wall seconds, CPU seconds)."""
+    input_args, output_args = ffmpeg_args(profile, height)
+    cmd = (['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin', '-nostats', '-an']
+           + [str(a) for a in input_args] + ['-i', path] + output_args
+           + ['-progress', 'pipe:1', '-f', 'null', '-'])
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'ffmpeg failed')
+
+    progress = dict(line.split('=', 1) for line in result.stdout.splitlines() if '=' in line)
+    frames = int(progress.get('frame', 0))
+    media_seconds = int(progress.get('out_time_us', 0) or 0) / 1e6
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    return frames, media_seconds, wall, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the decode throughput of the decoder profiles.")
+    parser.add_argument('--config', default='config/config.yaml', help="Path to config.yaml")
+    parser.add_argument('--profile', nargs='+', help="Profiles to measure (default: all)")
+    parser.add_argument('--clips', type=int, help="Only decode the first N clips")
+    parser.add_argument('--height', type=int, help="Player height in pixels for scale_to_widget "
+                                                   "(default: 1080 x screen_dimensions.video_player_height)")
+    args = parser.parse_args()
+
+    config_data = load_config(args.config)
+    settings = load_decoder_settings(config_data)
+    names = args.profile or list(settings['profiles'])
+    video_player_height = config_data.get('screen_dimensions', {}).get('video_player_height', 0.56)
+    height = args.height or int(round(1080 * video_player_height))
+
+    if not check_ffmpeg():
+        print("[ERROR] FFmpeg is not installed.")
+        sys.exit(1)
+    try:
+        profiles = {name: decoder_profile(settings, name) for name in names}
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    catalogue = VideoCatalogue(config_data['paths']['video_path'])
+    videos = catalogue.list_videos()[:args.clips]
+    print(f"[INFO] {len(videos)} clips, {len(profiles)} profiles, player height {height}px, "
+          f"active profile '{settings['profile']}'")
+
+    print(f"\n{'Profile':<20} {'Frames/s':>10} {'Real-time':>10} {'CPU cores':>10}")
+    for name, profile in profiles.items():
+        frames = media_seconds = wall = cpu = 0
+        for video in videos:
+            try:
+                clip = decode_clip(catalogue.path_for(video), profile, height)
+            except RuntimeError as e:
+                print(f"  [ERROR] {video}: {e}")
+                continue
+            frames += clip[0]
+            media_seconds += clip[1]
+            wall += clip[2]
+            cpu += clip[3]
+        if wall == 0:
+            print(f"{name:<20} {'-':>10} {'-':>10} {'-':>10}")
+            continue
+        print(f"{name:<20} {frames / wall:>10.0f} {media_seconds / wall:>9.1f}x {cpu / wall:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
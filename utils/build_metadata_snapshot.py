@@ -0,0 +1,64 @@
+"""
+Metadata Snapshot Builder
+
+Extracts the metadata columns the app needs (team, player, jersey number,
+type, body part and trajectory) for the clips in video_path from the full
+DuckDB events table into a compact Arrow IPC (Feather V2) file. Team, player,
+type and body part strings are dictionary-encoded and coordinates stored as
+float32. Stations with paths.metadata_snapshot set memory-map this file at
+startup and do not need the DuckDB database.
+
+Rebuild the snapshot whenever clips are added to video_path.
+
+Requirements: pyarrow
+Usage: python utils/build_metadata_snapshot.py [--db PATH] [--output PATH]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.catalogue import VideoCatalogue  # noqa: E402
+from core.config import load_config  # noqa: E402
+from core.metadata import build_snapshot, pa  # noqa: E402
+
+DEFAULT_SNAPSHOT_PATH = 'cache/metadata.arrow'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the compact metadata snapshot for the clips in video_path.")
+    parser.add_argument('--config', default='config/config.yaml', help="Path to config.yaml")
+    parser.add_argument('--db', help="DuckDB database (default: paths.db_path from config)")
+    parser.add_argument('--videos', help="Clip folder (default: paths.video_path)")
+    parser.add_argument('--output', help=f"Snapshot file (default: paths.metadata_snapshot or {DEFAULT_SNAPSHOT_PATH})")
+    args = parser.parse_args()
+
+    if pa is None:
+        print("[ERROR] pyarrow is not installed (pip install pyarrow).")
+        sys.exit(1)
+
+    config_data = load_config(args.config)
+    paths = config_data.get('paths', {})
+    db_path = args.db or paths['db_path']
+    video_path = args.videos or paths['video_path']
+    output = args.output or paths.get('metadata_snapshot') or DEFAULT_SNAPSHOT_PATH
+
+    action_ids = VideoCatalogue(video_path).action_ids()
+    print(f"[INFO] {len(action_ids)} clips in {video_path}")
+
+    start = time.perf_counter()
+    count = build_snapshot(db_path, action_ids, output)
+    elapsed = time.perf_counter() - start
+
+    print(f"[INFO] Wrote {count} actions to {output} ({os.path.getsize(output) / 1024:.0f} KB) in {elapsed:.1f}s")
+    if count < len(action_ids):
+        print(f"[WARNING] {len(action_ids) - count} clips have no row in the events table")
+    if not paths.get('metadata_snapshot'):
+        print(f"[INFO] Set paths.metadata_snapshot in config.yaml to {output} to use it in the app")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Image to Video Converter
+
+Converts images to videos by displaying the image for a configurable duration
+followed by a black screen for a configurable duration. Settings are read from
+the image_conversion section of config/config.yaml.
+
+The black screen is identical for every output, so it is encoded once and
+appended to each image segment by stream copy. Image segments are encoded
+with settings tuned for static content (-tune stillimage, few keyframes).
+
+Images are converted on a bounded pool of parallel FFmpeg jobs. Outputs that are
+up to date with their source image and the current settings are skipped, so the
+tool can be rerun after adding images. A catalogue.json listing all produced
+clips is written into the output folder; point video_path at that folder and
+the app reads the clip list from it.
+
+Requirements: FFmpeg must be installed
+Usage: python utils/convert_images_to_videos.py [--workers N] [--force]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.catalogue import action_id_from_filename, write_catalogue  # noqa: E402
+from core.config import load_config  # noqa: E402
+from core.media import (BuildManifest, check_ffmpeg, default_workers,  # noqa: E402
+                        run_ffmpeg, run_parallel, settings_hash)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp')
+MANIFEST_FILENAME = '.conversion_manifest.json'
+
+# Defaults for the image_conversion section of config.yaml
+DEFAULT_SETTINGS = {
+    'input_folder': './images',    # Path to folder containing input images
+    'output_folder': './videos',   # Path to folder for output videos
+    'image_duration': 2,           # Duration to display the image (seconds)
+    'black_duration': 2,           # Duration to display black screen (seconds)
+    'fps': 30,                     # Frames per second
+    'video_codec': 'libx264',      # Video codec
+    'pixel_format': 'yuv420p',     # Pixel format (yuv420p for compatibility)
+    'width': 1920,                 # Output frame width
+    'height': 1080,                # Output frame height
+    'keyframe_interval': 2,        # Seconds between keyframes (static content needs few)
+    'workers': None,               # Parallel FFmpeg jobs (default: half the CPU cores)
+}
+
+# Settings that change the encoded output (used to invalidate existing videos)
+ENCODING_KEYS = ('image_duration', 'black_duration', 'fps', 'video_codec', 'pixel_format', 'width', 'height',
+                 'keyframe_interval')
+
+# Bump when the encoding pipeline changes so existing videos are rebuilt
+PIPELINE_VERSION = 2
+
+
+def load_settings(config_path):
+    """Return the image_conversion settings from config.yaml merged with the defaults."""
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        settings.update(load_config(config_path).get('image_conversion') or {})
+    except FileNotFoundError:
+        print(f"[WARNING] {config_path} not found, using default conversion settings")
+    return settings
+
+
+def find_images(input_folder):
+    """Return the sorted list of image paths in input_folder."""
+    return sorted(
+        os.path.join(input_folder, f) for f in os.listdir(input_folder)
+        if f.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(input_folder, f))
+    )
+
+
+def output_path_for(image_path, output_folder):
+    """Return the output video path for an image (same name, .mp4 extension)."""
+    return os.path.join(output_folder, f"{action_id_from_filename(image_path)}.mp4")
+
+
+def encode_args(settings):
+    """
+    Return the encoder arguments shared by the image segments and the black tail.
+    Both segments must be encoded identically so they can be joined by stream copy.
+    """
+    args = ['-c:v', settings['video_codec'], '-r', settings['fps'], '-pix_fmt', settings['pixel_format'],
+            '-g', int(settings['fps'] * settings['keyframe_interval']), '-video_track_timescale', 90000]
+    if settings['video_codec'] == 'libx264':
+        # Tuned for static content: far fewer bits for frames that repeat the previous one
+        args += ['-tune', 'stillimage', '-profile:v', 'high']
+    return args
+
+
+def black_tail_path(output_folder, digest):
+    """
+    Return the path of the shared black tail segment for the given settings.
+    The name does not end in .mp4, so folder scans for clips do not list it.
+    """
+    return os.path.join(output_folder, f".black_tail_{digest}.tail")
+
+
+def remove_legacy_black_tails(output_folder):
+    """Remove black tails written by earlier versions under a .mp4 name."""
+    for filename in os.listdir(output_folder):
+        if filename.startswith('.black_tail_') and filename.endswith('.mp4'):
+            os.remove(os.path.join(output_folder, filename))
+
+
+def encode_black_tail(path, settings):
+    """Encode the black screen segment once; it is identical for every output."""
+    if os.path.exists(path):
+        return path
+    width, height = settings['width'], settings['height']
+    tmp_path = f"{path}.part"
+    run_ffmpeg(['-f', 'lavfi', '-i', f"color=c=black:s={width}x{height}:r={settings['fps']}",
+                '-t', settings['black_duration']] + encode_args(settings) + ['-f', 'mp4', tmp_path])
+    os.replace(tmp_path, path)
+    return path
+
+
+def convert_image(image_path, output_path, black_tail, settings):
+    """Encode the image segment and join it with the shared black tail by stream copy."""
+    width, height = settings['width'], settings['height']
+
+    with tempfile.TemporaryDirectory(prefix='img2vid_') as tmp_dir:
+        image_video = os.path.join(tmp_dir, 'image.mp4')
+        concat_list = os.path.join(tmp_dir, 'concat.txt')
+
+        # Convert image to video segment (keep aspect ratio, pad with black)
+        run_ffmpeg(['-loop', 1, '-framerate', settings['fps'], '-i', image_path, '-t', settings['image_duration'],
+                    '-vf', f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                           f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black"] + encode_args(settings) + [image_video])
+
+        # Concatenate the image segment with the pre-encoded black tail (no re-encode)
+        with open(concat_list, 'w') as f:
+            for segment in (image_video, os.path.abspath(black_tail)):
+                escaped = segment.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        tmp_output = f"{output_path}.part"
+        run_ffmpeg(['-f', 'concat', '-safe', 0, '-i', concat_list, '-c', 'copy', '-f', 'mp4', tmp_output])
+        os.replace(tmp_output, output_path)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert images to short videos for the rating app.")
+    parser.add_argument('--config', default='config/config.yaml', help="Path to config.yaml")
+    parser.add_argument('--input', help="Input image folder (overrides image_conversion.input_folder)")
+    parser.add_argument('--output', help="Output video folder (overrides image_conversion.output_folder)")
+    parser.add_argument('--workers', type=int, help="Number of parallel FFmpeg jobs")
+    parser.add_argument('--force', action='store_true', help="Reconvert all images even if up to date")
+    args = parser.parse_args()
+
+    settings = load_settings(args.config)
+    input_folder = args.input or settings['input_folder']
+    output_folder = args.output or settings['output_folder']
+    workers = args.workers or settings['workers'] or default_workers()
+
+    if not check_ffmpeg():
+        print("[ERROR] FFmpeg is not installed.")
+        print("Please install FFmpeg first:")
+        print("  Ubuntu/Debian: sudo apt install ffmpeg")
+        print("  macOS: brew install ffmpeg")
+        sys.exit(1)
+
+    if not os.path.isdir(input_folder):
+        print(f"[ERROR] Input folder '{input_folder}' does not exist.")
+        sys.exit(1)
+    os.makedirs(output_folder, exist_ok=True)
+
+    print("=" * 40)
+    print("Image to Video Converter")
+    print("=" * 40)
+    print(f"Image display time: {settings['image_duration']}s")
+    print(f"Black screen time:  {settings['black_duration']}s")
+    print(f"Input folder:       {input_folder}")
+    print(f"Output folder:      {output_folder}")
+    print(f"Parallel jobs:      {workers}")
+    print("=" * 40)
+
+    images = find_images(input_folder)
+    if not images:
+        print(f"[WARNING] No image files found in '{input_folder}'")
+        print("Supported formats: " + ', '.join(ext[1:].upper() for ext in IMAGE_EXTENSIONS))
+        return
+
+    manifest = BuildManifest(os.path.join(output_folder, MANIFEST_FILENAME))
+    digest = settings_hash(dict({key: settings[key] for key in ENCODING_KEYS}, pipeline=PIPELINE_VERSION))
+
+    pending = [
+        image for image in images
+        if args.force or not manifest.is_up_to_date(output_path_for(image, output_folder), image, digest)
+    ]
+    print(f"Found {len(images)} images, {len(images) - len(pending)} already up to date, {len(pending)} to convert\n")
+
+    remove_legacy_black_tails(output_folder)
+    black_tail = None
+    if pending:
+        black_tail = encode_black_tail(black_tail_path(output_folder, digest), settings)
+
+    outcomes = run_parallel(
+        lambda image: convert_image(image, output_path_for(image, output_folder), black_tail, settings),
+        pending, workers, label='converted'
+    )
+    failed = 0
+    for image, output_path, error in outcomes:
+        if error is None:
+            manifest.record(output_path, image, digest)
+        else:
+            failed += 1
+    manifest.save()
+
+    # Catalogue of all clips built from the current images
+    duration = settings['image_duration'] + settings['black_duration']
+    entries = []
+    for image in images:
+        output_path = output_path_for(image, output_folder)
+        if manifest.get(output_path) is not None and os.path.exists(output_path):
+            entries.append({
+                'filename': os.path.basename(output_path),
+                'action_id': action_id_from_filename(output_path),
+                'source': os.path.basename(image),
+                'duration': duration,
+            })
+    catalogue_path = write_catalogue(output_folder, entries)
+
+    print("")
+    print("=" * 40)
+    print("Conversion Complete")
+    print("=" * 40)
+    print(f"Total images:  {len(images)}")
+    print(f"Converted:     {len(pending) - failed}")
+    print(f"Skipped:       {len(images) - len(pending)}")
+    print(f"Failed:        {failed}")
+    print(f"Catalogue:     {catalogue_path} ({len(entries)} clips)")
+    print("=" * 40)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Coverage Dashboard
+
+A small local web page for the study coordinator that shows, while stations
+are rating, how many clips have reached min_ratings_per_video, the coverage
+histogram (clips per number of ratings), the ratings still needed and the
+throughput of every rater.
+
+It reads the ratings folder the stations write to (e.g. a shared folder) via
+an incrementally maintained count index (core/coverage.py), so a refresh only
+reads the ratings saved since the previous one. Every station appends to its
+own index log, so stations sharing the folder over the network do not
+interleave lines. Ratings copied into the folder by other means (e.g.
+utils/merge_stations.py) are counted on the next start.
+
+Usage: python utils/coverage_dashboard.py [--ratings-dir DIR] [--port N]
+       then open http://127.0.0.1:8766 in a browser
+"""
+
+import argparse
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.catalogue import VideoCatalogue  # noqa: E402
+from core.config import load_config  # noqa: E402
+from core.coverage import CoverageIndex  # noqa: E402
+
+# Defaults for the coverage_dashboard section of config.yaml
+DEFAULT_SETTINGS = {
+    'host': '127.0.0.1',
+    'port': 8766,
+    'refresh_seconds': 5,      # Page refresh interval
+}
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Rating coverage</title>
+<style>
+  body { font-family: sans-serif; margin: 2em; color: #222; }
+  .figures span { display: inline-block; margin-right: 2em; font-size: 1.3em; }
+  .bar { background: #3b7dd8; height: 1.1em; display: inline-block; vertical-align: middle; }
+  .complete .bar { background: #2e9e52; }
+  table { border-collapse: collapse; margin-top: 1em; }
+  td, th { padding: 0.2em 0.8em; text-align: right; border-bottom: 1px solid #ddd; }
+  td:first-child, th:first-child { text-align: left; }
+  .muted { color: #888; }
+</style>
+</head>
+<body>
+<h1>Rating coverage</h1>
+<div class="figures" id="figures"></div>
+<h2>Clips per number of ratings</h2>
+<table id="histogram"></table>
+<h2>Raters</h2>
+<table id="raters"></table>
+<p class="muted" id="updated"></p>
+<script>
+// Values (e.g. user ids typed in by raters) are only ever set as textContent
+function cell(row, text) {
+  const td = row.insertCell();
+  td.textContent = text;
+  return td;
+}
+function header(table, titles) {
+  const row = table.insertRow();
+  for (const title of titles) {
+    const th = document.createElement('th');
+    th.textContent = title;
+    row.appendChild(th);
+  }
+}
+async function refresh() {
+  const data = await (await fetch('/api/coverage')).json();
+  const figures = document.getElementById('figures');
+  figures.replaceChildren();
+  for (const text of [`${data.complete_clips} / ${data.clips} clips complete`,
+                      `${(data.progress * 100).toFixed(1)}% of ratings collected`,
+                      `${data.remaining_ratings} ratings to go`]) {
+    const span = document.createElement('span');
+    span.textContent = text;
+    figures.appendChild(span);
+  }
+
+  const largest = Math.max(1, ...data.histogram.map(h => h.clips));
+  const histogram = document.getElementById('histogram');
+  histogram.replaceChildren();
+  header(histogram, ['Ratings', 'Clips', '']);
+  for (const h of data.histogram) {
+    const row = histogram.insertRow();
+    if (h.ratings >= data.min_ratings) row.className = 'complete';
+    cell(row, h.ratings);
+    cell(row, h.clips);
+    const bar = document.createElement('div');
+    bar.className = 'bar';
+    bar.style.width = `${100 * h.clips / largest}%`;
+    const td = cell(row, '');
+    td.style.width = '30em';
+    td.style.textAlign = 'left';
+    td.appendChild(bar);
+  }
+
+  const raters = document.getElementById('raters');
+  raters.replaceChildren();
+  header(raters, ['Rater', 'Ratings', 'Last hour', 'Last rating']);
+  for (const r of data.raters) {
+    const row = raters.insertRow();
+    for (const value of [r.user_id, r.ratings, r.last_hour, r.last_rating]) cell(row, value);
+  }
+  document.getElementById('updated').textContent =
+    `Updated ${data.updated_at}, minimum ${data.min_ratings} ratings per clip` +
+    (data.skipped_lines ? `, ${data.skipped_lines} unreadable index lines (restart to recount)` : '');
+}
+refresh();
+setInterval(refresh, REFRESH_MS);
+</script>
+</body>
+</html>
+"""
+
+
+def make_handler(index, refresh_seconds):
+    page = PAGE.replace('REFRESH_MS', str(int(refresh_seconds * 1000))).encode('utf-8')
+
+    class DashboardHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/':
+                self._send(200, page, 'text/html; charset=utf-8')
+            elif self.path == '/api/coverage':
+                index.update()
+                self._send(200, json.dumps(index.summary()).encode('utf-8'), 'application/json')
+            else:
+                self._send(404, b'Not Found', 'text/plain')
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep the console for the [INFO] lines
+
+    return DashboardHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a live rating coverage dashboard.")
+    parser.add_argument('--config', default='config/config.yaml', help="Path to config.yaml")
+    parser.add_argument('--ratings-dir', default='user_ratings', help="Ratings folder the stations write to")
+    parser.add_argument('--host', help="Interface to listen on (default: coverage_dashboard.host or 127.0.0.1)")
+    parser.add_argument('--port', type=int, help="Port to listen on (default: coverage_dashboard.port or 8766)")
+    args = parser.parse_args()
+
+    config_data = load_config(args.config)
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(config_data.get('coverage_dashboard') or {})
+    host = args.host or settings['host']
+    port = args.port or settings['port']
+
+    action_ids = VideoCatalogue(config_data['paths']['video_path']).action_ids()
+    index = CoverageIndex(args.ratings_dir, action_ids, config_data['settings']['min_ratings_per_video'])
+    print(f"[INFO] {len(action_ids)} clips, {len(index.keys)} stored ratings in {args.ratings_dir}")
+
+    server = HTTPServer((host, port), make_handler(index, settings['refresh_seconds']))
+    print(f"[INFO] Coverage dashboard on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Dashboard stopped.")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
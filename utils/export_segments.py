@@ -0,0 +1,65 @@
+"""
+Segment Export
+
+Packs a station's ratings, user data and session logs into one compressed,
+checksummed segment file per day ({station}_{YYYY-MM-DD}.segment.jsonl.gz),
+so shipping the data off the station copies a few files instead of many small
+JSON files. Days whose segment is already up to date are not rewritten, so
+the export can be rerun onto the same USB stick every day.
+
+Import the segments on the analysis machine with utils/merge_stations.py,
+which reads them directly and rejects corrupted or truncated copies.
+
+Usage: python utils/export_segments.py OUTPUT_DIR [--station NAME] [--since YYYY-MM-DD]
+"""
+
+import argparse
+import os
+import socket
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.merge import DATA_KINDS  # noqa: E402
+from core.segments import export_segments  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack station data into daily segments.")
+    parser.add_argument('output', help="Folder to write the segments to (e.g. a USB stick)")
+    parser.add_argument('--station', default=socket.gethostname(),
+                        help="Station name used in the segment filenames (default: host name)")
+    parser.add_argument('--data-dir', default='.', help="Folder containing user_ratings/, user_data/ "
+                                                        "and user_sessions/")
+    parser.add_argument('--since', help="Only pack days from this day on (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    if args.since:
+        try:
+            args.since = date.fromisoformat(args.since).isoformat()
+        except ValueError:
+            print(f"[ERROR] --since must be a day like 2024-05-31, got '{args.since}'.")
+            sys.exit(1)
+    if os.sep in args.station:
+        print(f"[ERROR] Station name '{args.station}' must not contain '{os.sep}'.")
+        sys.exit(1)
+
+    results, removed = export_segments(args.data_dir, args.output, args.station, DATA_KINDS, args.since)
+    for path in removed:
+        print(f"  {os.path.basename(path)}: removed (no records left on that day)")
+    if not results and not removed:
+        print("[WARNING] No records to pack.")
+        return
+
+    written = 0
+    for path, records, is_written in results:
+        if is_written:
+            written += 1
+            print(f"  {os.path.basename(path)}: {records} records")
+    print(f"[INFO] {written} segments written, {len(results) - written} up to date, "
+          f"{len(removed)} removed in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Poster Frame Extractor
+
+Writes the first frame of every clip in video_path as a small JPEG into the
+poster cache (paths.poster_cache_path), named <action_id>.jpg. The rating app
+shows the poster immediately when a clip is loaded, while the decoder opens
+the clip, and hands over to live playback on the first decoded frame.
+
+Settings are read from the poster_frames section of config/config.yaml.
+Frames are extracted on a bounded pool of parallel FFmpeg jobs and skipped when
+the source content and settings are unchanged, so the step can be rerun after
+clips were added.
+
+Requirements: FFmpeg must be installed
+Usage: python utils/extract_posters.py [--workers N] [--force]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.catalogue import VideoCatalogue, action_id_from_filename  # noqa: E402
+from core.config import load_config  # noqa: E402
+from core.media import (BuildManifest, check_ffmpeg, default_workers,  # noqa: E402
+                        run_ffmpeg, run_parallel, settings_hash)
+
+MANIFEST_FILENAME = '.poster_manifest.json'
+DEFAULT_POSTER_CACHE_PATH = 'cache/posters'
+
+# Defaults for the poster_frames section of config.yaml
+DEFAULT_SETTINGS = {
+    'height': 480,     # Poster height in pixels (the player scales it to the video area)
+    'quality': 5,      # JPEG quality, 2 (best) to 31 (smallest)
+    'workers': None,   # Parallel FFmpeg jobs (default: half the CPU cores)
+}
+
+# Settings that change the extracted image (used to invalidate existing posters)
+IMAGE_KEYS = ('height', 'quality')
+
+
+def load_settings(config_data):
+    """Return the poster_frames settings merged with the defaults."""
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(config_data.get('poster_frames') or {})
+    return settings
+
+
+def extract_poster(source_path, output_path, settings):
+    """Write the first frame of a clip as a JPEG."""
+    tmp_output = f"{output_path}.part"
+    run_ffmpeg(['-i', source_path, '-frames:v', '1',
+                '-vf', f"scale=-2:{settings['height']}", '-q:v', settings['quality'],
+                '-f', 'image2', '-c:v', 'mjpeg', tmp_output])
+    os.replace(tmp_output, output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the first frame of every clip as a poster image.")
+    parser.add_argument('--config', default='config/config.yaml', help="Path to config.yaml")
+    parser.add_argument('--input', help="Clip folder (default: paths.video_path)")
+    parser.add_argument('--output', help=f"Poster folder (default: paths.poster_cache_path or {DEFAULT_POSTER_CACHE_PATH})")
+    parser.add_argument('--workers', type=int, help="Number of parallel FFmpeg jobs")
+    parser.add_argument('--force', action='store_true', help="Extract all posters even if up to date")
+    args = parser.parse_args()
+
+    config_data = load_config(args.config)
+    settings = load_settings(config_data)
+    paths = config_data.get('paths', {})
+    input_folder = args.input or paths['video_path']
+    output_folder = args.output or paths.get('poster_cache_path', DEFAULT_POSTER_CACHE_PATH)
+    workers = args.workers or settings['workers'] or default_workers()
+
+    if not check_ffmpeg():
+        print("[ERROR] FFmpeg is not installed.")
+        sys.exit(1)
+    os.makedirs(output_folder, exist_ok=True)
+
+    catalogue = VideoCatalogue(input_folder)
+    videos = catalogue.list_videos()
+    print(f"[INFO] {len(videos)} clips in {input_folder}, poster height {settings['height']}px, {workers} parallel jobs")
+
+    manifest = BuildManifest(os.path.join(output_folder, MANIFEST_FILENAME))
+    digest = settings_hash({key: settings[key] for key in IMAGE_KEYS})
+
+    jobs = [(catalogue.path_for(v), os.path.join(output_folder, f"{action_id_from_filename(v)}.jpg")) for v in videos]
+    pending = [
+        (source, output) for source, output in jobs
+        if args.force or not manifest.is_up_to_date(output, source, digest)
+    ]
+    print(f"[INFO] {len(jobs) - len(pending)} posters up to date, {len(pending)} to extract")
+
+    outcomes = run_parallel(
+        lambda job: extract_poster(job[0], job[1], settings),
+        pending, workers, label='extracted'
+    )
+    failed = 0
+    for (source, output), _, error in outcomes:
+        if error is None:
+            manifest.record(output, source, digest)
+        else:
+            failed += 1
+    manifest.save()
+
+    total_kb = sum(os.path.getsize(output) for _, output in jobs if os.path.exists(output)) / 1024
+    print(f"\n[INFO] Extracted {len(pending) - failed} posters ({failed} failed), "
+          f"{total_kb / max(len(jobs), 1):.0f} KB per poster on average")
+    print(f"[INFO] Poster cache: {output_folder}")
+
+
+if __name__ == '__main__':
+    main()
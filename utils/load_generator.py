@@ -0,0 +1,128 @@
+"""
+Load Generator for the rating server
+
+Simulates N raters against a running rating server (utils/rating_server.py).
+Each simulated rater repeatedly fetches its next clip, reads the start of the
+video with a range request (as a player does when opening a clip), loads the
+pitch image, waits a think time and submits random ratings for the active
+scales. Latency percentiles per request type and the overall throughput
+are reported at the end.
+
+Ratings are stored by the server under user ids starting with 'load'; run it
+against a server with a separate ratings folder or remove them afterwards.
+
+Usage: python utils/load_generator.py [--url URL] [--raters N] [--clips-per-rater N] [--think S]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.client import RatingClient, RatingClientError  # noqa: E402
+from core.config import scale_key  # noqa: E402
+from core.scales import scale_range  # noqa: E402
+
+
+class LatencyRecorder:
+    """Thread-safe collection of request latencies per request type."""
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def timed(self, name, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        except (RatingClientError, OSError):
+            with self._lock:
+                self.errors[name] += 1
+            raise
+        finally:
+            with self._lock:
+                self.samples[name].append(time.perf_counter() - start)
+
+    def report(self, elapsed):
+        total = sum(len(s) for s in self.samples.values())
+        print(f"\n{'request':<10} {'count':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for name, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+            print(f"{name:<10} {len(ordered):>7} {self.errors[name]:>7} {statistics.median(ordered) * 1000:>8.1f} "
+                  f"{p95 * 1000:>8.1f} {ordered[-1] * 1000:>8.1f}")
+        print(f"\n[INFO] {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} requests/s)")
+
+
+def random_rating(user_id, action_id, scale_configs, rng):
+    """Return a rating record with random values for all scales (a fixed comment for text scales)."""
+    rating = {'user_id': user_id, 'id': action_id, 'action_not_recognized': False}
+    for scale in scale_configs:
+        bounds = scale_range(scale)
+        if bounds is None:
+            value = 'load test'
+        elif scale.get('type', 'discrete') == 'slider':
+            value = round(rng.uniform(*bounds), 2)
+        else:
+            value = rng.choice(scale.get('values', [1, 2, 3, 4, 5, 6, 7]))
+        rating[scale_key(scale['title'])] = value
+    return rating
+
+
+def simulate_rater(url, user_id, clips, think, range_bytes, recorder, seed):
+    """Rate up to clips clips as one rater; returns the number of ratings submitted."""
+    rng = random.Random(seed)
+    client = RatingClient(url)
+    submitted = 0
+    try:
+        scale_configs = recorder.timed('scales', client.scales)
+        for _ in range(clips):
+            clip = recorder.timed('next', client.next_clip, user_id)
+            if clip is None:
+                break
+            recorder.timed('video', client.fetch, clip['video_url'], 0, range_bytes - 1)
+            recorder.timed('pitch', client.fetch, clip['pitch_url'])
+            time.sleep(rng.uniform(0.5, 1.5) * think)
+            recorder.timed('rating', client.submit, random_rating(user_id, clip['action_id'], scale_configs, rng))
+            submitted += 1
+    except (RatingClientError, OSError) as e:
+        print(f"[ERROR] {user_id}: {e}")
+    finally:
+        client.close()
+    return submitted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate raters against a rating server.")
+    parser.add_argument('--url', default='http://127.0.0.1:8765', help="Server URL")
+    parser.add_argument('--raters', type=int, default=30, help="Number of simultaneous raters")
+    parser.add_argument('--clips-per-rater', type=int, default=20, help="Clips each rater rates")
+    parser.add_argument('--think', type=float, default=1.0, help="Mean think time per clip (seconds)")
+    parser.add_argument('--range-bytes', type=int, default=1 << 20, help="Bytes of each clip read per request")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    recorder = LatencyRecorder()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.raters) as executor:
+        futures = [
+            executor.submit(simulate_rater, args.url, f"load{i:03d}", args.clips_per_rater, args.think,
+                            args.range_bytes, recorder, args.seed + i)
+            for i in range(args.raters)
+        ]
+        submitted = sum(f.result() for f in futures)
+    elapsed = time.perf_counter() - start
+
+    recorder.report(elapsed)
+    print(f"[INFO] {submitted} ratings from {args.raters} raters ({submitted / elapsed * 3600:.0f} ratings/hour)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Station Merger
+
+Merges the rating data of several lab stations into one store. Each source
+is a station folder (containing user_ratings/, user_data/ and user_sessions/),
+a .zip/.tar(.gz) archive of one, a segment written by utils/export_segments.py
+or a folder of segments (e.g. a USB stick). Folders and archives are read in
+parallel; segments are streamed into the store without unpacking and only
+committed once their checksum has been verified.
+
+The store packs the records of each kind into one JSON-lines log
+(user_ratings.jsonl, user_data.jsonl, user_sessions.jsonl) instead of one file
+per record; the export reads these logs directly.
+
+Records are deduplicated by filename ({user_id}_{action_id}.json for ratings)
+and content hash: identical copies are merged once, while records that share a
+filename but differ are reported in merge_conflicts.csv and kept under
+conflicts/ in the store. Earlier sources win conflicts. Files that were
+ingested before and are unchanged are skipped without being read, so the
+merge can be rerun whenever stations deliver new data.
+
+Usage: python utils/merge_stations.py STORE SOURCE [SOURCE ...] [--workers N] [--export]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.merge import CONFLICTS_FILENAME, StationMerger, packed_log_path  # noqa: E402
+from core.segments import list_segments  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge station rating data into one store.")
+    parser.add_argument('store', help="Folder of the merged store (created if missing)")
+    parser.add_argument('sources', nargs='+', help="Station folders, archives, segments or folders of segments")
+    parser.add_argument('--workers', type=int, default=4, help="Number of sources read in parallel")
+    parser.add_argument('--export', action='store_true', help="Run the CSV export on the merged store")
+    args = parser.parse_args()
+
+    for source in args.sources:
+        if not os.path.exists(source):
+            print(f"[ERROR] Source '{source}' does not exist.")
+            sys.exit(1)
+
+    # Folders of segments are expanded, sorted by station and day so later days update earlier ones
+    sources = []
+    for source in args.sources:
+        segments = list_segments(source) if os.path.isdir(source) else []
+        sources.extend(segments or [source])
+
+    merger = StationMerger(args.store)
+    stats = merger.merge(sources, args.workers)
+
+    print(f"\n[INFO] {stats['new']} new, {stats['updated']} updated, {stats['duplicate']} duplicate, "
+          f"{stats['outdated']} outdated, {stats['unchanged']} unchanged, {stats['invalid']} invalid records")
+    if stats['conflict'] or merger.conflicts:
+        print(f"[WARNING] {stats['conflict']} conflicting records in this run, "
+              f"{len(merger.conflicts)} in total, see {os.path.join(args.store, CONFLICTS_FILENAME)}")
+
+    if args.export:
+        from core.export import Exporter
+        Exporter(packed_log_path(args.store, 'user_ratings'), packed_log_path(args.store, 'user_data'),
+                 output_dir=os.path.join(args.store, 'output'), backup_dir=os.path.join(args.store, 'backup'),
+                 sessions_dir=packed_log_path(args.store, 'user_sessions')).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Video Normaliser
+
+Transcodes the clips in video_path into a uniform format that the Kivy video
+player opens and loops quickly:
+- scaled to the height of the video area on the lab screens
+  (screen_height * screen_dimensions.video_player_height)
+- short keyframe interval, so seeking and restarting in loop mode is cheap
+- moov atom at the start of the file (+faststart)
+- audio removed unless keep_audio is set
+
+Settings are read from the video_normalization section of config/config.yaml.
+Clips are transcoded on a bounded pool of parallel FFmpeg jobs and skipped when
+the source content and settings are unchanged. For every clip the time to open
+it and decode the first frame is measured before and after normalisation and
+stored in the catalogue.json written into the output folder.
+
+Requirements: FFmpeg must be installed
+Usage: python utils/normalize_videos.py [--workers N] [--force]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.catalogue import VideoCatalogue, action_id_from_filename, write_catalogue  # noqa: E402
+from core.config import load_config  # noqa: E402
+from core.media import (BuildManifest, check_ffmpeg, default_workers,  # noqa: E402
+                        run_ffmpeg, run_parallel, settings_hash)
+
+MANIFEST_FILENAME = '.normalization_manifest.json'
+
+# Defaults for the video_normalization section of config.yaml
+DEFAULT_SETTINGS = {
+    'output_folder': './videos_normalized',  # Folder for normalised clips (point video_path here)
+    'screen_height': 1080,     # Vertical resolution of the lab screens (pixels)
+    'keyframe_interval': 0.5,  # Seconds between keyframes
+    'keep_audio': False,       # Keep the audio track
+    'video_codec': 'libx264',  # Video codec
+    'preset': 'veryfast',      # Encoder speed/size trade-off
+    'crf': 20,                 # Constant quality (lower = better)
+    'pixel_format': 'yuv420p', # Pixel format (yuv420p for compatibility)
+    'workers': None,           # Parallel FFmpeg jobs (default: half the CPU cores)
+}
+
+# Settings that change the encoded output (used to invalidate existing clips)
+ENCODING_KEYS = ('keyframe_interval', 'keep_audio', 'video_codec', 'preset', 'crf', 'pixel_format')
+
+
+def load_settings(config_data):
+    """Return the video_normalization settings merged with the defaults."""
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(config_data.get('video_normalization') or {})
+    return settings
+
+
+def target_height(settings, config_data):
+    """Return the output height: the pixel height of the video area, rounded to an even number."""
+    video_player_height = config_data.get('screen_dimensions', {}).get('video_player_height', 0.56)
+    height = int(round(settings['screen_height'] * video_player_height))
+    return max(2, height - height % 2)
+
+
+def measure_open_latency(path):
+    """
+    Return the seconds needed to open a clip and decode its first frame.
+    Includes FFmpeg process start-up, which is the same for every measurement.
+    """
+    start = time.perf_counter()
+    subprocess.run(['ffmpeg', '-v', 'quiet', '-nostdin', '-i', path, '-frames:v', '1', '-f', 'null', '-'],
+                   capture_output=True)
+    return time.perf_counter() - start
+
+
+def normalize_clip(source_path, output_path, height, settings):
+    """Transcode one clip and return (open latency before, open latency after)."""
+    latency_before = measure_open_latency(source_path)
+
+    args = ['-i', source_path,
+            '-vf', f"scale=-2:{height}",
+            '-c:v', settings['video_codec'], '-preset', settings['preset'], '-crf', settings['crf'],
+            '-pix_fmt', settings['pixel_format'],
+            '-force_key_frames', f"expr:gte(t,n_forced*{settings['keyframe_interval']})",
+            '-movflags', '+faststart']
+    args += ['-c:a', 'aac'] if settings['keep_audio'] else ['-an']
+    tmp_output = f"{output_path}.part"
+    run_ffmpeg(args + ['-f', 'mp4', tmp_output])
+    os.replace(tmp_output, output_path)
+
+    return latency_before, measure_open_latency(output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalise clips for fast start-up in the rating app.")
+    parser.add_argument('--config', default='config/config.yaml', help="Path to config.yaml")
+    parser.add_argument('--input', help="Source clip folder (default: paths.video_path)")
+    parser.add_argument('--output', help="Output folder (overrides video_normalization.output_folder)")
+    parser.add_argument('--workers', type=int, help="Number of parallel FFmpeg jobs")
+    parser.add_argument('--force', action='store_true', help="Transcode all clips even if up to date")
+    args = parser.parse_args()
+
+    config_data = load_config(args.config)
+    settings = load_settings(config_data)
+    input_folder = args.input or config_data['paths']['video_path']
+    output_folder = args.output or settings['output_folder']
+    workers = args.workers or settings['workers'] or default_workers()
+    height = target_height(settings, config_data)
+
+    if not check_ffmpeg():
+        print("[ERROR] FFmpeg is not installed.")
+        sys.exit(1)
+    if os.path.abspath(input_folder) == os.path.abspath(output_folder):
+        print("[ERROR] Input and output folder must differ.")
+        sys.exit(1)
+    os.makedirs(output_folder, exist_ok=True)
+
+    catalogue = VideoCatalogue(input_folder)
+    videos = catalogue.list_videos()
+    print(f"[INFO] {len(videos)} clips in {input_folder}, target height {height}px, {workers} parallel jobs")
+
+    manifest = BuildManifest(os.path.join(output_folder, MANIFEST_FILENAME))
+    digest = settings_hash(dict({key: settings[key] for key in ENCODING_KEYS}, height=height))
+
+    jobs = [(catalogue.path_for(v), os.path.join(output_folder, v)) for v in videos]
+    pending = [
+        (source, output) for source, output in jobs
+        if args.force or not manifest.is_up_to_date(output, source, digest)
+    ]
+    print(f"[INFO] {len(jobs) - len(pending)} clips up to date, {len(pending)} to transcode")
+
+    outcomes = run_parallel(
+        lambda job: normalize_clip(job[0], job[1], height, settings),
+        pending, workers, label='normalised'
+    )
+    failed = 0
+    for (source, output), latencies, error in outcomes:
+        if error is None:
+            manifest.record(output, source, digest,
+                            open_latency_before=round(latencies[0], 4),
+                            open_latency_after=round(latencies[1], 4))
+        else:
+            failed += 1
+    manifest.save()
+
+    entries = []
+    for source, output in jobs:
+        entry = manifest.get(output)
+        if entry is not None and os.path.exists(output):
+            entries.append({
+                'filename': os.path.basename(output),
+                'action_id': action_id_from_filename(output),
+                'source': os.path.basename(source),
+                'open_latency_before': entry.get('open_latency_before'),
+                'open_latency_after': entry.get('open_latency_after'),
+            })
+    catalogue_path = write_catalogue(output_folder, entries)
+
+    before = [e['open_latency_before'] for e in entries if e['open_latency_before'] is not None]
+    after = [e['open_latency_after'] for e in entries if e['open_latency_after'] is not None]
+    print(f"\n[INFO] Normalised {len(pending) - failed} clips ({failed} failed)")
+    if before and after:
+        print(f"[INFO] Median open latency: {statistics.median(before) * 1000:.0f} ms before, "
+              f"{statistics.median(after) * 1000:.0f} ms after")
+    print(f"[INFO] Catalogue: {catalogue_path} ({len(entries)} clips)")
+    print(f"[INFO] Point paths.video_path in config.yaml to {output_folder}")
+
+
+if __name__ == '__main__':
+    main()
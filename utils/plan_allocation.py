@@ -0,0 +1,110 @@
+"""
+Allocation Planner
+
+Computes a balanced rater x clip allocation for a planned study (see
+core/planner.py) and writes one plan file per rater into paths.plan_dir.
+The app and the rating server then serve each rater the planned clips in the
+planned order instead of a random queue.
+
+Raters are given either by user id (--rater-ids, one id per line) or by number
+(--raters N); numbered plans are claimed by the next new user ids in order.
+
+Usage: python utils/plan_allocation.py --raters 20 --ratings-per-clip 3 [--block-size 5] [--seed 1]
+       python utils/plan_allocation.py --rater-ids raters.txt --ratings-per-clip 3
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.catalogue import VideoCatalogue  # noqa: E402
+from core.config import load_config  # noqa: E402
+from core.planner import (DESIGN_FILENAME, UNASSIGNED_DIR, design_summary,  # noqa: E402
+                          is_replaceable, plan_allocation, remove_plan, write_plan)
+
+DEFAULT_PLAN_DIR = 'plans'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan a balanced allocation of clips to raters.")
+    parser.add_argument('--config', default='config/config.yaml', help="Path to config.yaml")
+    raters = parser.add_mutually_exclusive_group(required=True)
+    raters.add_argument('--raters', type=int, help="Number of raters (plans are claimed by new user ids)")
+    raters.add_argument('--rater-ids', help="Text file with one user id per line")
+    parser.add_argument('--ratings-per-clip', type=int,
+                        help="Ratings per clip (default: settings.min_ratings_per_video)")
+    parser.add_argument('--block-size', type=int, default=1, help="Clips per block rated by the same panel")
+    parser.add_argument('--seed', type=int, help="Random seed for a reproducible plan")
+    parser.add_argument('--output', help=f"Plan folder (default: paths.plan_dir or {DEFAULT_PLAN_DIR})")
+    parser.add_argument('--force', action='store_true',
+                        help="Replace an existing plan (only the plan files in the plan folder are removed)")
+    args = parser.parse_args()
+
+    config_data = load_config(args.config)
+    paths = config_data.get('paths', {})
+    plan_dir = args.output or paths.get('plan_dir') or DEFAULT_PLAN_DIR
+    ratings_per_clip = args.ratings_per_clip or config_data['settings']['min_ratings_per_video']
+
+    if args.rater_ids:
+        with open(args.rater_ids, 'r') as f:
+            user_ids = [line.strip() for line in f if line.strip()]
+        if any('_' in user_id for user_id in user_ids):
+            print("[ERROR] User ids must not contain '_'.")
+            sys.exit(1)
+    else:
+        user_ids = [None] * args.raters
+    if os.path.exists(os.path.join(plan_dir, DESIGN_FILENAME)) and not args.force:
+        print(f"[ERROR] {plan_dir} already contains a plan (use --force to replace it).")
+        sys.exit(1)
+    if not is_replaceable(plan_dir):
+        print(f"[ERROR] {plan_dir} contains files but no plan ({DESIGN_FILENAME}); choose another --output.")
+        sys.exit(1)
+
+    videos = VideoCatalogue(paths['video_path']).list_videos()
+    print(f"[INFO] {len(user_ids)} raters, {len(videos)} clips, {ratings_per_clip} ratings per clip, "
+          f"block size {args.block_size}")
+
+    start = time.perf_counter()
+    try:
+        queues, panels = plan_allocation(len(user_ids), videos, ratings_per_clip, args.block_size, args.seed)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    if args.force:
+        claimed = remove_plan(plan_dir)
+        if claimed:
+            print(f"[WARNING] Replaced {claimed} plans already claimed by user ids")
+    width = len(str(len(user_ids)))
+    for number, (user_id, queue) in enumerate(zip(user_ids, queues), start=1):
+        if user_id is None:
+            write_plan(os.path.join(plan_dir, UNASSIGNED_DIR, f"rater{number:0{width}d}.json"), None, queue)
+        else:
+            write_plan(os.path.join(plan_dir, f"{user_id}.json"), user_id, queue)
+
+    summary = design_summary(queues)
+    with open(os.path.join(plan_dir, DESIGN_FILENAME), 'w') as f:
+        json.dump({
+            'ratings_per_clip': ratings_per_clip,
+            'block_size': args.block_size,
+            'seed': args.seed,
+            'blocks': len(panels),
+            'summary': summary,
+        }, f, indent=2)
+
+    print(f"[INFO] Planned in {elapsed:.1f}s, written to {plan_dir}")
+    print(f"[INFO] Clips per rater: {summary['clips_per_rater_min']}-{summary['clips_per_rater_max']}")
+    print(f"[INFO] Clips shared per rater pair: {summary['shared_clips_min']}-{summary['shared_clips_max']} "
+          f"(mean {summary['shared_clips_mean']}, sd {summary['shared_clips_std']})")
+    print(f"[INFO] Mean spread of a clip's queue positions across its raters: {summary['position_spread_mean']}")
+    if not paths.get('plan_dir'):
+        print(f"[INFO] Set paths.plan_dir in config.yaml to {plan_dir} to use the plan in the app")
+
+
+if __name__ == '__main__':
+    main()
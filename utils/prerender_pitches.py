@@ -0,0 +1,84 @@
+"""
+Pre-render pitch trajectory images for all actions in the DuckDB events table.
+
+Images are rendered in parallel with a process pool (matplotlib is not
+thread-safe) and written into the content-addressed pitch cache that
+the app reads from. Already rendered trajectories are skipped, so an
+interrupted run can simply be restarted.
+
+Usage: python utils/prerender_pitches.py [--workers N] [--only-videos]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.catalogue import VideoCatalogue  # noqa: E402
+from core.config import load_config  # noqa: E402
+from core.metadata import MetadataProvider  # noqa: E402
+from core.pitch import PitchImageCache, render_pitch_png  # noqa: E402
+
+DEFAULT_PITCH_CACHE_PATH = 'cache/pitch'
+
+
+def _render_job(job):
+    """Render one trajectory into the cache (runs in a worker process)."""
+    cache_dir, coords = job
+    PitchImageCache(cache_dir).put(*coords, render_pitch_png(*coords))
+    return coords
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render pitch trajectory images into the pitch cache.")
+    parser.add_argument('--config', default='config/config.yaml', help="Path to config.yaml")
+    parser.add_argument('--db', help="DuckDB database (default: paths.db_path from config)")
+    parser.add_argument('--cache-dir', help=f"Pitch cache directory (default: paths.pitch_cache_path or {DEFAULT_PITCH_CACHE_PATH})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument('--only-videos', action='store_true', help="Only render actions that have a clip in video_path")
+    args = parser.parse_args()
+
+    config_data = load_config(args.config)
+    paths = config_data.get('paths', {})
+    db_path = args.db or paths['db_path']
+    cache_dir = args.cache_dir or paths.get('pitch_cache_path', DEFAULT_PITCH_CACHE_PATH)
+    cache = PitchImageCache(cache_dir)
+
+    action_ids = VideoCatalogue(paths['video_path']).action_ids() if args.only_videos else None
+    rows = MetadataProvider(db_path).trajectories(action_ids)
+
+    # Identical trajectories share one cache entry; skip those already rendered (resume)
+    pending = {tuple(row[1:]) for row in rows}
+    total = len(pending)
+    pending = [coords for coords in pending if cache.get(*coords) is None]
+    print(f"[INFO] {len(rows)} actions, {total} unique trajectories, {total - len(pending)} already cached")
+    if not pending:
+        return
+
+    start = time.monotonic()
+    done = 0
+    failed = 0
+    report_every = max(1, len(pending) // 100)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(_render_job, (cache_dir, coords)) for coords in pending]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[ERROR] Failed to render trajectory: {e}")
+            done += 1
+            if done % report_every == 0 or done == len(pending):
+                elapsed = time.monotonic() - start
+                rate = done / elapsed if elapsed > 0 else 0
+                eta = (len(pending) - done) / rate if rate > 0 else 0
+                print(f"[{done}/{len(pending)}] {rate:.1f} images/s, ETA {eta:.0f}s")
+
+    print(f"[INFO] Rendered {done - failed} images into {cache_dir} ({failed} failed)")
+
+
+if __name__ == '__main__':
+    main()
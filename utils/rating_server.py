@@ -0,0 +1,84 @@
+"""
+Rating Server
+
+Runs the rating session as an HTTP service (see core/server.py), so raters
+only need a thin client and the clips, the DuckDB metadata and the ratings
+stay on one machine. Clips are assigned with the same queue logic as the
+app (including adaptive sampling) and ratings are written to the usual
+user_ratings/ folder.
+
+Settings are read from config/config.yaml (paths, settings, adaptive_sampling
+and the optional server section).
+
+Usage: python utils/rating_server.py [--host HOST] [--port PORT]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.adaptive import ConvergenceTracker, load_adaptive_settings  # noqa: E402
+from core.assignment import AssignmentEngine  # noqa: E402
+from core.catalogue import VideoCatalogue  # noqa: E402
+from core.config import load_config, load_rating_scales  # noqa: E402
+from core.metadata import MetadataProvider  # noqa: E402
+from core.pitch import PitchImageCache  # noqa: E402
+from core.ratings import RatingStore  # noqa: E402
+from core.server import RatingServer  # noqa: E402
+
+# Defaults for the server section of config.yaml
+DEFAULT_SETTINGS = {
+    'host': '127.0.0.1',  # Use 0.0.0.0 to accept raters from the lab network
+    'port': 8765,
+    'open_clip_timeout_minutes': 10,  # Clips handed out and not rated within this time are released
+    'rescan_seconds': 30,  # Interval for picking up ratings saved by other stations
+}
+
+
+def build_server(config_data, ratings_dir='user_ratings', users_dir='user_data'):
+    """Create a RatingServer from the app configuration."""
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(config_data.get('server') or {})
+    paths = config_data['paths']
+    scale_configs = load_rating_scales(config_data)
+
+    adaptive_settings = load_adaptive_settings(config_data)
+    convergence = None
+    if adaptive_settings['enabled']:
+        convergence = ConvergenceTracker.from_settings(scale_configs, adaptive_settings)
+
+    catalogue = VideoCatalogue(paths['video_path'])
+    store = RatingStore(ratings_dir, users_dir)
+    assignment = AssignmentEngine(catalogue, store, config_data['settings']['min_ratings_per_video'],
+                                  convergence=convergence, plan_dir=paths.get('plan_dir'))
+    metadata_provider = MetadataProvider(paths.get('db_path', ''), paths.get('metadata_snapshot'))
+    metadata_provider.load(catalogue.action_ids())
+    pitch_cache = PitchImageCache(paths.get('pitch_cache_path', 'cache/pitch'))
+    return RatingServer(catalogue, store, assignment, metadata_provider, pitch_cache, scale_configs,
+                        open_clip_timeout=settings['open_clip_timeout_minutes'] * 60,
+                        rescan_seconds=settings['rescan_seconds'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve clips and collect ratings over HTTP.")
+    parser.add_argument('--config', default='config/config.yaml', help="Path to config.yaml")
+    parser.add_argument('--host', help="Interface to listen on (default: server.host or 127.0.0.1)")
+    parser.add_argument('--port', type=int, help="Port to listen on (default: server.port or 8765)")
+    args = parser.parse_args()
+
+    config_data = load_config(args.config)
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(config_data.get('server') or {})
+
+    server = build_server(config_data)
+    try:
+        asyncio.run(server.serve(args.host or settings['host'], args.port or settings['port']))
+    except KeyboardInterrupt:
+        print("\n[INFO] Server stopped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Long-session soak test
+
+Runs the rating app headless (hidden window) and cycles the video player
+screen through N clips built from a small set of synthetic test clips, the
+way a station does over a day of raters. Every few clips it samples the
+resident memory, the number of live textures and the number of open file
+handles, prints them and writes them to a CSV report. Values that keep
+climbing over the run point to a leak in the clip/texture lifecycle.
+
+Ratings are written into a temporary folder, the real user_ratings and
+user_data folders are not touched and no export is run on exit.
+
+Requirements: FFmpeg must be installed (to generate the synthetic clips)
+Usage: python utils/soak_test.py [--clips N] [--interval S] [--sample-every K]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ['RATING_APP_HEADLESS'] = '1'  # Must be set before the app module imports Kivy's window
+
+from core.catalogue import VideoCatalogue  # noqa: E402
+from core.media import check_ffmpeg, run_ffmpeg  # noqa: E402
+from core.ratings import RatingStore  # noqa: E402
+from core.resources import ResourceSampler, count_instances  # noqa: E402
+
+
+def make_synthetic_clips(folder, count, duration=2, size='640x360'):
+    """Generate count short FFmpeg test-pattern clips and return their filenames."""
+    filenames = []
+    for i in range(count):
+        filename = f"soak{i:03d}.mp4"
+        run_ffmpeg(['-f', 'lavfi', '-i', f"testsrc=duration={duration}:size={size}:rate=25",
+                    '-vf', f"hue=h={i * 360 // max(count, 1)}",
+                    '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-an', os.path.join(folder, filename)])
+        filenames.append(filename)
+    return filenames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cycle the rating app through many clips and report resource use.")
+    parser.add_argument('--clips', type=int, default=300, help="Number of clip loads in the session")
+    parser.add_argument('--distinct', type=int, default=5, help="Number of distinct synthetic clips")
+    parser.add_argument('--interval', type=float, default=0.5, help="Seconds between clip loads")
+    parser.add_argument('--sample-every', type=int, default=10, help="Take a resource sample every K clips")
+    parser.add_argument('--report', default='output/soak_report.csv', help="CSV file for the samples")
+    args = parser.parse_args()
+
+    if not check_ffmpeg():
+        print("[ERROR] FFmpeg is not installed.")
+        sys.exit(1)
+
+    # The app reads config/config.yaml and rating.kv relative to the repository root
+    os.chdir(ROOT)
+    from kivy.clock import Clock
+    from kivy.graphics.texture import Texture
+    from CreativityRatingApp import RatingApp
+
+    work_dir = tempfile.mkdtemp(prefix='rating_soak_')
+    clip_dir = os.path.join(work_dir, 'videos')
+    os.makedirs(clip_dir)
+    print(f"[INFO] Generating {args.distinct} synthetic clips in {clip_dir}")
+    clips = make_synthetic_clips(clip_dir, args.distinct)
+
+    sampler = ResourceSampler({'textures': lambda: count_instances(Texture)})
+
+    class SoakRatingApp(RatingApp):
+        kv_file = os.path.join(ROOT, 'rating.kv')
+
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.rating_store = RatingStore(os.path.join(work_dir, 'user_ratings'),
+                                            os.path.join(work_dir, 'user_data'),
+                                            os.path.join(work_dir, 'user_sessions'))
+            self.user.user_id = 'soak'
+
+        def on_start(self):
+            screen = self.root.get_screen('videoplayer')
+            screen.catalogue = VideoCatalogue(clip_dir)
+            screen.videos = [clips[i % len(clips)] for i in range(args.clips)]
+            screen.index = 0
+            screen._queue_user_id = self.user.user_id  # Keep the synthetic queue on enter
+            self.root.current = 'videoplayer'
+            sampler.sample(clip=0)
+            Clock.schedule_interval(self.next_clip, args.interval)
+
+        def next_clip(self, dt):
+            screen = self.root.get_screen('videoplayer')
+            if screen.index >= len(screen.videos):
+                self.stop()
+                return False
+            screen.load_video()
+            if screen.index % args.sample_every == 0:
+                row = sampler.sample(clip=screen.index)
+                print(f"[SOAK] clip {row['clip']:5d}  rss {row['rss_mb']:8.1f} MB  "
+                      f"textures {row['textures']:5d}  open files {row['open_files']:4d}")
+
+        def on_stop(self):
+            # Report only; the regular export is not run for synthetic sessions
+            sampler.sample(clip=self.root.get_screen('videoplayer').index)
+            sampler.write_csv(args.report)
+            first, last = sampler.rows[0], sampler.rows[-1]
+            print(f"\n[INFO] {last['clip']} clips in {last['elapsed_s']:.0f}s")
+            for column in ('rss_mb', 'textures', 'open_files'):
+                print(f"[INFO] {column}: {first[column]} -> {last[column]}")
+            print(f"[INFO] Report: {args.report}")
+
+    SoakRatingApp().run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,136 +1,73 @@
-import json
-import shutil
-import pandas as pd
+"""
+Export collected ratings and user data to CSV files in output/,
+write a log file with rating statistics and back up all JSON files.
+Run as a script, or through run_export() (called by the app on exit).
+
+The reliability statistics (ICC, Krippendorff's alpha) get bootstrap
+confidence intervals computed on a process pool when run as a script;
+on app exit only the point estimates are computed.
+
+Ratings are loaded as a compact typed frame using the scale types from
+rating_scales.yaml. For very large merged datasets, --chunk-size reads
+the rating files in chunks so the raw records are never all in memory.
+
+Ratings given on a playback that dropped more than playback_quality.max_dropped_ratio
+(config.yaml, or --max-dropped-ratio) of the frames are left out of the mean
+ratings and reliability statistics.
+
+Usage: python utils/write_ratings2csv.py [--bootstrap N] [--workers N] [--chunk-size N]
+                                         [--max-dropped-ratio R]
+"""
+
+import argparse
 import os
-from datetime import datetime
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import load_config, load_rating_scales  # noqa: E402
+from core.export import Exporter, load_json_files_with_datetime  # noqa: E402, F401
 
 userdata_path = 'user_data/'
 ratings_path = 'user_ratings/'
 
-def load_json_files_with_datetime(path, file_type='ratings'):
+
+def load_export_config():
+    """Return (scale_configs, max_dropped_ratio) from config.yaml; scale types are inferred without one."""
+    try:
+        config_data = load_config()
+        scale_configs = load_rating_scales(config_data)
+    except (FileNotFoundError, KeyError):
+        config_data = {}
+        scale_configs = None
+    return scale_configs, (config_data.get('playback_quality') or {}).get('max_dropped_ratio')
+
+
+def run_export(n_bootstrap=0, bootstrap_workers=None, chunk_size=None, max_dropped_ratio=None):
     """
-    Load all JSON files from a directory and add creation datetime.
-    
-    Parameters:
-    - path: directory path containing JSON files
-    - file_type: string to identify the type of data (for column naming)
-    
-    Returns:
-    - DataFrame with all records and file_created_at column
+    Run the export and return (df_ratings, df_mean_ratings, df_users).
+    max_dropped_ratio defaults to playback_quality.max_dropped_ratio in config.yaml.
     """
-    all_data = []
-    
-    for filename in os.listdir(path):
-        if filename.endswith('.json'):
-            filepath = os.path.join(path, filename)
-            
-            # Get file modification time (preserved when copying between machines)
-            modification_time = os.path.getmtime(filepath)
-            creation_datetime = datetime.fromtimestamp(modification_time)
-            
-            # Load JSON file
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            
-            # Handle both single dict and list of dicts
-            if isinstance(data, dict):
-                data = [data]
-            elif not isinstance(data, list):
-                data = [{'content': data}]
-            
-            # Add metadata to each record
-            for record in data:
-                record['file_created_at'] = creation_datetime
-                record['filename'] = filename
-            
-            all_data.extend(data)
-    
-
-    df = pd.DataFrame(all_data)
-    return df
-
-# Load ratings
-df_ratings = load_json_files_with_datetime(ratings_path, 'ratings')
-df_ratings.to_csv('output/ratings.csv')
-print(f"Loaded {len(df_ratings)} ratings from {df_ratings['filename'].nunique()} files")
-print(f"Number of rated actions: {df_ratings['id'].nunique()}")
-
-# Dynamically identify scale columns
-# These are all columns except metadata columns
-metadata_columns = ['user_id', 'id', 'action_not_recognized', 'file_created_at', 'filename']
-all_columns = df_ratings.columns.tolist()
-scale_columns = [col for col in all_columns if col not in metadata_columns]
-
-print(f"Detected scale columns: {scale_columns}")
-
-# Build dynamic aggregation dictionary
-agg_dict = {}
-
-# Add count using the first scale column (or 'id' if no scales found)
-count_column = scale_columns[0] if scale_columns else 'id'
-agg_dict['num_ratings'] = (count_column, 'count')
-
-# Add mean and std for each scale column
-for scale_col in scale_columns:
-    agg_dict[f'mean_{scale_col}'] = (scale_col, 'mean')
-    agg_dict[f'std_{scale_col}'] = (scale_col, 'std')
-
-# Add mean for action_not_recognized if present
-if 'action_not_recognized' in all_columns:
-    agg_dict['mean_action_not_recognized'] = ('action_not_recognized', 'mean')
-
-# Store mean ratings per action
-df_mean_ratings = df_ratings.groupby('id').agg(**agg_dict).round(3)
-
-df_mean_ratings.to_csv('output/mean_ratings.csv')
-
-# Load user data
-df_users = load_json_files_with_datetime(userdata_path, 'users')
-df_users.to_csv('output/users.csv')
-print(f"\nLoaded {len(df_users)} user records from {df_users['filename'].nunique()} files")
-print(f"Number of unique users: {df_users['user_id'].nunique()}")
-
-# Generate log file with statistics
-log_path = 'output/rating_log.txt'
-with open(log_path, 'w') as log_file:
-    log_file.write("=" * 60 + "\n")
-    log_file.write("CREATIVITY RATING APP - DATA EXPORT LOG\n")
-    log_file.write("=" * 60 + "\n")
-    log_file.write(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-
-    # 1. Number of unique actions rated
-    num_unique_actions = df_ratings['id'].nunique()
-    log_file.write(f"Number of unique actions rated: {num_unique_actions}\n\n")
-
-    # 2. Number of raters involved
-    num_unique_raters = df_users['user_id'].nunique()
-    log_file.write(f"Number of raters involved: {num_unique_raters}\n\n")
-
-    # 3. Value counts of value counts for 'id' in df_ratings
-    # First, count how many times each action ID has been rated
-    id_rating_counts = df_ratings['id'].value_counts()
-    # Then, count how many IDs have each rating count (e.g., how many IDs rated once, twice, etc.)
-    rating_frequency_distribution = id_rating_counts.value_counts().sort_index()
-
-    log_file.write("Rating frequency distribution:\n")
-    log_file.write("-" * 40 + "\n")
-    log_file.write(f"{'Times Rated':<15} {'Number of Actions':<20}\n")
-    log_file.write("-" * 40 + "\n")
-    for times_rated, num_actions in rating_frequency_distribution.items():
-        log_file.write(f"{times_rated:<15} {num_actions:<20}\n")
-
-    log_file.write("\n" + "=" * 60 + "\n")
-
-print(f"\n[INFO] Log file created: {log_path}")
-
-# backup files to higher level folder
-os.makedirs('backup/user_data/', exist_ok=True)
-os.makedirs('backup/user_ratings/', exist_ok=True)
-# copy JSON files instead of moving them
-for filename in os.listdir(userdata_path):
-    if filename.endswith('.json'):
-        shutil.copy(os.path.join(userdata_path, filename), os.path.join('backup/user_data/', filename))
-for filename in os.listdir(ratings_path):
-    if filename.endswith('.json'):
-        shutil.copy(os.path.join(ratings_path, filename), os.path.join('backup/user_ratings/', filename))
-print("\n[INFO] Backup of JSON files completed.")
\ No newline at end of file
+    scale_configs, config_max_dropped_ratio = load_export_config()
+    if max_dropped_ratio is None:
+        max_dropped_ratio = config_max_dropped_ratio
+    return Exporter(
+        ratings_path, userdata_path, n_bootstrap=n_bootstrap, bootstrap_workers=bootstrap_workers,
+        scale_configs=scale_configs, chunk_size=chunk_size, max_dropped_ratio=max_dropped_ratio
+    ).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export ratings, user data and reliability statistics.")
+    parser.add_argument('--bootstrap', type=int, default=1000, help="Bootstrap replicates for confidence intervals (0 = none)")
+    parser.add_argument('--workers', type=int, help="Worker processes for the bootstrap (default: all CPU cores)")
+    parser.add_argument('--chunk-size', type=int, help="Load rating files in chunks of N records")
+    parser.add_argument('--max-dropped-ratio', type=float,
+                        help="Leave out ratings whose playback dropped more than this share of frames "
+                             "(default: playback_quality.max_dropped_ratio in config.yaml)")
+    args = parser.parse_args()
+    run_export(args.bootstrap, args.workers, args.chunk_size, args.max_dropped_ratio)
+
+
+if __name__ == '__main__':
+    main()